@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+게시글 카탈로그 (메모리 캐시)
+
+게시글을 요청마다 저장소(posts.json 또는 데이터베이스)에서 다시 읽지 않고, 한 번 읽어서 메모리에 보관합니다.
+- id로 게시글을 바로 찾을 수 있도록 딕셔너리 색인을 만듭니다. (O(1) 조회)
+- type별 색인도 함께 만듭니다.
+- 저장소가 밖에서 수정되면(파일의 수정 시간 mtime 등이 바뀌면) 다시 읽어옵니다.
+- 생성/수정/삭제는 메모리의 데이터를 바로 고치고 저장소에 저장합니다.
+- 게시글 목록으로 만든 다른 데이터(영향값 텐서 등)도 목록이 바뀔 때까지 보관해 둡니다.
+- 몇 개 필드만 골라 보내는 목록(projection)은 게시글마다 JSON 조각을 미리 만들어 두고,
+  id 순서로 잘라서(페이지) 보낼 수 있게 합니다.
+"""
+
+import bisect
+import threading
+
+# 게시글에 있는 필드 (?fields=로 고를 수 있는 이름)
+POST_FIELDS = ('id', 'type', 'title', 'content', 'author',
+               'freedomImpact', 'orderImpact', 'trustImpact', 'diversityImpact')
+
+
+class PostProjection:
+    """
+    게시글마다 고른 필드만 남긴 JSON 조각(바이트)을 id 순서로 미리 만들어 둔 색인
+
+    사용 예시:
+        projection = catalog.projection(('id', 'title'), encode_json)
+        items, next_cursor = projection.page(cursor=10, limit=20)   # id가 10보다 큰 게시글 20개
+    """
+
+    def __init__(self, posts, fields, encode):
+        """
+        입력:
+            posts: 게시글 리스트
+            fields: 남길 필드 이름들 (id는 항상 포함)
+            encode: 딕셔너리를 JSON 바이트로 바꾸는 함수
+        """
+        self.fields = fields
+        ordered = sorted(posts, key=lambda post: post['id'])
+        self.ids = [post['id'] for post in ordered]
+        self.items = [encode({field: post[field] for field in fields if field in post})
+                      for post in ordered]
+
+    def page(self, cursor=None, limit=None):
+        """
+        id가 cursor보다 큰 게시글을 limit개까지 돌려줍니다.
+
+        출력: (JSON 조각 리스트, 다음 페이지의 cursor 또는 None)
+        """
+        start = 0 if cursor is None else bisect.bisect_right(self.ids, cursor)
+        end = len(self.items) if limit is None else min(start + limit, len(self.items))
+        next_cursor = self.ids[end - 1] if end < len(self.items) else None
+        return self.items[start:end], next_cursor
+
+
+class PostCatalog:
+    """
+    프로세스 전체에서 공유하는 게시글 목록
+
+    사용 예시:
+        catalog = PostCatalog(STORAGE)
+        post = catalog.get(3)        # id가 3인 게시글 (없으면 None)
+        posts = catalog.all()        # 전체 게시글 리스트 (읽기 전용으로 사용)
+    """
+
+    def __init__(self, storage):
+        """
+        입력:
+            storage: 저장소 (storage.py의 JsonStorage 또는 SqliteStorage)
+        """
+        self._storage = storage
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._mtime = None
+        self._by_id = {}      # id -> 게시글 (파일에 있던 순서 유지)
+        self._by_type = {}    # type -> [게시글, ...]
+        self._ordered = None  # all()이 돌려줄 리스트 (변경되면 다시 만듦)
+        self._max_id = 0
+        self._version = 0     # 게시글 목록이 바뀔 때마다 1씩 증가
+        self._derived = {}    # 이름 -> (버전, 게시글 목록으로 만든 데이터)
+
+    # ----------------------------------------
+    # 내부 함수: 저장소 읽기와 색인 만들기
+    # ----------------------------------------
+
+    def _refresh(self):
+        """처음 사용할 때, 또는 저장소가 밖에서 바뀌었을 때만 다시 읽습니다."""
+        mtime = self._storage.posts_token()
+        if self._loaded and mtime == self._mtime:
+            return
+        posts = self._storage.load_posts()
+        self._by_id = {post['id']: post for post in posts}
+        self._max_id = max(self._by_id, default=0)
+        self._reindex()
+        self._mtime = mtime
+        self._loaded = True
+
+    def _reindex(self):
+        self._by_type = {}
+        for post in self._by_id.values():
+            self._by_type.setdefault(post.get('type'), []).append(post)
+        self._changed()
+
+    def _changed(self):
+        """게시글 목록이 바뀌었을 때: 캐시를 비우고 버전을 올립니다."""
+        self._ordered = None
+        self._derived = {}
+        self._version += 1
+
+    def _persist(self, changed=None, deleted=()):
+        """
+        메모리의 게시글을 저장소에 저장하고, 저장한 뒤의 mtime을 기억합니다.
+        (changed, deleted: 바뀐 게시글과 지운 id, 데이터베이스 저장소는 이 부분만 씀)
+        """
+        ok = self._storage.save_posts(self.all(), changed, deleted)
+        self._mtime = self._storage.posts_token()
+        return ok
+
+    # ----------------------------------------
+    # 조회
+    # ----------------------------------------
+
+    def all(self):
+        """전체 게시글 리스트 (받은 쪽에서 수정하면 안 됨)"""
+        with self._lock:
+            self._refresh()
+            if self._ordered is None:
+                self._ordered = list(self._by_id.values())
+            return self._ordered
+
+    def get(self, post_id):
+        """id로 게시글 찾기 (없으면 None)"""
+        with self._lock:
+            self._refresh()
+            return self._by_id.get(post_id)
+
+    def by_type(self, post_type):
+        """type이 같은 게시글 리스트"""
+        with self._lock:
+            self._refresh()
+            return list(self._by_type.get(post_type, []))
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._by_id)
+
+    @property
+    def version(self):
+        """게시글 목록의 버전 (생성/수정/삭제나 파일 변경이 있을 때마다 증가)"""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def derived(self, name, build):
+        """
+        게시글 목록으로 만든 데이터를 목록이 바뀔 때까지 보관해 두고 재사용합니다.
+
+        입력:
+            name: 데이터 이름 (예: 'engine')
+            build: 게시글 리스트를 받아서 데이터를 만드는 함수
+
+        사용 예시:
+            engine = catalog.derived('engine', ImpactEngine)
+        """
+        with self._lock:
+            self._refresh()
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] == self._version:
+                return cached[1]
+            value = build(self.all())
+            self._derived[name] = (self._version, value)
+            return value
+
+    def projection(self, fields, encode):
+        """
+        고른 필드만 남긴 게시글 색인 (PostProjection, 목록이 바뀔 때까지 재사용)
+
+        입력:
+            fields: POST_FIELDS 중에서 고른 필드 이름들 (순서와 중복은 상관없음)
+            encode: 딕셔너리를 JSON 바이트로 바꾸는 함수
+        """
+        fields = tuple(field for field in POST_FIELDS if field == 'id' or field in fields)
+        return self.derived('projection:' + '+'.join(fields),
+                            lambda posts: PostProjection(posts, fields, encode))
+
+    # ----------------------------------------
+    # 생성 / 수정 / 삭제
+    # ----------------------------------------
+
+    def create(self, fields):
+        """
+        새 게시글을 추가합니다. id는 (기존 최대 id + 1)로 정합니다.
+
+        출력: 생성된 게시글 딕셔너리
+        """
+        with self._lock:
+            self._refresh()
+            post = {"id": self._max_id + 1}
+            post.update(fields)
+            self._by_id[post['id']] = post
+            self._max_id = post['id']
+            self._by_type.setdefault(post.get('type'), []).append(post)
+            self._changed()
+            self._persist(changed=[post])
+            return post
+
+    def update(self, post_id, fields):
+        """
+        게시글 내용을 바꿉니다.
+
+        출력: 수정된 게시글 (게시글이 없으면 None)
+        """
+        with self._lock:
+            self._refresh()
+            post = self._by_id.get(post_id)
+            if post is None:
+                return None
+            old_type = post.get('type')
+            post.update(fields)
+            if post.get('type') != old_type:
+                self._reindex()
+            else:
+                self._changed()
+            self._persist(changed=[post])
+            return post
+
+    def delete(self, post_id):
+        """
+        게시글을 지웁니다.
+
+        출력: 지웠으면 True, 없는 게시글이면 False
+        """
+        with self._lock:
+            self._refresh()
+            post = self._by_id.pop(post_id, None)
+            if post is None:
+                return False
+            same_type = self._by_type.get(post.get('type'), [])
+            same_type[:] = [p for p in same_type if p is not post]
+            self._changed()
+            self._persist(changed=[], deleted=[post_id])
+            return True
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 변환 (바이트로 바로 만들기)
+
+응답 본문, 저장 파일, 세션 로그, 데이터베이스가 모두 이 파일의 함수로 JSON을 만들고 읽습니다.
+- orjson이 설치되어 있으면 orjson으로 변환하고 (pip install orjson, 표준 json보다 몇 배 빠름),
+  없으면 표준 라이브러리 json으로 똑같은 결과를 만듭니다.
+- dumps()는 문자열을 거치지 않고 UTF-8 바이트를 바로 돌려줍니다. (한글은 그대로, 공백 없이 한 줄)
+  두 방식의 결과가 같은 바이트라서, 어느 쪽으로 저장한 파일이든 서로 읽을 수 있습니다.
+- 환경 변수 ECHOCHAMBER_JSON=json 으로 실행하면 orjson이 있어도 표준 json을 사용합니다. (속도 비교용)
+
+사용 예시:
+    body = dumps({"success": True})          # b'{"success":true}'
+    data = loads(body)                        # 바이트나 문자열 모두 됨
+    text = dumps_pretty(data)                 # 들여쓰기 2칸 (사람이 읽을 파일용)
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # orjson이 없어도 서버는 동작해야 함
+    orjson = None
+
+if os.environ.get('ECHOCHAMBER_JSON', '').strip().lower() == 'json':
+    orjson = None
+
+# 사용 중인 변환 방식 이름 ('orjson' 또는 'json', 서버를 시작할 때 로그에 표시)
+NAME = 'json' if orjson is None else 'orjson'
+
+# 표준 json: 요청마다 JSONEncoder를 새로 만들지 않도록 한 번 만들어 두고 재사용
+_COMPACT = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+_PRETTY = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+if orjson is not None:
+    # OPT_NON_STR_KEYS: 숫자 키도 표준 json처럼 문자열 키로 바꿈
+    # OPT_SERIALIZE_NUMPY: 영향값 계산(engine.py)에서 나온 NumPy 값도 그대로 변환
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    _PRETTY_OPTIONS = _OPTIONS | orjson.OPT_INDENT_2
+
+
+def dumps(data):
+    """파이썬 데이터 -> 한 줄 JSON 바이트 (응답 본문, 저장 파일용)"""
+    if orjson is not None:
+        return orjson.dumps(data, option=_OPTIONS)
+    return _COMPACT.encode(data).encode('utf-8')
+
+
+def dumps_pretty(data):
+    """파이썬 데이터 -> 들여쓰기 2칸 JSON 바이트 (--pretty-json으로 파일을 사람이 읽기 좋게 저장할 때)"""
+    if orjson is not None:
+        return orjson.dumps(data, option=_PRETTY_OPTIONS)
+    return _PRETTY.encode(data).encode('utf-8')
+
+
+def loads(content):
+    """JSON 바이트나 문자열 -> 파이썬 데이터 (잘못된 JSON이면 ValueError)"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def reindent(content):
+    """한 줄로 된 JSON 바이트를 들여쓰기 2칸으로 바꿉니다."""
+    return dumps_pretty(loads(content))
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+응답 압축 (gzip / deflate)
+
+브라우저가 보낸 Accept-Encoding 헤더를 보고 응답 본문을 압축해서 보냅니다.
+- 작은 응답(MIN_SIZE 바이트 미만)은 압축해도 별로 줄지 않으므로 그대로 보냅니다.
+- 게시글 목록처럼 자주 요청하는 응답은 ETag(내용이 같으면 같은 값)를 열쇠로
+  압축한 결과를 보관해 두고, 같은 내용을 다시 압축하지 않습니다.
+"""
+
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+# 이 크기(바이트)보다 작은 응답은 압축하지 않음
+MIN_SIZE = 1024
+# 압축 수준 (1: 빠름 ~ 9: 작게, 6이 보통)
+LEVEL = 6
+
+# 서버가 지원하는 압축 방식 (앞에 있을수록 우선)
+ENCODINGS = ('gzip', 'deflate')
+
+
+def choose_encoding(accept_encoding):
+    """
+    Accept-Encoding 헤더를 보고 사용할 압축 방식을 고릅니다.
+
+    입력: 헤더 값 (예: 'gzip, deflate, br' 또는 'gzip;q=0, deflate')
+    출력: 'gzip', 'deflate' 또는 None (압축하지 않음)
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body, encoding):
+    """본문 바이트를 압축합니다. (encoding은 choose_encoding()의 결과)"""
+    if encoding == 'gzip':
+        # mtime=0: 같은 본문은 항상 같은 결과가 나오도록
+        return gzip.compress(body, compresslevel=LEVEL, mtime=0)
+    if encoding == 'deflate':
+        # HTTP의 deflate는 zlib 형식
+        return zlib.compress(body, LEVEL)
+    raise ValueError(f"지원하지 않는 압축 방식: {encoding}")
+
+
+def compress_stream(chunks, encoding):
+    """
+    조각들을 이어서 압축하며 내보냅니다. (전체 본문을 메모리에 모으지 않음)
+    결과를 모두 이으면 compress(본문 전체, encoding)와 같은 형식입니다.
+    """
+    # wbits: 16 + 15는 gzip 형식, 15는 zlib(deflate) 형식
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif encoding == 'deflate':
+        compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, zlib.MAX_WBITS)
+    else:
+        raise ValueError(f"지원하지 않는 압축 방식: {encoding}")
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionCache:
+    """
+    (ETag, 압축 방식) -> 압축한 본문을 보관하는 캐시
+    (가장 오래 안 쓴 것부터 내보냄)
+
+    사용 예시:
+        cache = CompressionCache()
+        data = cache.get(etag, 'gzip', body)   # 처음에만 압축하고, 다음부터는 보관한 값
+    """
+
+    def __init__(self, max_items=64):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag, encoding, body):
+        key = (etag, encoding)
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                return data
+        # 압축은 잠금 밖에서 (다른 응답을 기다리게 하지 않도록)
+        data = compress(body, encoding)
+        with self._lock:
+            self._items[key] = data
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return data
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+게임 규칙 엔진 (영향값 텐서)
+
+게시글 목록을 (게시글 수, 지표 4개, 액션 3개) 모양의 표(텐서)로 한 번 바꿔 두고,
+결정(통과/경고/삭제) 하나를 "해당 칸의 값 4개를 더하고 0~100으로 자르기"로 처리합니다.
+- 서버의 /api/action 처리와, 여러 결정을 한꺼번에 적용하는 도구들이 같이 사용합니다.
+- NumPy가 설치되어 있으면 NumPy 배열로 계산하고, 없으면 파이썬 리스트로 똑같이 계산합니다.
+
+엔딩 조건(ENDINGS)도 이 파일에 모아 두었습니다.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy가 없어도 서버는 동작해야 함
+    np = None
+
+# 지표 순서 (텐서의 두 번째 축)
+METRICS = ("freedom", "order", "trust", "diversity")
+# 게시글의 영향값 필드 (METRICS와 같은 순서)
+IMPACT_FIELDS = ("freedomImpact", "orderImpact", "trustImpact", "diversityImpact")
+# 액션 코드 (텐서의 세 번째 축 = 영향값 배열의 인덱스)
+ACTION_CODES = {"approve": 0, "warn": 1, "delete": 2}
+ACTIONS = tuple(ACTION_CODES)
+
+METRIC_MIN = 0
+METRIC_MAX = 100
+
+# 엔딩 조건 (위에서부터 차례로 확인해서 처음 맞는 엔딩 하나만 적용)
+#   (엔딩 이름, 메시지, 조건 함수(freedom, order, trust, diversity) -> True/False)
+# 모든 게시글을 처리했을 때의 트루엔딩은 check_ending()에서 마지막에 확인합니다.
+# 조건 함수는 숫자에도, NumPy 배열에도 쓸 수 있도록 and 대신 &를 사용합니다.
+ENDINGS = (
+    ('무정부', '자유가 완전히 사라져 무정부 상태가 되었습니다.',
+     lambda f, o, t, d: f <= 0),
+    ('혼돈', '자유도와 질서가 넘처나 커뮤니티가 붕괴되었습니다.',
+     lambda f, o, t, d: (f >= 100) & (o >= 80)),
+    ('질서 붕괴', '질서가 완전히 무너져 커뮤니티가 혼란에 빠졌습니다.',
+     lambda f, o, t, d: o <= 0),
+    ('신뢰 상실', '사용자들의 신뢰가 완전히 사라졌습니다.',
+     lambda f, o, t, d: t <= 0),
+    ('지배', '커뮤니티가 관리자에 의해 지배되었습니다.',
+     lambda f, o, t, d: (t >= 100) & (o >= 80)),
+    ('다양성 소멸', '모든 목소리가 같아져 커뮤니티가 메아리실(Echo Chamber)이 되었습니다.',
+     lambda f, o, t, d: d <= 0),
+)
+TRUE_ENDING = ('트루엔딩', '이상적인 커뮤니티의 균형을 이루었습니다.')
+
+# 엔딩 번호: ENDINGS의 순서대로 0, 1, 2, ..., 트루엔딩은 마지막 번호, 엔딩이 아니면 NO_ENDING
+ENDING_NAMES = tuple(ending[0] for ending in ENDINGS) + (TRUE_ENDING[0],)
+TRUE_ENDING_CODE = len(ENDINGS)
+NO_ENDING = -1
+
+
+def impact_row(value):
+    """
+    게시글의 영향값 하나를 [통과값, 경고값, 삭제값] 세 숫자로 바꿉니다.
+
+    영향값이 예전 형식(숫자 하나)이면 프론트엔드 API와 같은 규칙으로 바꿉니다.
+        통과: 그대로, 경고: 절반, 삭제: -abs(값) * 1.5
+    """
+    if isinstance(value, (list, tuple)):
+        row = [float(v) if v is not None else 0.0 for v in list(value)[:3]]
+        return row + [0.0] * (3 - len(row))
+    try:
+        single = float(value or 0)
+    except (TypeError, ValueError):
+        single = 0.0
+    return [single, single * 0.5, -abs(single) * 1.5]
+
+
+def plain_number(value):
+    """계산 결과를 JSON에 넣기 좋은 숫자로 (54.0 -> 54, 54.5 -> 54.5)"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def check_ending(metrics, processed_count, total_posts):
+    """
+    엔딩 조건을 확인합니다.
+
+    입력:
+        metrics: (freedom, order, trust, diversity)
+        processed_count: 지금까지 처리한 게시글 수 (currentPostIndex)
+        total_posts: 전체 게시글 수
+
+    출력: 엔딩이면 {'type': ..., 'message': ...}, 아니면 None
+    """
+    for ending_type, message, condition in ENDINGS:
+        if condition(*metrics):
+            return {'type': ending_type, 'message': message}
+    if processed_count >= total_posts:
+        return {'type': TRUE_ENDING[0], 'message': TRUE_ENDING[1]}
+    return None
+
+
+def ending_codes(metrics, processed_count, total_posts):
+    """
+    여러 게임의 엔딩을 한꺼번에 확인합니다. (check_ending의 대량 계산용)
+
+    입력:
+        metrics: 게임별 지표 (게임 수 x 4)
+        processed_count: 처리한 게시글 수 (모든 게임이 같은 턴이면 숫자 하나)
+        total_posts: 전체 게시글 수
+
+    출력: 게임별 엔딩 번호 (ENDING_NAMES의 인덱스, 엔딩이 아니면 NO_ENDING)
+    """
+    if np is not None:
+        metrics = np.asarray(metrics, dtype=np.float64)
+        columns = [metrics[:, m] for m in range(len(METRICS))]
+        codes = np.full(len(metrics), NO_ENDING, dtype=np.int64)
+        if processed_count >= total_posts:
+            codes[:] = TRUE_ENDING_CODE
+        # 뒤에서부터 덮어쓰면 앞쪽(우선순위가 높은) 엔딩이 남음
+        for code in range(len(ENDINGS) - 1, -1, -1):
+            codes[ENDINGS[code][2](*columns)] = code
+        return codes
+    codes = []
+    for values in metrics:
+        ending = check_ending(values, processed_count, total_posts)
+        codes.append(NO_ENDING if ending is None else ENDING_NAMES.index(ending['type']))
+    return codes
+
+
+class ImpactEngine:
+    """
+    게시글 목록을 영향값 텐서로 바꿔 둔 계산기
+
+    사용 예시:
+        engine = ImpactEngine(posts)
+        new_metrics = engine.apply((50, 50, 50, 50), post_id=1, action='approve')
+    """
+
+    def __init__(self, posts):
+        self.post_ids = [post['id'] for post in posts]
+        self.row_of = {post_id: row for row, post_id in enumerate(self.post_ids)}
+        # table[게시글][지표][액션]
+        table = [[impact_row(post.get(field, 0)) for field in IMPACT_FIELDS] for post in posts]
+        if np is not None:
+            self.tensor = np.array(table, dtype=np.float64).reshape(len(posts), len(METRICS), len(ACTIONS))
+        else:
+            self.tensor = table
+
+    def __len__(self):
+        return len(self.post_ids)
+
+    def delta(self, post_id, action):
+        """결정 하나의 지표 변화량 (freedom, order, trust, diversity)"""
+        cell = self.tensor[self.row_of[post_id]]
+        code = ACTION_CODES[action]
+        if np is not None:
+            return cell[:, code]
+        return [cell[m][code] for m in range(len(METRICS))]
+
+    def apply(self, metrics, post_id, action):
+        """
+        결정 하나를 적용한 새 지표를 돌려줍니다. (변화량을 더하고 0~100으로 자르기)
+
+        입력:
+            metrics: (freedom, order, trust, diversity)
+            post_id: 게시글 id (없는 id면 KeyError)
+            action: 'approve', 'warn', 'delete' 중 하나 (아니면 KeyError)
+
+        출력: 새 지표 (freedom, order, trust, diversity)
+        """
+        delta = self.delta(post_id, action)
+        if np is not None:
+            result = np.clip(np.asarray(metrics, dtype=np.float64) + delta, METRIC_MIN, METRIC_MAX)
+            return tuple(plain_number(v) for v in result)
+        return tuple(plain_number(max(METRIC_MIN, min(METRIC_MAX, m + d))) for m, d in zip(metrics, delta))
+
+    def apply_many(self, metrics, rows, codes):
+        """
+        여러 게임에 결정 하나씩을 한꺼번에 적용합니다. (시뮬레이션 등 대량 계산용)
+
+        입력:
+            metrics: 게임별 지표 (게임 수 x 4)
+            rows: 게임별 게시글의 행 번호 (row_of로 구한 값)
+            codes: 게임별 액션 코드 (ACTION_CODES의 값)
+
+        출력: 새 지표 (게임 수 x 4), NumPy가 있으면 NumPy 배열
+        """
+        if np is not None:
+            metrics = np.asarray(metrics, dtype=np.float64)
+            rows = np.asarray(rows, dtype=np.intp)
+            codes = np.asarray(codes, dtype=np.intp)
+            return np.clip(metrics + self.tensor[rows, :, codes], METRIC_MIN, METRIC_MAX)
+        result = []
+        for values, row, code in zip(metrics, rows, codes):
+            cell = self.tensor[row]
+            result.append([max(METRIC_MIN, min(METRIC_MAX, values[m] + cell[m][code]))
+                           for m in range(len(METRICS))])
+        return result
+
+    def play(self, game_state, post_id, action, timestamp):
+        """
+        게임 상태 딕셔너리에 결정 하나를 적용합니다. (/api/action과 같은 규칙)
+        - 지표 4개 변경 (0~100으로 자르기)
+        - currentPostIndex 1 증가, processedPosts에 마지막 결정 기록
+        - 엔딩 조건을 확인해서 엔딩이면 gameStatus를 'ended'로 바꾸고 endings에 추가
+
+        출력: 엔딩이면 엔딩 딕셔너리, 아니면 None
+        """
+        metrics = tuple(game_state.get(name, 50) for name in METRICS)
+        metrics = self.apply(metrics, post_id, action)
+        for name, value in zip(METRICS, metrics):
+            game_state[name] = value
+        game_state['currentPostIndex'] = game_state.get('currentPostIndex', 0) + 1
+        game_state['processedPosts'] = {
+            'postId': post_id,
+            'action': action,
+            'timestamp': timestamp
+        }
+        ending = check_ending(metrics, game_state['currentPostIndex'], len(self))
+        if ending is not None:
+            game_state['gameStatus'] = 'ended'
+            game_state.setdefault('endings', []).append(ending)
+        return ending
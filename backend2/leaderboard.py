@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+리더보드 (메모리 힙)
+
+게임이 끝날 때마다 저장된 리더보드 전체를 읽고 정렬하는 대신,
+상위 기록들을 메모리의 최소 힙(heap)에 보관합니다.
+- 힙의 맨 위(가장 작은 값)에는 "가장 낮은 순위" 기록이 있습니다.
+- 새 기록은 힙의 최하위보다 점수가 높을 때만 들어가고, 최하위를 밀어냅니다. (O(log K))
+- GET /api/leaderboard 응답(상위 10개)은 바이트로 미리 만들어 두고,
+  상위 10개가 실제로 바뀔 때만 다시 만듭니다.
+- 저장할 때는 새 기록만 넘깁니다. SQLite 저장소는 한 줄만 넣고,
+  JSON 저장소는 저장기가 파일에 실제로 쓸 때 한 번만 정렬해서 씁니다. (나중에 쓰기 모드에서는 1초에 한 번)
+"""
+
+import heapq
+import itertools
+import threading
+
+import codec
+
+
+class Leaderboard:
+    """
+    상위 capacity개의 기록만 보관하는 리더보드
+
+    사용 예시:
+        board = Leaderboard(STORAGE)
+        board.add({"score": 300, ...})
+        body = board.top_response()   # 상위 10개 응답 (바이트)
+    """
+
+    def __init__(self, storage, capacity=100, top_n=10, encode=codec.dumps):
+        """
+        입력:
+            storage: 저장소 (storage.py의 JsonStorage 또는 SqliteStorage)
+            capacity: 보관할 최대 기록 수 (기본 100)
+            top_n: 응답으로 보낼 상위 기록 수 (기본 10)
+            encode: 응답 데이터를 바이트로 바꾸는 함수
+        """
+        self._storage = storage
+        self.capacity = capacity
+        self.top_n = top_n
+        self._encode = encode
+        # 저장기가 파일에 쓸 때 _saved_records()가 다시 잡을 수 있도록 RLock
+        self._lock = threading.RLock()
+        self._heap = None          # [(점수, -순번, 기록), ...] 최소 힙
+        self._seq = itertools.count()
+        self._top = None           # 상위 top_n개 항목 (순위순, 바뀌면 None)
+        self._top_cache = None     # 미리 만들어 둔 상위 top_n 응답 바이트
+        self._version = 0          # 상위 top_n이 바뀔 때마다 1씩 증가 (ETag용)
+
+    # ----------------------------------------
+    # 내부 함수
+    # ----------------------------------------
+
+    def _ensure_loaded(self):
+        """처음 사용할 때 한 번만 저장소에서 읽어서 힙을 만듭니다."""
+        if self._heap is not None:
+            return
+        records = self._storage.load_leaderboard()
+        # 저장소는 순위순(점수 내림차순)이므로, 같은 점수면 앞에 있던 기록이 먼저 들어온 기록
+        records = sorted(records, key=lambda x: x.get('score', 0), reverse=True)
+        self._heap = []
+        for record in records:
+            self._push(record)
+
+    def _push(self, record):
+        """
+        기록을 힙에 넣습니다. 자리가 꽉 찼으면 최하위 기록과 비교해서 밀어냅니다.
+
+        같은 점수면 먼저 들어온 기록이 더 높은 순위입니다.
+        (-순번을 쓰면 같은 점수 중 가장 늦게 들어온 기록이 힙의 맨 위 = 최하위)
+
+        출력: 새 기록이 리더보드에 남았으면 True
+        """
+        item = (record.get('score', 0), -next(self._seq), record)
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, item)
+            return True
+        if item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+            return True
+        return False
+
+    def _ranked(self):
+        """순위대로 정렬한 기록 리스트"""
+        return [item[2] for item in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+    def _saved_records(self):
+        """저장소가 목록 전체를 쓸 때 부르는 함수 (JSON 파일에 실제로 쓸 때만 정렬)"""
+        with self._lock:
+            return self._ranked()
+
+    def _top_items(self):
+        """상위 top_n개 항목 (바뀌었을 때만 힙에서 다시 꺼냄)"""
+        if self._top is None:
+            self._top = heapq.nlargest(self.top_n, self._heap, key=lambda item: item[:2])
+        return self._top
+
+    def _would_enter_top(self, score):
+        """이 점수의 새 기록이 상위 top_n 안에 들어가는지 확인"""
+        top = self._top_items()
+        if len(top) < self.top_n:
+            return True
+        # 상위 top_n 중 가장 낮은 점수보다 높아야 들어감 (같으면 먼저 온 기록이 앞)
+        return score > top[-1][0]
+
+    # ----------------------------------------
+    # 사용 함수
+    # ----------------------------------------
+
+    def add(self, record):
+        """
+        새 기록을 추가하고 저장소에 저장합니다.
+
+        출력: 기록이 리더보드(상위 capacity개)에 들어갔으면 True
+        """
+        with self._lock:
+            self._ensure_loaded()
+            enters_top = self._would_enter_top(record.get('score', 0))
+            if not self._push(record):
+                return False
+            if enters_top:
+                self._top = None
+                self._top_cache = None
+                self._version += 1
+            # 새 기록만 넘김 (SQLite는 한 줄만 넣고, JSON 파일은 쓸 때 _saved_records로 정렬)
+            self._storage.save_leaderboard(self._saved_records, added=record, capacity=self.capacity)
+            return True
+
+    def top(self, n=None):
+        """상위 n개 기록 리스트 (기본 top_n개)"""
+        with self._lock:
+            self._ensure_loaded()
+            n = n or self.top_n
+            if n <= self.top_n:
+                return [item[2] for item in self._top_items()[:n]]
+            return self._ranked()[:n]
+
+    @property
+    def version(self):
+        """상위 top_n 응답(top_response)의 버전"""
+        with self._lock:
+            return self._version
+
+    def top_response(self):
+        """
+        GET /api/leaderboard 응답 본문 (바이트)
+        상위 top_n이 바뀌지 않았으면 미리 만들어 둔 바이트를 그대로 돌려줍니다.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._top_cache is None:
+                self._top_cache = self._encode({
+                    "success": True,
+                    "leaderboard": [item[2] for item in self._top_items()]
+                })
+            return self._top_cache
+
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EchoChamber 부하 테스트 (벤치마크)
+
+임시 폴더에 데이터(게시글, 사용자, 리더보드)를 만들어 두고 그 데이터로 서버를 켠 뒤,
+여러 플레이어가 동시에 게임을 하는 것처럼 API를 호출하고 경로별 처리량과 응답 시간을 잽니다.
+- 플레이어(가상 사용자)마다 세션을 하나씩 쓰고 게임이 끝나면 리셋해서 다시 합니다.
+- 요청 종류의 비율은 --mix로 고릅니다. (MIXES 참고)
+- --rate를 주면 초당 요청 수를 고정하고, 응답 시간은 "보내기로 한 시각"부터 잽니다.
+  (서버가 밀려서 늦게 보낸 요청도 기다린 시간이 응답 시간에 들어감)
+- 결과를 JSON으로 저장해 두었다가 --compare로 비교하면, 느려진 경로가 있을 때 종료 코드 1로 끝납니다.
+
+사용법:
+    python3 loadtest.py                                        # 플레이어 16명, 10초
+    python3 loadtest.py --concurrency 64 --duration 30 --posts 3000 --users 100000
+    python3 loadtest.py --rate 500 --mix read                  # 초당 500개, 읽기 위주
+    python3 loadtest.py --output before.json                   # 결과 저장
+    python3 loadtest.py --compare before.json --threshold 0.2  # 20% 넘게 느려지면 실패
+    python3 loadtest.py --url http://localhost:8000            # 이미 켜져 있는 서버에 (데이터는 그 서버의 것)
+    python3 loadtest.py --server-arg=--storage --server-arg=sqlite   # 서버 옵션 넘기기
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+from server import DEFAULT_GAME_STATE, POSTS_FILE, load_json_file
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+
+# 부하 테스트용 서버의 관리자 토큰과 만들어 둔 사용자들의 비밀번호
+ADMIN_TOKEN = 'loadtest-admin'
+PASSWORD = 'load1234'
+
+# 요청 종류별 비율 (합이 100일 필요는 없음)
+#   posts: GET /api/posts, action: POST /api/action (게임이 끝나면 POST /api/reset),
+#   leaderboard: GET /api/leaderboard, login: POST /api/auth/login, admin: POST /api/posts/update
+MIXES = {
+    'player': {'action': 55, 'posts': 15, 'leaderboard': 15, 'login': 10, 'admin': 5},
+    'read': {'posts': 45, 'leaderboard': 45, 'login': 10},
+    'write': {'action': 80, 'admin': 20},
+}
+
+# 비교할 때 이만큼(밀리초)도 안 느려졌으면 비율이 커도 느려진 것으로 보지 않음 (측정 오차)
+MIN_DELTA_MS = 0.5
+# 비교할 두 결과에서 같아야 의미가 있는 설정
+COMPARED_CONFIG = ('mix', 'concurrency', 'rate', 'posts', 'users', 'leaderboard', 'server_workers', 'server_arg')
+ACTIONS = ('approve', 'warn', 'delete')
+
+
+# ============================================
+# 데이터 만들기
+# ============================================
+
+def seed_data(directory, posts=30, users=1000, records=100, seed=0):
+    """
+    directory에 서버가 읽을 데이터 파일들을 만듭니다.
+
+    입력:
+        posts: 게시글 수 (data/posts.json의 게시글을 반복해서 채움)
+        users: 사용자 수 (user00000, user00001, ... 비밀번호는 PASSWORD)
+        records: 리더보드 기록 수
+    """
+    rng = random.Random(seed)
+    base = load_json_file(POSTS_FILE, [])
+    if not base:
+        raise RuntimeError(f"게시글을 읽지 못했습니다: {POSTS_FILE}")
+    deck = []
+    for index in range(posts):
+        post = dict(base[index % len(base)])
+        post['id'] = index + 1
+        if index >= len(base):
+            post['title'] = f"{post['title']} #{index // len(base) + 1}"
+        deck.append(post)
+    now = datetime.now().isoformat()
+    user_list = [{"id": index + 1, "username": f"user{index:05d}", "password": PASSWORD, "createdAt": now}
+                 for index in range(users)]
+    leaderboard = []
+    for _ in range(records):
+        values = {name: rng.randint(0, 100) for name in ('freedom', 'order', 'trust', 'diversity')}
+        leaderboard.append(dict(score=sum(values.values()), **values, ending='트루엔딩',
+                                completedAt=now, processedPosts=posts))
+    leaderboard.sort(key=lambda record: record['score'], reverse=True)
+
+    os.makedirs(directory, exist_ok=True)
+    for name, data in (('posts.json', deck), ('users.json', user_list),
+                       ('leaderboard.json', leaderboard), ('game-state.json', DEFAULT_GAME_STATE)):
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    return deck
+
+
+# ============================================
+# 서버 켜고 끄기
+# ============================================
+
+def free_port():
+    """지금 비어 있는 포트 번호"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(data_dir, port, server_args=(), timeout=15.0):
+    """
+    data_dir의 데이터로 server.py를 별도 프로세스로 켜고, 요청을 받을 수 있을 때까지 기다립니다.
+    (같은 프로세스에서 켜면 부하를 만드는 스레드와 서버가 GIL을 나눠 써서 결과가 틀어짐)
+    서버 출력은 data_dir/server.log에 남습니다.
+    """
+    env = dict(os.environ, ECHOCHAMBER_DATA_DIR=data_dir, ECHOCHAMBER_ADMIN_TOKEN=ADMIN_TOKEN)
+    command = [sys.executable, SERVER_SCRIPT, '--port', str(port), '--access-log', 'off', *server_args]
+    with open(os.path.join(data_dir, 'server.log'), 'w', encoding='utf-8') as log:
+        process = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 시작하지 못했습니다. ({os.path.join(data_dir, 'server.log')} 참고)")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"서버가 {timeout:g}초 안에 시작하지 않았습니다.")
+
+
+def stop_server(process):
+    """SIGTERM으로 서버를 끄고 (남은 저장을 마치도록) 끝날 때까지 기다립니다."""
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# ============================================
+# 가상 플레이어
+# ============================================
+
+class Player:
+    """
+    연결 하나와 세션 하나를 쓰는 가상 플레이어
+    요청 종류(MIXES의 키)를 받아서 요청을 보내고 (경로 이름, 상태 코드)를 돌려줍니다.
+    """
+
+    def __init__(self, host, port, index, deck, users, rng):
+        self.connection = http.client.HTTPConnection(host, port, timeout=30)
+        self.session = f"load-{index}"
+        self.deck = deck
+        self.users = users
+        self.rng = rng
+        self.next_post = 0          # 이번에 결정할 게시글 위치 (deck의 인덱스)
+        self.ended = False
+
+    def request(self, method, path, body=None, headers=None):
+        """요청을 보내고 (상태 코드, 본문)을 돌려줍니다. (연결 오류면 상태 코드 None)"""
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, path, body=data, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+            if response.will_close:
+                self.connection.close()
+            return response.status, payload
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return None, b''
+
+    def run(self, kind):
+        """요청 하나 보내기 -> (경로 이름, 상태 코드)"""
+        if kind == 'posts':
+            return 'GET /api/posts', self.request('GET', '/api/posts')[0]
+        if kind == 'leaderboard':
+            return 'GET /api/leaderboard', self.request('GET', '/api/leaderboard')[0]
+        if kind == 'login':
+            username = f"user{self.rng.randrange(self.users):05d}" if self.users else 'test'
+            body = {'username': username, 'password': PASSWORD}
+            return 'POST /api/auth/login', self.request('POST', '/api/auth/login', body)[0]
+        if kind == 'admin':
+            post = self.rng.choice(self.deck)
+            body = {key: post[key] for key in ('id', 'title', 'freedomImpact', 'orderImpact',
+                                               'trustImpact', 'diversityImpact')}
+            body['content'] = f"{post['content']} ({self.rng.randrange(1000)})"
+            headers = {'X-Admin-Token': ADMIN_TOKEN}
+            return 'POST /api/posts/update', self.request('POST', '/api/posts/update', body, headers)[0]
+        if kind == 'action':
+            return self._action()
+        raise ValueError(f"알 수 없는 요청 종류: {kind}")
+
+    def _action(self):
+        headers = {'X-Session-Id': self.session}
+        if self.ended:
+            status, _ = self.request('POST', '/api/reset', headers=headers)
+            if status == 200:
+                self.ended = False
+                self.next_post = 0
+            return 'POST /api/reset', status
+        post = self.deck[self.next_post % len(self.deck)]
+        body = {'postId': post['id'], 'action': self.rng.choice(ACTIONS)}
+        status, payload = self.request('POST', '/api/action', body, headers)
+        if status == 200:
+            state = json.loads(payload).get('gameState', {})
+            self.next_post = state.get('currentPostIndex', self.next_post + 1)
+            self.ended = state.get('gameStatus') == 'ended'
+        return 'POST /api/action', status
+
+
+# ============================================
+# 부하 만들기
+# ============================================
+
+def run_load(host, port, deck, users, mix='player', concurrency=16, duration=10.0, rate=0.0,
+             warmup=2.0, seed=0):
+    """
+    플레이어 concurrency명이 duration초 동안 요청을 보냅니다. (처음 warmup초는 기록하지 않음)
+
+    입력:
+        rate: 초당 요청 수 (0이면 플레이어마다 응답을 받자마자 다음 요청)
+    출력:
+        (경로 이름 -> 응답 시간 목록(초), 경로 이름 -> 오류 수, 측정한 시간(초))
+    """
+    weights = MIXES[mix]
+    kinds = list(weights)
+    cumulative = [weights[kind] for kind in kinds]
+    for index in range(1, len(cumulative)):
+        cumulative[index] += cumulative[index - 1]
+
+    begin = time.perf_counter()
+    measure_from = begin + warmup
+    stop_at = measure_from + duration
+    slots = iter(range(sys.maxsize))        # 고정 비율 모드에서 다음에 보낼 요청 번호
+    slots_lock = threading.Lock()
+    latencies = [{} for _ in range(concurrency)]
+    errors = [{} for _ in range(concurrency)]
+
+    def worker(index):
+        rng = random.Random(seed * 1000003 + index)
+        player = Player(host, port, index, deck, users, rng)
+        mine_latency, mine_errors = latencies[index], errors[index]
+        while True:
+            if rate > 0:
+                with slots_lock:
+                    scheduled = begin + next(slots) / rate
+                if scheduled >= stop_at:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+                if scheduled >= stop_at:
+                    break
+            kind = rng.choices(kinds, cum_weights=cumulative)[0]
+            name, status = player.run(kind)
+            finished = time.perf_counter()
+            if scheduled < measure_from:
+                continue
+            mine_latency.setdefault(name, []).append(finished - scheduled)
+            if status is None or status >= 400:
+                mine_errors[name] = mine_errors.get(name, 0) + 1
+        player.connection.close()
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    merged_latency, merged_errors = {}, {}
+    for mine_latency, mine_errors in zip(latencies, errors):
+        for name, values in mine_latency.items():
+            merged_latency.setdefault(name, []).extend(values)
+        for name, count in mine_errors.items():
+            merged_errors[name] = merged_errors.get(name, 0) + count
+    elapsed = max(time.perf_counter(), stop_at) - measure_from
+    return merged_latency, merged_errors, elapsed
+
+
+# ============================================
+# 결과 정리, 비교
+# ============================================
+
+def percentile(sorted_values, q):
+    """정렬된 목록의 q 백분위수 (nearest-rank)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _stats(values, error_count, elapsed):
+    values = sorted(values)
+    return {
+        'requests': len(values),
+        'errors': error_count,
+        'throughput': len(values) / elapsed if elapsed > 0 else 0.0,
+        'mean_ms': sum(values) / len(values) * 1000 if values else 0.0,
+        'p50_ms': percentile(values, 50) * 1000,
+        'p95_ms': percentile(values, 95) * 1000,
+        'p99_ms': percentile(values, 99) * 1000,
+        'max_ms': (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def summarize(latencies, errors, elapsed):
+    """경로별 통계와 전체 통계"""
+    endpoints = {name: _stats(values, errors.get(name, 0), elapsed)
+                 for name, values in sorted(latencies.items())}
+    everything = [value for values in latencies.values() for value in values]
+    return endpoints, _stats(everything, sum(errors.values()), elapsed)
+
+
+def compare(current, baseline, threshold):
+    """
+    저장해 둔 결과(baseline)와 비교해서 느려진 항목을 찾습니다.
+
+    출력: 느려진 항목 설명 목록 (비어 있으면 통과)
+        - p50/p95/p99 응답 시간이 threshold 비율보다 더 늘어남 (MIN_DELTA_MS 이하 차이는 무시)
+        - 처리량이 threshold 비율보다 더 줄어듦 (두 결과 모두 --rate 없이 잰 경우만)
+        - 오류 비율이 1%p 넘게 늘어남
+    """
+    problems = []
+    check_throughput = not current['config'].get('rate') and not baseline['config'].get('rate')
+    for name, before in baseline['endpoints'].items():
+        after = current['endpoints'].get(name)
+        if after is None or not before['requests']:
+            continue
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if after[key] > before[key] * (1 + threshold) and after[key] - before[key] > MIN_DELTA_MS:
+                problems.append(f"{name} {key[:-3]}: {before[key]:.2f}ms -> {after[key]:.2f}ms")
+        if check_throughput and after['throughput'] < before['throughput'] * (1 - threshold):
+            problems.append(f"{name} 처리량: {before['throughput']:.1f}/s -> {after['throughput']:.1f}/s")
+        error_before = before['errors'] / before['requests']
+        error_after = after['errors'] / after['requests'] if after['requests'] else 1.0
+        if error_after > error_before + 0.01:
+            problems.append(f"{name} 오류 비율: {error_before:.1%} -> {error_after:.1%}")
+    return problems
+
+
+def print_report(result):
+    config = result['config']
+    print(f"플레이어 {config['concurrency']}명, {result['elapsed']:.1f}초, 요청 비율 {config['mix']}"
+          + (f", 초당 {config['rate']:g}개 고정" if config['rate'] else ""))
+    print(f"{'경로':<26}{'요청':>8}{'오류':>7}{'처리량/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'최대':>9}  (ms)")
+    rows = list(result['endpoints'].items()) + [('(전체)', result['total'])]
+    for name, stats in rows:
+        print(f"{name:<26}{stats['requests']:>8}{stats['errors']:>7}{stats['throughput']:>10.1f}"
+              f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EchoChamber 부하 테스트")
+    parser.add_argument('--url', default=None,
+                        help="이미 켜져 있는 서버 주소 (주지 않으면 임시 데이터로 서버를 켬)")
+    parser.add_argument('--posts', type=int, default=30, help="만들 게시글 수 (기본 30)")
+    parser.add_argument('--users', type=int, default=1000, help="만들 사용자 수 (기본 1000)")
+    parser.add_argument('--leaderboard', type=int, default=100, help="만들 리더보드 기록 수 (기본 100)")
+    parser.add_argument('--mix', choices=sorted(MIXES), default='player', help="요청 종류 비율 (기본 player)")
+    parser.add_argument('--concurrency', type=int, default=16, help="동시에 요청하는 플레이어 수 (기본 16)")
+    parser.add_argument('--rate', type=float, default=0.0, help="초당 요청 수 (기본 0: 최대한 빨리)")
+    parser.add_argument('--duration', type=float, default=10.0, help="측정 시간(초) (기본 10)")
+    parser.add_argument('--warmup', type=float, default=2.0, help="측정 전에 요청만 보내는 시간(초) (기본 2)")
+    parser.add_argument('--seed', type=int, default=0, help="난수 시드")
+    parser.add_argument('--server-workers', type=int, default=16,
+                        help="서버 작업자 스레드 수 (server.py --workers, 기본 16)")
+    parser.add_argument('--server-arg', action='append', default=[],
+                        help="server.py에 그대로 넘길 옵션 (여러 번 사용 가능)")
+    parser.add_argument('--keep-data', action='store_true', help="임시 데이터 폴더를 지우지 않음")
+    parser.add_argument('--output', default=None, help="결과를 저장할 JSON 파일")
+    parser.add_argument('--compare', default=None, help="비교할 예전 결과 JSON 파일")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="이 비율보다 더 느려지면 실패 (기본 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    data_dir = None
+    process = None
+    started = datetime.now().isoformat()
+    if args.url:
+        target = urlparse(args.url)
+        host, port = target.hostname, target.port or 80
+        deck = load_json_file(POSTS_FILE, [])
+        users = 0
+    else:
+        data_dir = tempfile.mkdtemp(prefix='echochamber-load-')
+        deck = seed_data(data_dir, args.posts, args.users, args.leaderboard, args.seed)
+        users = args.users
+        host, port = '127.0.0.1', free_port()
+        server_args = ['--workers', str(args.server_workers)] + args.server_arg
+        process = start_server(data_dir, port, server_args)
+    try:
+        latencies, errors, elapsed = run_load(host, port, deck, users, args.mix, args.concurrency,
+                                              args.duration, args.rate, args.warmup, args.seed)
+    finally:
+        if process is not None:
+            stop_server(process)
+        if data_dir is not None:
+            if args.keep_data:
+                print(f"데이터 폴더: {data_dir}")
+            else:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+    endpoints, total = summarize(latencies, errors, elapsed)
+    result = {
+        'config': {key: value for key, value in vars(args).items()
+                   if key not in ('output', 'compare', 'threshold', 'keep_data')},
+        'startedAt': started,
+        'elapsed': elapsed,
+        'endpoints': endpoints,
+        'total': total,
+    }
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        different = [key for key in COMPARED_CONFIG if baseline['config'].get(key) != result['config'].get(key)]
+        if different:
+            print(f"\n주의: 비교할 결과({args.compare})와 설정이 다릅니다: {', '.join(different)}")
+        problems = compare(result, baseline, args.threshold)
+        if problems:
+            print(f"\n비교할 결과({args.compare})보다 느려졌습니다. (기준 {args.threshold:.0%})")
+            for problem in problems:
+                print(f"  - {problem}")
+            return 1
+        print(f"\n비교할 결과({args.compare})와 비교: 기준({args.threshold:.0%}) 안에 있습니다.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
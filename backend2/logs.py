@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+로그 (단계별 로그 + 접속 기록, 백그라운드 스레드에서 쓰기)
+
+예전에는 요청마다 print()로 접속 기록을 찍고, 게시글 목록이나 게임 상태 전체를 화면에 찍었습니다.
+print()는 화면(터미널)에 다 쓸 때까지 요청 처리를 멈추게 하므로, 게시글이 많으면
+요청을 처리하는 시간보다 찍는 시간이 더 걸립니다.
+
+여기서는 로그를 큐(queue)에 넣기만 하고 바로 돌아가며, 백그라운드 스레드 하나가 큐에서 꺼내서 씁니다.
+- 단계(level): DEBUG < INFO < WARNING < ERROR
+  기본값은 INFO라서 게임 상태 같은 큰 디버그 내용은 만들지도 않습니다. (--log-level DEBUG로 켬)
+- 접속 기록(access log): 요청마다 한 줄씩 모아 두었다가 BATCH_SIZE줄이 쌓이거나
+  FLUSH_INTERVAL초가 지나면 파일에 한 번에 씁니다. 요청 녹화(traffic.py)도 같은 방법으로 따로 씁니다.
+- 큐가 가득 차면 서버 로그와 접속 기록은 버리고 개수만 세지만(dropped_count),
+  요청 녹화는 빠진 요청이 있으면 재생/비교 결과를 믿을 수 없으므로 자리가 날 때까지 기다립니다.
+
+사용 예시:
+    import logging
+    log = logging.getLogger('echochamber')        # 또는 'echochamber.storage' 등 하위 이름
+    log.debug("게임 상태: %s", game_state)        # 문자열은 DEBUG가 켜져 있을 때만 만듦
+
+    start_logging(level='INFO', access_log='data/access.log')
+    ...
+    stop_logging()                                 # 큐에 남은 로그를 모두 쓰고 멈춤
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+# 서버 로그와 접속 기록의 로거 이름 (다른 모듈은 'echochamber.<이름>' 하위 로거를 사용)
+APP_LOGGER = 'echochamber'
+ACCESS_LOGGER = 'echochamber.access'
+TRAFFIC_LOGGER = 'echochamber.traffic'     # 요청 녹화 (traffic.py, 한 줄에 JSON 하나)
+
+# 접속 기록을 파일에 쓰는 간격(초)과 한 번에 모을 최대 줄 수
+FLUSH_INTERVAL = 1.0
+BATCH_SIZE = 256
+
+# 큐에 쌓아 둘 수 있는 최대 로그 수 (넘치면 버리고 개수만 셈, 요청 처리는 멈추지 않음)
+QUEUE_SIZE = 10000
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+_listener = None
+_installed = []    # [(로거, QueueHandler)] stop_logging()이 떼어 냄
+_dropped = 0
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 로그를 버리는 QueueHandler"""
+
+    def enqueue(self, record):
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped += 1
+
+
+class _BlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 자리가 날 때까지 기다리는 QueueHandler (요청 녹화용, 하나도 버리지 않음)"""
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+
+class BatchFileHandler(logging.Handler):
+    """
+    로그 줄을 메모리에 모아 두었다가 파일에 한 번에 덧붙이는 핸들러
+    (백그라운드 스레드에서만 부르므로 한 줄마다 파일에 쓰지 않아도 됨)
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self._lines = []
+
+    def emit(self, record):
+        try:
+            self._lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._lines:
+            return
+        lines, self._lines = self._lines, []
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        except OSError as e:
+            sys.stderr.write(f"접속 기록 저장 오류: {e}\n")
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+class _Listener(logging.handlers.QueueListener):
+    """큐가 flush_interval초 동안 비어 있으면 핸들러들을 flush하는 QueueListener"""
+
+    def __init__(self, log_queue, *handlers, flush_interval=FLUSH_INTERVAL):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def dequeue(self, block):
+        while True:
+            timeout = self.flush_interval - (time.monotonic() - self._last_flush)
+            try:
+                if timeout > 0:
+                    return self.queue.get(block, timeout=timeout)
+            except queue.Empty:
+                pass
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        for handler in self.handlers:
+            handler.flush()
+
+    def enqueue_sentinel(self):
+        # 큐가 가득 차 있어도 멈춤 신호는 빠지지 않도록 자리가 날 때까지 기다림
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        super().stop()
+        self.flush()
+
+
+class _NotSeparate(logging.Filter):
+    """따로 파일에 쓰는 로그(접속 기록, 요청 녹화)가 아닌 로그만 통과"""
+
+    def filter(self, record):
+        return record.name not in (ACCESS_LOGGER, TRAFFIC_LOGGER)
+
+
+def start_logging(level='INFO', access_log=None, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE,
+                  traffic_log=None):
+    """
+    로그를 큐에 넣고 백그라운드 스레드에서 쓰도록 설정합니다.
+
+    입력:
+        level: 서버 로그 단계 ('DEBUG', 'INFO', 'WARNING', 'ERROR'), 화면(stderr)에 씀
+        access_log: 접속 기록 파일 경로 ('-'이면 화면, None이면 남기지 않음)
+        flush_interval: 접속 기록을 파일에 쓰는 간격(초)
+        batch_size: 접속 기록을 한 번에 모을 최대 줄 수
+        traffic_log: 요청 녹화 파일 경로 (None이면 남기지 않음)
+    """
+    global _listener
+    stop_logging()
+    log_queue = queue.Queue(QUEUE_SIZE)
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    console.addFilter(_NotSeparate())
+    handlers = [console]
+    for name, path, pattern in ((ACCESS_LOGGER, access_log, '%(asctime)s %(message)s'),
+                                (TRAFFIC_LOGGER, traffic_log, '%(message)s')):
+        handler = _separate(name, path, log_queue, batch_size)
+        if handler is not None:
+            handler.setFormatter(logging.Formatter(pattern))
+            handlers.append(handler)
+
+    app = logging.getLogger(APP_LOGGER)
+    app.setLevel(level)
+    app.propagate = False
+    _install(app, log_queue)
+
+    _listener = _Listener(log_queue, *handlers, flush_interval=flush_interval)
+    _listener.start()
+
+
+def _separate(name, path, log_queue, batch_size):
+    """
+    name 로거를 서버 로그와 따로 path에 쓰도록 설정하고, 백그라운드 스레드가 쓸 핸들러를 돌려줍니다.
+    (path가 '-'이면 화면, None이면 남기지 않고 None을 돌려줌)
+    """
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    if path is None:
+        # 남기지 않으면 요청마다 로그를 만들지도 않음
+        logger.setLevel(logging.CRITICAL + 1)
+        return None
+    handler = logging.StreamHandler(sys.stderr) if path == '-' else BatchFileHandler(path, batch_size)
+    handler.addFilter(logging.Filter(name))
+    logger.setLevel(logging.INFO)
+    # 요청 녹화는 빠지면 재생 결과가 틀리므로 큐가 가득 차도 버리지 않음
+    _install(logger, log_queue, blocking=(name == TRAFFIC_LOGGER))
+    return handler
+
+
+def _install(logger, log_queue, blocking=False):
+    handler = (_BlockingQueueHandler if blocking else _DroppingQueueHandler)(log_queue)
+    logger.addHandler(handler)
+    _installed.append((logger, handler))
+
+
+def stop_logging():
+    """큐에 남은 로그를 모두 쓰고 백그라운드 스레드를 멈춥니다. (시작하지 않았으면 아무것도 안 함)"""
+    global _listener
+    if _listener is None:
+        return
+    # 로거에서 큐를 먼저 떼어 내고 (이후 로그는 파이썬 기본 동작대로 화면에 씀) 남은 로그를 씀
+    for logger, handler in _installed:
+        logger.removeHandler(handler)
+    _installed.clear()
+    logging.getLogger(APP_LOGGER).propagate = True
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def dropped_count():
+    """큐가 가득 차서 버린 로그 수"""
+    return _dropped
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+서버 지표 (Prometheus 형식)
+
+경로별로 요청 수와 처리 시간을 세어 두었다가 GET /api/metrics로 보여줍니다.
+Prometheus 같은 모니터링 도구가 이 주소를 주기적으로 읽어 가서 그래프를 그립니다.
+
+- 요청 기록(observe)은 요청마다 실행되므로 숫자 몇 개만 더합니다.
+  (처리 시간 구간 찾기는 bisect로 O(log 구간 수), 누적 합은 읽어 갈 때만 계산)
+- 데이터 파일 크기처럼 "지금 값"은 미리 세지 않고 읽어 갈 때 함수를 불러서 구합니다. (gauge)
+
+출력 예시:
+    # TYPE echochamber_http_requests_total counter
+    echochamber_http_requests_total{method="GET",route="/api/posts",status="200"} 42
+    # TYPE echochamber_http_request_duration_seconds histogram
+    echochamber_http_request_duration_seconds_bucket{method="GET",route="/api/posts",status="200",le="0.005"} 40
+    ...
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# 처리 시간 구간 경계 (초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prometheus 텍스트 형식의 Content-Type
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    """라벨 값 안의 \\, ", 줄바꿈을 Prometheus 형식에 맞게 바꿈"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    """[('method', 'GET'), ...] -> '{method="GET",...}'"""
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    """정수는 그대로, 실수는 짧게"""
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _Series:
+    """(메서드, 경로, 상태 코드) 하나의 처리 시간 기록"""
+
+    __slots__ = ('buckets', 'count', 'total')
+
+    def __init__(self, size):
+        self.buckets = [0] * size   # 구간별 개수 (누적 아님, 마지막은 +Inf)
+        self.count = 0
+        self.total = 0.0
+
+
+class Metrics:
+    """
+    요청 지표 모음
+
+    사용 예시:
+        metrics = Metrics()
+        metrics.gauge('echochamber_sessions_hot', "메모리에 있는 세션 수", lambda: SESSIONS.hot_count())
+        metrics.request_started()
+        metrics.observe('GET', '/api/posts', 200, 0.0012)
+        text = metrics.render()
+    """
+
+    def __init__(self, prefix='echochamber', buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._series = {}          # (메서드, 경로, 상태 코드) -> _Series
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._gauges = []          # [(이름, 설명, 함수)]
+        self._started = time.time()
+
+    # ----------------------------------------
+    # 기록 (요청마다)
+    # ----------------------------------------
+
+    def request_started(self):
+        """처리 중인 요청 수 +1"""
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self):
+        """처리 중인 요청 수 -1"""
+        with self._lock:
+            self._in_flight -= 1
+
+    def observe(self, method, route, status, seconds):
+        """
+        요청 하나의 결과를 기록합니다.
+
+        입력:
+            method: 'GET', 'POST' 등
+            route: 경로 표의 경로 모양 (예: '/api/posts/{id:int}', 실제 id별로 나누지 않도록)
+            status: 응답 상태 코드
+            seconds: 처리 시간(초)
+        """
+        index = bisect_left(self.buckets, seconds)
+        key = (method, route, status)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets) + 1)
+            series.buckets[index] += 1
+            series.count += 1
+            series.total += seconds
+
+    # ----------------------------------------
+    # 지금 값 (읽어 갈 때 계산)
+    # ----------------------------------------
+
+    def gauge(self, name, help_text, read):
+        """
+        읽어 갈 때마다 read()를 불러서 값을 구하는 지표를 등록합니다.
+        read()는 숫자 하나, 또는 [(라벨 목록, 숫자), ...]를 돌려줍니다.
+            예: lambda: [([('file', 'posts.json')], 1024), ...]
+        """
+        self._gauges.append((name, help_text, read))
+
+    # ----------------------------------------
+    # 출력
+    # ----------------------------------------
+
+    def render(self):
+        """모든 지표를 Prometheus 텍스트 형식(문자열)으로 만듭니다."""
+        with self._lock:
+            snapshot = [(key, list(series.buckets), series.count, series.total)
+                        for key, series in sorted(self._series.items(), key=lambda item: str(item[0]))]
+            in_flight = self._in_flight
+
+        p = self.prefix
+        lines = [
+            f'# HELP {p}_http_requests_total 처리한 요청 수',
+            f'# TYPE {p}_http_requests_total counter',
+        ]
+        for (method, route, status), _, count, _ in snapshot:
+            labels = _labels([('method', method), ('route', route), ('status', status)])
+            lines.append(f'{p}_http_requests_total{labels} {count}')
+
+        lines += [
+            f'# HELP {p}_http_request_duration_seconds 요청 처리 시간(초)',
+            f'# TYPE {p}_http_request_duration_seconds histogram',
+        ]
+        for (method, route, status), buckets, count, total in snapshot:
+            base = [('method', method), ('route', route), ('status', status)]
+            cumulative = 0
+            for bound, amount in zip(self.buckets, buckets):
+                cumulative += amount
+                lines.append(f'{p}_http_request_duration_seconds_bucket'
+                             f'{_labels(base + [("le", _number(bound))])} {cumulative}')
+            lines.append(f'{p}_http_request_duration_seconds_bucket{_labels(base + [("le", "+Inf")])} {count}')
+            lines.append(f'{p}_http_request_duration_seconds_sum{_labels(base)} {_number(total)}')
+            lines.append(f'{p}_http_request_duration_seconds_count{_labels(base)} {count}')
+
+        lines += [
+            f'# HELP {p}_http_requests_in_flight 지금 처리 중인 요청 수',
+            f'# TYPE {p}_http_requests_in_flight gauge',
+            f'{p}_http_requests_in_flight {in_flight}',
+            f'# HELP {p}_start_time_seconds 서버를 시작한 시각 (유닉스 시간)',
+            f'# TYPE {p}_start_time_seconds gauge',
+            f'{p}_start_time_seconds {_number(self._started)}',
+        ]
+
+        for name, help_text, read in self._gauges:
+            try:
+                value = read()
+            except Exception:
+                # 값을 구하지 못한 지표는 건너뛰기 (다른 지표는 계속 보여줌)
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            if isinstance(value, (int, float)):
+                lines.append(f'{name} {_number(value)}')
+            else:
+                for labels, amount in value:
+                    lines.append(f'{name}{_labels(labels)} {_number(amount)}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+안전한 파일 저장 (임시 파일 + 이름 바꾸기, 묶어서 쓰기)
+
+예전에는 저장할 파일을 'w' 모드로 열고 그 자리에서 바로 썼습니다.
+쓰는 도중에 서버가 죽으면 posts.json이나 users.json이 반쯤 잘린 채로 남습니다.
+
+여기서는 두 가지 방법으로 이 문제를 해결합니다.
+- atomic_write(): 같은 폴더의 임시 파일에 다 쓴 뒤 os.replace()로 이름을 바꿉니다.
+  이름 바꾸기는 한 번에 일어나므로, 파일은 항상 "예전 내용 전체" 아니면 "새 내용 전체"입니다.
+  fsync=True면 디스크에 실제로 기록될 때까지 기다립니다. (전원이 나가도 안전, 대신 느림)
+- GroupCommitWriter: 짧은 시간(window) 안에 같은 파일에 들어온 저장 요청들을 모아서
+  가장 마지막 내용만 한 번 씁니다. 요청한 쪽은 자기 내용이 포함된 쓰기가 끝날 때까지 기다립니다.
+  나중에 쓰기(write-behind) 모드에서는 기다리지 않고 바로 돌아가고,
+  백그라운드 스레드가 일정 시간마다(또는 저장 요청이 많이 쌓이면) 한꺼번에 씁니다.
+
+사용 예시:
+    writer = GroupCommitWriter(window=0.005, fsync=False)
+    writer.write('data/posts.json', data_bytes)   # 쓰기가 끝나면 True
+
+    writer.configure(write_behind=True)
+    writer.start_background()                      # 1초마다 쓰지 않은 내용을 파일에 씀
+    writer.write('data/posts.json', data_bytes)    # 바로 True (파일에는 나중에 씀)
+    writer.stop_background()                       # 남은 내용을 모두 쓰고 멈춤
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+
+# 저장 요청을 모으는 시간(초)
+# 0이면 기다리지 않고 바로 씀 (그래도 쓰는 동안 들어온 요청들은 다음 한 번에 묶임)
+WRITE_WINDOW = 0.005
+# 나중에 쓰기 모드: 이 시간(초)마다, 또는 저장 요청이 이만큼 쌓이면 파일에 씀
+FLUSH_INTERVAL = 1.0
+FLUSH_THRESHOLD = 100
+
+LOG = logging.getLogger('echochamber.persistence')
+
+
+def atomic_write(filepath, data, fsync=False):
+    """
+    파일 내용을 한 번에 바꿉니다. (쓰는 도중에 멈춰도 파일이 깨지지 않음)
+
+    입력:
+        filepath: 저장할 파일 경로
+        data: 저장할 내용 (바이트)
+        fsync: True면 디스크에 기록될 때까지 기다림
+
+    처리 과정:
+        1. 같은 폴더에 임시 파일(.posts.json.xxxx.tmp)을 만들어 내용을 씀
+        2. (fsync) 임시 파일을 디스크에 기록
+        3. os.replace()로 임시 파일의 이름을 원래 파일 이름으로 바꿈
+        4. (fsync) 이름이 바뀐 것도 디스크에 기록되도록 폴더를 기록
+    """
+    directory = os.path.dirname(filepath) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(filepath) + '.',
+                                     suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstemp는 나만 읽을 수 있는 권한(600)으로 만들므로, 원래 파일의 권한을 따름
+        try:
+            os.chmod(temp_path, os.stat(filepath).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        _fsync_directory(directory)
+
+
+def _fsync_directory(directory):
+    """폴더의 파일 목록(이름 바꾸기)을 디스크에 기록 (윈도우에서는 폴더를 열 수 없어 건너뜀)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _resolve(data):
+    """저장할 내용이 함수면 불러서 바이트를 만듦 (None이나 바이트는 그대로)"""
+    return data() if callable(data) else data
+
+
+class _Slot:
+    """파일 하나의 저장 대기 상태"""
+
+    def __init__(self):
+        self.data = None       # 아직 쓰지 않은 가장 최근 내용
+        self.finish = None     # 쓰기 직전에 내용에 적용할 함수 (없으면 None)
+        self.inflight = None   # 지금 쓰는 중인 내용 (쓰는 동안 읽는 쪽에 보여줄 값)
+        self.submitted = 0     # 지금까지 들어온 저장 요청 번호
+        self.committed = 0     # 파일에 쓴 마지막 요청 번호
+        self.writing = False   # 누군가 이 파일을 쓰는 중인지
+        self.error = None      # 마지막 쓰기에서 난 오류 (없으면 None)
+        self.mtime = None      # 마지막으로 쓴 파일의 수정 시간 (밖에서 바뀌었는지 token()이 비교)
+
+
+class GroupCommitWriter:
+    """
+    같은 파일에 대한 저장 요청을 묶어서 한 번에 쓰는 저장기
+
+    처리 방식:
+        - 저장 요청마다 번호를 매기고 "가장 최근 내용"만 보관합니다.
+        - 그 파일을 쓰는 스레드가 없으면, 요청한 스레드가 대표가 되어 window초 기다린 뒤
+          그때까지 모인 가장 최근 내용을 한 번 씁니다.
+        - 다른 요청들은 자기 번호까지 쓰기가 끝나면 같은 결과를 돌려받습니다.
+        - 쓰는 도중에 들어온 요청은 다음 대표가 다시 모아서 씁니다.
+        - 나중에 쓰기(write_behind) 모드에서는 내용만 보관하고 바로 돌아갑니다.
+          백그라운드 스레드(start_background)가 flush_interval초마다,
+          또는 저장 요청이 flush_threshold개 쌓이면 보관한 내용을 씁니다.
+          아직 쓰지 않은 내용은 pending()으로 읽을 수 있습니다.
+
+    window와 fsync로 응답 시간과 안전성 사이를 고릅니다.
+        window=0, fsync=False  : 가장 빠름 (서버가 죽어도 파일은 안 깨지지만, 전원이 나가면 최근 내용이 사라질 수 있음)
+        window=0.005, fsync=True: 5ms 안의 요청들을 모아 한 번만 디스크에 기록 (전원이 나가도 안전)
+        write_behind=True      : 응답이 디스크를 기다리지 않음 (서버가 죽으면 마지막 flush_interval초의 변경이 사라질 수 있음)
+    """
+
+    def __init__(self, window=WRITE_WINDOW, fsync=False, write_behind=False,
+                 flush_interval=FLUSH_INTERVAL, flush_threshold=FLUSH_THRESHOLD):
+        self.window = window
+        self.fsync = fsync
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._slots = {}
+        self._cond = threading.Condition()
+        # 나중에 쓰기 모드에서 마지막으로 쓴 뒤에 들어온 저장 요청 수
+        self._dirty = 0
+        self._flusher = None
+        self._stopping = False
+        # 실제로 파일을 쓴 횟수와 저장 요청 횟수 (얼마나 묶였는지 확인용)
+        self.writes = 0
+        self.requests = 0
+
+    def configure(self, window=None, fsync=None, write_behind=None, flush_interval=None, flush_threshold=None):
+        """설정을 바꿉니다. (None이면 그대로)"""
+        if window is not None:
+            self.window = window
+        if fsync is not None:
+            self.fsync = fsync
+        if write_behind is not None:
+            self.write_behind = write_behind
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+        if flush_threshold is not None:
+            self.flush_threshold = flush_threshold
+
+    def write(self, filepath, data, finish=None, wait=False):
+        """
+        파일에 내용을 저장합니다.
+
+        입력:
+            filepath: 저장할 파일 경로
+            data: 저장할 내용 (바이트, 또는 파일에 쓸 때 바이트를 만드는 함수)
+                  함수를 넘기면 묶인 저장 요청들 중 마지막 것만 쓸 때 한 번 부르므로,
+                  정렬처럼 비싼 일을 파일에 실제로 쓸 때까지 미룰 수 있습니다. (잠금 밖에서 부름)
+            finish: 파일에 쓰기 직전에 내용을 바꿀 함수 (예: 들여쓰기, 쓰는 스레드에서 실행)
+            wait: True면 나중에 쓰기 모드에서도 파일에 쓸 때까지 기다림
+
+        출력: 이 내용(또는 더 최근 내용)이 파일에 쓰이면 True
+              (나중에 쓰기 모드에서는 보관하자마자 True)
+              쓰기에 실패하면 그 오류를 그대로 일으킴
+        """
+        key = os.path.abspath(filepath)
+        with self._cond:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = _Slot()
+            slot.submitted += 1
+            number = slot.submitted
+            slot.data = data
+            slot.finish = finish
+            self.requests += 1
+            if self.write_behind and not wait:
+                self._dirty += 1
+                if self._dirty >= self.flush_threshold:
+                    # 요청이 많이 쌓였으면 백그라운드 스레드를 깨워서 바로 쓰게 함
+                    self._cond.notify_all()
+                return True
+            while slot.committed < number:
+                if not slot.writing:
+                    slot.writing = True
+                    break
+                self._cond.wait()
+            else:
+                # 다른 스레드가 내 내용(또는 더 최근 내용)을 써 줌
+                if slot.error is not None:
+                    raise slot.error
+                return True
+        # 내가 대표: 잠깐 기다려서 요청을 모은 뒤 가장 최근 내용을 씀
+        try:
+            if self.window > 0:
+                time.sleep(self.window)
+        finally:
+            error = self._commit(key, slot)
+        if error is not None:
+            raise error
+        return True
+
+    def _commit(self, key, slot):
+        """
+        (slot.writing을 잡은 스레드가 호출) 보관한 가장 최근 내용을 파일에 씁니다.
+        출력: 난 오류 (성공하면 None)
+        """
+        with self._cond:
+            data, finish, number = slot.data, slot.finish, slot.submitted
+            slot.data = slot.finish = None
+            slot.inflight = data
+        error = None
+        mtime = None
+        try:
+            if data is not None:
+                content = _resolve(data)
+                atomic_write(key, finish(content) if finish is not None else content, self.fsync)
+                mtime = os.stat(key).st_mtime_ns
+        except Exception as e:
+            error = e
+        finally:
+            with self._cond:
+                slot.inflight = None
+                if mtime is not None:
+                    slot.mtime = mtime
+                if error is not None and self.write_behind and slot.data is None:
+                    # 나중에 쓰기 모드에서는 기다리는 쪽이 없으므로 다음 번에 다시 시도
+                    slot.data, slot.finish = data, finish
+                slot.committed = number
+                slot.error = error
+                slot.writing = False
+                self.writes += 1
+                self._cond.notify_all()
+        return error
+
+    def pending(self, filepath):
+        """
+        아직 파일에 쓰지 않은(또는 쓰는 중인) 가장 최근 내용 (없으면 None)
+        파일을 읽기 전에 확인하면 방금 저장한 내용을 읽을 수 있습니다.
+        """
+        with self._cond:
+            slot = self._slots.get(os.path.abspath(filepath))
+            if slot is None:
+                return None
+            data = slot.data if slot.data is not None else slot.inflight
+        return _resolve(data)
+
+    def token(self, filepath):
+        """
+        파일이 바뀌었는지 확인하는 값
+        - 이 저장기로 저장한 내용이면 ('saved', 요청 번호)
+          (아직 쓰지 않았든 이미 파일에 썼든 같은 값이라서, 백그라운드에서 파일에 쓴 뒤에도
+          저장한 쪽이 자기 저장을 밖에서 바뀐 것으로 오해하지 않음)
+        - 그 뒤에 다른 프로그램이 파일을 바꿨거나 이 저장기로 저장한 적이 없으면 파일의 수정 시간
+        - 파일이 없으면 None
+        """
+        with self._cond:
+            slot = self._slots.get(os.path.abspath(filepath))
+            if slot is not None and (slot.data is not None or slot.inflight is not None):
+                return ('saved', slot.submitted)
+            written = (slot.mtime, slot.submitted) if slot is not None else (None, None)
+        try:
+            mtime = os.stat(filepath).st_mtime_ns
+        except OSError:
+            return None
+        if written[0] is not None and mtime == written[0]:
+            return ('saved', written[1])
+        return mtime
+
+    def flush(self):
+        """
+        보관만 하고 아직 쓰지 않은 내용을 모두 지금 파일에 씁니다.
+        출력: 쓰기에 실패한 파일 수 (실패한 내용은 다음 flush()에서 다시 시도)
+        """
+        with self._cond:
+            keys = [key for key, slot in self._slots.items() if slot.data is not None]
+            self._dirty = 0
+        failed = 0
+        for key in keys:
+            with self._cond:
+                slot = self._slots[key]
+                while slot.writing:
+                    self._cond.wait()
+                if slot.data is None:
+                    continue
+                slot.writing = True
+            error = self._commit(key, slot)
+            if error is not None:
+                LOG.error("파일 저장 오류: %s", error)
+                failed += 1
+        return failed
+
+    # ----------------------------------------
+    # 백그라운드 저장 스레드 (나중에 쓰기 모드)
+    # ----------------------------------------
+
+    def start_background(self):
+        """flush_interval초마다, 또는 저장 요청이 flush_threshold개 쌓이면 flush()하는 스레드를 시작합니다."""
+        if self._flusher is not None:
+            return
+        self._stopping = False
+
+        def loop():
+            while True:
+                with self._cond:
+                    deadline = time.monotonic() + self.flush_interval
+                    while not self._stopping and self._dirty < self.flush_threshold:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    stopping = self._stopping
+                self.flush()
+                if stopping:
+                    return
+
+        self._flusher = threading.Thread(target=loop, name="file-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop_background(self):
+        """백그라운드 스레드를 멈춥니다. (멈추기 전에 남은 내용을 모두 씀)"""
+        if self._flusher is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify_all()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
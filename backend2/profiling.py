@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+요청 프로파일링 (cProfile)
+
+/api/action이 느려졌을 때 시간이 어디에 쓰이는지(파일 읽기? 영향값 계산? 저장? 리더보드?)
+알아보려고, 일부 요청을 cProfile로 감싸서 함수별 실행 시간을 경로별로 모읍니다.
+
+- 켜는 방법: 환경 변수 ECHOCHAMBER_PROFILE 또는 python3 server.py --profile
+    0.05    : 요청의 5%를 무작위로 골라 측정
+    header  : X-Profile: 1 헤더를 보낸 요청만 측정
+  (숫자로 켜도 X-Profile: 1 헤더를 보낸 요청은 항상 측정)
+- 꺼져 있으면 미들웨어 자체를 경로 표에 넣지 않으므로 요청 처리에 아무 비용이 없습니다.
+- cProfile은 한 번에 하나만 켤 수 있으므로, 다른 요청을 측정하는 중이면 그 요청은 건너뜁니다.
+
+결과 보기:
+    GET /api/debug/profile                           # 경로별 요약 (누적 시간순 상위 30개)
+    GET /api/debug/profile?route=/api/action&sort=tottime&limit=50
+    GET /api/debug/profile?format=prof               # .prof 파일 (python3 -m pstats, snakeviz 등으로 열기)
+    서버를 종료하면 data/profiles/ 폴더에 경로별 .prof 파일을 남깁니다.
+"""
+
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import threading
+
+# 요약을 정렬할 수 있는 기준
+SORT_KEYS = ('cumulative', 'tottime', 'calls', 'name')
+
+
+def parse_setting(value):
+    """
+    ECHOCHAMBER_PROFILE / --profile 값 -> 표본 비율 (꺼져 있으면 None)
+        '' 또는 None -> None, 'header' -> 0.0, '0.05' -> 0.05
+    """
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ('', '0', 'off', 'false'):
+        return None
+    if value == 'header':
+        return 0.0
+    rate = float(value)
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"표본 비율은 0~1 사이여야 합니다: {value}")
+    return rate
+
+
+def _file_name(route):
+    """'/api/posts/{id:int}' -> 'api_posts_id_int.prof'"""
+    name = ''.join(ch if ch.isalnum() else '_' for ch in route).strip('_')
+    while '__' in name:
+        name = name.replace('__', '_')
+    return (name or 'root') + '.prof'
+
+
+class RequestProfiler:
+    """
+    경로별 cProfile 결과 모음
+
+    사용 예시:
+        profiler = RequestProfiler(sample_rate=0.05)
+        if profiler.should_profile(requested=False):
+            profiler.run('/api/action', lambda: handle(request))
+        print(profiler.summary('/api/action'))
+    """
+
+    def __init__(self, sample_rate=0.0):
+        self.sample_rate = sample_rate
+        self._active = threading.Lock()   # 지금 측정 중인 요청 (한 번에 하나)
+        self._lock = threading.Lock()     # 결과 모음 보호
+        self._stats = {}                  # 경로 -> pstats.Stats
+        self._counts = {}                 # 경로 -> 측정한 요청 수
+
+    def should_profile(self, requested):
+        """이번 요청을 측정할지 (requested: X-Profile 헤더로 요청했는지)"""
+        return requested or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def run(self, route, call):
+        """
+        call()을 cProfile로 감싸서 실행하고 결과를 route에 더합니다.
+        다른 요청을 측정하는 중이면 그냥 실행합니다.
+        """
+        if not self._active.acquire(blocking=False):
+            return call()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                return call()
+            finally:
+                profile.disable()
+        finally:
+            self._active.release()
+            self._record(route, profile)
+
+    def _record(self, route, profile):
+        with self._lock:
+            stats = self._stats.get(route)
+            if stats is None:
+                self._stats[route] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+            self._counts[route] = self._counts.get(route, 0) + 1
+
+    def routes(self):
+        """측정한 경로들과 요청 수 [(경로, 수), ...]"""
+        with self._lock:
+            return sorted(self._counts.items())
+
+    def _merged(self, route=None):
+        """경로 하나(또는 전체)의 결과를 합친 새 pstats.Stats (결과가 없으면 None)"""
+        with self._lock:
+            selected = [self._stats[route]] if route in self._stats else (
+                list(self._stats.values()) if route is None else [])
+            if not selected:
+                return None
+            merged = pstats.Stats(stream=io.StringIO())
+            for stats in selected:
+                merged.add(stats)
+        return merged
+
+    def summary(self, route=None, sort='cumulative', limit=30):
+        """
+        측정 결과를 정렬한 글로 만듭니다.
+
+        입력:
+            route: 경로 (None이면 경로마다 하나씩)
+            sort: SORT_KEYS 중 하나
+            limit: 경로마다 보여줄 함수 수
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"정렬 기준은 {', '.join(SORT_KEYS)} 중 하나여야 합니다.")
+        out = io.StringIO()
+        routes = self.routes() if route is None else [(r, n) for r, n in self.routes() if r == route]
+        if not routes:
+            out.write("측정한 요청이 없습니다.\n")
+        for name, count in routes:
+            stats = self._merged(name)
+            if stats is None:
+                continue
+            out.write(f"===== {name} (요청 {count}개) =====\n")
+            stats.stream = out
+            stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def prof_bytes(self, route=None):
+        """.prof 파일 내용 (pstats.Stats(파일)로 읽을 수 있음, 결과가 없으면 None)"""
+        stats = self._merged(route)
+        if stats is None:
+            return None
+        return marshal.dumps(stats.stats)
+
+    def dump(self, directory):
+        """경로별 결과를 directory/<경로>.prof 파일로 저장하고, 저장한 파일 경로들을 돌려줍니다."""
+        paths = []
+        for route, _ in self.routes():
+            data = self.prof_bytes(route)
+            if data is None:
+                continue
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, _file_name(route))
+            with open(path, 'wb') as f:
+                f.write(data)
+            paths.append(path)
+        return paths
+
+    def reset(self):
+        """모은 결과를 모두 지웁니다."""
+        with self._lock:
+            self._stats.clear()
+            self._counts.clear()
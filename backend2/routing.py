@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+경로 표 (라우터)와 미들웨어
+
+요청마다 if/elif를 위에서부터 하나씩 비교하는 대신,
+서버를 시작할 때 (메서드, 경로) -> 처리 함수 표를 한 번 만들어 둡니다.
+- 고정 경로('/api/posts')는 딕셔너리에서 바로 찾습니다. (경로가 많아져도 O(1))
+- 경로 매개변수가 있는 경로('/api/posts/{id}')는 정규식으로 미리 바꿔 두고,
+  고정 경로에서 못 찾았을 때만 차례로 비교합니다.
+
+미들웨어(middleware)는 처리 함수 앞뒤에 끼워 넣는 공통 작업입니다. (시간 재기, 압축 고르기, 인증 확인 등)
+    def timing(handler, route, call_next):
+        start = time.perf_counter()
+        call_next(handler)                 # 다음 미들웨어 (마지막이면 처리 함수)
+        print(time.perf_counter() - start)
+경로를 등록할 때 미들웨어들을 처리 함수에 미리 감싸 두므로, 요청마다 목록을 다시 훑지 않습니다.
+
+사용 예시:
+    router = Router(call_endpoint, middlewares=[timing])
+    router.add('GET', '/api/posts/{id:int}', GameHandler.handle_get_post)
+    route, params = router.match('GET', '/api/posts/3')   # params == {'id': 3}
+    route.run(handler)
+"""
+
+import re
+
+# 경로 매개변수 모양: {이름} 또는 {이름:int}
+_PARAM_PATTERN = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)(?::(int|str))?\}')
+_CONVERTERS = {
+    'int': (r'-?\d+', int),
+    'str': (r'[^/]+', str),
+}
+
+
+class Route:
+    """
+    경로 하나: 메서드 + 경로 모양 + 처리 함수 + 설정
+
+    options는 미들웨어가 읽는 설정입니다. (예: body=True면 요청 본문을 처리 함수에 넘김)
+    """
+
+    def __init__(self, method, pattern, endpoint, options):
+        self.method = method
+        self.pattern = pattern
+        self.endpoint = endpoint
+        self.options = options
+        self.regex = None
+        self.converters = {}
+        self.run = None   # 미들웨어로 감싼 처리 함수 (Router.add가 만듦)
+        if _PARAM_PATTERN.search(pattern):
+            self.regex, self.converters = _compile(pattern)
+
+    def __repr__(self):
+        return f"Route({self.method} {self.pattern})"
+
+
+def _compile(pattern):
+    """'/api/posts/{id:int}' -> (정규식, {'id': int})"""
+    converters = {}
+    regex = ''
+    position = 0
+    for match in _PARAM_PATTERN.finditer(pattern):
+        name, kind = match.group(1), match.group(2) or 'str'
+        piece, convert = _CONVERTERS[kind]
+        regex += re.escape(pattern[position:match.start()]) + f'(?P<{name}>{piece})'
+        converters[name] = convert
+        position = match.end()
+    regex += re.escape(pattern[position:])
+    return re.compile(regex + r'\Z'), converters
+
+
+class Router:
+    """
+    (메서드, 경로) -> Route 표
+
+    입력:
+        call_endpoint: (handler, route) -> 처리 함수를 실제로 부르는 함수
+                       (요청 본문, 경로 매개변수를 어떻게 넘길지 서버가 정함)
+        middlewares: 바깥쪽부터 차례로 감쌀 미들웨어 목록
+    """
+
+    def __init__(self, call_endpoint, middlewares=()):
+        self._call_endpoint = call_endpoint
+        self._middlewares = list(middlewares)
+        self._static = {}        # (메서드, 경로) -> Route
+        self._dynamic = []       # 경로 매개변수가 있는 Route들 (등록한 순서대로)
+        self._methods = {}       # 고정 경로 -> 허용 메서드 목록 (405 응답용)
+
+    def add(self, method, pattern, endpoint, **options):
+        """경로를 등록하고 미들웨어로 감싼 실행 함수를 미리 만듭니다."""
+        route = Route(method, pattern, endpoint, options)
+        route.run = self._build(route)
+        if route.regex is None:
+            if (method, pattern) in self._static:
+                raise ValueError(f"이미 등록된 경로: {method} {pattern}")
+            self._static[(method, pattern)] = route
+            self._methods.setdefault(pattern, []).append(method)
+        else:
+            self._dynamic.append(route)
+        return route
+
+    def set_middlewares(self, middlewares):
+        """미들웨어 목록을 바꾸고, 등록된 모든 경로의 실행 함수를 다시 만듭니다. (서버 시작 전에 호출)"""
+        self._middlewares = list(middlewares)
+        for route in self.routes():
+            route.run = self._build(route)
+
+    def _build(self, route):
+        """미들웨어를 안쪽(마지막)부터 감싸서 route.run(handler) 하나로 만듭니다."""
+        call_endpoint = self._call_endpoint
+
+        def endpoint(handler):
+            return call_endpoint(handler, route)
+
+        call = endpoint
+        for middleware in reversed(self._middlewares):
+            call = _wrap(middleware, route, call)
+        return call
+
+    def match(self, method, path):
+        """
+        요청에 맞는 경로를 찾습니다.
+
+        출력: (Route, 경로 매개변수 딕셔너리) 또는 None
+        """
+        route = self._static.get((method, path))
+        if route is not None:
+            return route, {}
+        for route in self._dynamic:
+            if route.method != method:
+                continue
+            found = route.regex.match(path)
+            if found is not None:
+                params = {name: route.converters[name](value) for name, value in found.groupdict().items()}
+                return route, params
+        return None
+
+    def allowed_methods(self, path):
+        """이 경로에 등록된 메서드들 (경로 자체가 없으면 빈 리스트)"""
+        methods = list(self._methods.get(path, ()))
+        for route in self._dynamic:
+            if route.method not in methods and route.regex.match(path):
+                methods.append(route.method)
+        return methods
+
+    def routes(self):
+        """등록된 모든 경로"""
+        return list(self._static.values()) + list(self._dynamic)
+
+
+def _wrap(middleware, route, call_next):
+    def call(handler):
+        return middleware(handler, route, call_next)
+    return call
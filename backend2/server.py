@@ -8,24 +8,91 @@ EchoChamber 게임 백엔드 서버 - 교육용 버전
 각 함수에 상세한 설명이 있으니 차근차근 따라해보세요.
 """
 
-import json
+import argparse
+import copy
+import hmac
+import logging
 import os
+import queue
+import selectors
+import signal
+import socket
+import threading
+import time
 from datetime import datetime
 from http.server import BaseHTTPRequestHandler, HTTPServer
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
+
+import codec
+from catalog import POST_FIELDS, PostCatalog
+from compression import MIN_SIZE, CompressionCache, choose_encoding, compress, compress_stream
+from engine import ACTION_CODES, METRICS, ImpactEngine
+from leaderboard import Leaderboard
+from logs import LEVELS as LOG_LEVELS
+from logs import ACCESS_LOGGER, APP_LOGGER, dropped_count, start_logging, stop_logging
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from metrics import Metrics
+from persistence import FLUSH_INTERVAL, WRITE_WINDOW, GroupCommitWriter
+from profiling import SORT_KEYS, RequestProfiler, parse_setting
+from routing import Router
+from sessions import DEFAULT_SESSION_ID, SessionStore, is_valid_session_id
+from solver import HINT_BUILDING, HINT_READY, HintSolver
+from storage import JsonStorage, SqliteStorage, migrate, state_documents
+from streaming import chunked, iter_json_array
+from traffic import ResponseTee, TrafficRecorder
+from users import UserDirectory
 
 # ============================================
 # 데이터 파일 경로 설정
 # ============================================
 # os.path.dirname(__file__): 현재 파일이 있는 폴더 경로
 # os.path.join(): 경로를 안전하게 합치기 (윈도우/맥 모두 작동)
-DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+# 환경 변수 ECHOCHAMBER_DATA_DIR로 다른 폴더를 쓸 수 있습니다. (부하 테스트가 임시 데이터로 서버를 켤 때 등)
+DATA_DIR = os.environ.get('ECHOCHAMBER_DATA_DIR') or os.path.join(os.path.dirname(__file__), 'data')
 GAME_STATE_FILE = os.path.join(DATA_DIR, 'game-state.json')
 POSTS_FILE = os.path.join(DATA_DIR, 'posts.json')
 USERS_FILE = os.path.join(DATA_DIR, 'users.json')
 LEADERBOARD_FILE = os.path.join(DATA_DIR, 'leaderboard.json')
+SESSIONS_DIR = os.path.join(DATA_DIR, 'sessions')  # 플레이어별 게임 상태 파일 폴더
+DEFAULT_DB_FILE = os.path.join(DATA_DIR, 'echochamber.db')  # --storage sqlite일 때 데이터베이스
+PROFILES_DIR = os.path.join(DATA_DIR, 'profiles')  # 요청 프로파일링 결과(.prof) 폴더
+ACCESS_LOG_FILE = os.path.join(DATA_DIR, 'access.log')  # 접속 기록 (요청마다 한 줄)
 check_FILE = False
 
+# POST /api/actions/batch 한 번에 보낼 수 있는 최대 결정 수
+MAX_BATCH_ACTIONS = 1000
+
+# ETag 앞부분 (서버를 켤 때마다 달라짐)
+# 버전 번호는 서버를 다시 켜면 1부터 다시 세므로, 예전 서버가 준 ETag와 겹치지 않게 붙입니다.
+ETAG_PREFIX = format(time.time_ns(), 'x')
+
+# HTTP/1.1 연결 유지(keep-alive) 설정
+# REQUEST_TIMEOUT: 요청 하나를 다 받을 때까지 기다리는 최대 시간(초)
+# KEEP_ALIVE_TIMEOUT: 응답을 보낸 뒤 다음 요청이 없으면 연결을 닫기까지의 시간(초)
+REQUEST_TIMEOUT = 30
+KEEP_ALIVE_TIMEOUT = 15
+
+# GET /api/posts?cursor=&limit= 페이지 크기 (limit이 없을 때 기본값, 최대값)
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# 힌트 표를 만드는 중일 때 몇 초 뒤에 다시 요청하라고 알려줄지 (Retry-After 헤더)
+HINT_RETRY_AFTER = 5
+
+# 처리 시간이 이보다 오래 걸린 요청은 알려줌 (초)
+SLOW_REQUEST_SECONDS = 0.5
+
+# 게시글 관리(추가/수정/삭제) API의 관리자 토큰
+# 설정하면 X-Admin-Token 헤더가 같은 요청만 처리합니다. (비어 있으면 누구나 사용 가능)
+# 환경 변수 ECHOCHAMBER_ADMIN_TOKEN 또는 python3 server.py --admin-token 으로 설정
+ADMIN_TOKEN = os.environ.get('ECHOCHAMBER_ADMIN_TOKEN', '')
+
+# 로그 (logs.py): print() 대신 사용
+# LOG는 서버 로그(오류, 느린 요청, DEBUG 단계의 디버그 내용), ACCESS_LOG는 요청마다 남기는 접속 기록입니다.
+# run_server가 start_logging()으로 큐에 넣고 백그라운드 스레드에서 쓰도록 설정합니다.
+LOG = logging.getLogger(APP_LOGGER)
+ACCESS_LOG = logging.getLogger(ACCESS_LOGGER)
+
 # ============================================
 # 기본 게임 상태 (게임 시작 시 초기값)
 # ============================================
@@ -41,6 +108,41 @@ DEFAULT_GAME_STATE = {
     "endings": []
 }
 
+# 기본 게임 상태와 리셋 응답은 바뀌지 않으므로 JSON 바이트로 한 번만 만들어 두고 재사용
+DEFAULT_STATE_BODY = codec.dumps(DEFAULT_GAME_STATE)
+RESET_BODY = codec.dumps({"success": True, "gameState": DEFAULT_GAME_STATE})
+
+
+# ============================================
+# 파일 잠금 (여러 요청을 동시에 처리할 때 필요)
+# ============================================
+# 작업자 스레드 여러 개가 같은 파일을 동시에 읽고 쓰면
+# 반쯤 쓰인 파일을 읽거나, 다른 요청의 변경을 덮어쓸 수 있습니다.
+# 파일마다 잠금(lock)을 하나씩 두고, 읽기/쓰기와 "읽고-고치고-저장"을
+# 잠금 안에서 하도록 합니다.
+_FILE_LOCKS = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+
+def file_lock(filepath):
+    """
+    파일 경로에 해당하는 잠금을 돌려줍니다. (같은 경로면 항상 같은 잠금)
+
+    사용 예시:
+        with file_lock(GAME_STATE_FILE):
+            game_state = load_json_file(GAME_STATE_FILE, {})
+            game_state['day'] += 1
+            save_json_file(GAME_STATE_FILE, game_state)
+    """
+    key = os.path.abspath(filepath)
+    with _FILE_LOCKS_GUARD:
+        lock = _FILE_LOCKS.get(key)
+        if lock is None:
+            # RLock: 같은 스레드가 잠금을 여러 번 잡아도 멈추지 않음
+            lock = threading.RLock()
+            _FILE_LOCKS[key] = lock
+        return lock
+
 
 # ============================================
 # 유틸리티 함수: JSON 파일 읽기/쓰기
@@ -63,10 +165,14 @@ def load_json_file(filepath, default=None):
         posts = load_json_file('data/posts.json', [])  # 파일 없으면 빈 리스트 반환
     """
     try:
-        # 파일 열기: 'r'은 읽기 모드, encoding='utf-8'은 한글이 깨지지 않게
-        with open(filepath, 'r', encoding='utf-8') as f:
-            # json.load(f): 파일의 JSON 내용을 파이썬 딕셔너리/리스트로 변환
-            return json.load(f)
+        # 저장했지만 아직 파일에 쓰지 않은 내용이 있으면 그것을 읽기 (아래 "파일 저장기" 참고)
+        pending = WRITER.pending(filepath)
+        if pending is not None:
+            return codec.loads(pending)
+        # 파일 열기: 'rb'는 바이트로 읽기 모드 (UTF-8 바이트를 문자열로 바꾸지 않고 바로 변환)
+        with file_lock(filepath), open(filepath, 'rb') as f:
+            # codec.loads(): 파일의 JSON 내용을 파이썬 딕셔너리/리스트로 변환
+            return codec.loads(f.read())
     except FileNotFoundError:
         # 파일이 없을 때
         if default is not None:
@@ -74,17 +180,19 @@ def load_json_file(filepath, default=None):
         return None
     except Exception as e:
         # 다른 오류가 발생했을 때
-        print(f"파일 읽기 오류: {e}")
+        LOG.error("파일 읽기 오류: %s", e)
         return None
 
 
-def save_json_file(filepath, data):
+def save_json_file(filepath, data, wait=False):
     """
     JSON 파일에 데이터를 저장합니다.
     
     입력:
         filepath: 저장할 파일의 경로 (예: 'data/game-state.json')
-        data: 저장할 데이터 (파이썬 딕셔너리나 리스트)
+        data: 저장할 데이터 (파이썬 딕셔너리나 리스트, 또는 파일에 쓸 때 데이터를 만드는 함수)
+              함수를 넘기면 변환을 파일에 실제로 쓸 때까지 미룸 (여러 번 저장해도 한 번만 변환)
+        wait: True면 나중에 쓰기 모드에서도 파일에 다 쓸 때까지 기다림
     
     출력:
         성공하면: True
@@ -95,22 +203,190 @@ def save_json_file(filepath, data):
         save_json_file('data/game-state.json', game_state)
     """
     try:
-        # 폴더가 없으면 만들어주기
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        
-        # 파일 열기: 'w'는 쓰기 모드, encoding='utf-8'은 한글이 깨지지 않게
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # json.dump(): 파이썬 딕셔너리/리스트를 JSON 형식으로 변환해서 파일에 저장
-            # ensure_ascii=False: 한글이 깨지지 않게
-            # indent=2: 들여쓰기 2칸 (보기 좋게)
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
+        if callable(data):
+            # 정렬 같은 일은 저장기가 파일에 실제로 쓸 때 한 번만 (여러 저장이 묶이면 마지막 것만)
+            encode = codec.dumps_pretty if PRETTY_JSON else codec.dumps
+            return WRITER.write(filepath, lambda: encode(data()), wait=wait)
+        # codec.dumps(): 파이썬 딕셔너리/리스트를 한 줄 JSON 바이트로 변환 (한글은 그대로 UTF-8로)
+        content = codec.dumps(data)
+        if WRITER.write_behind and not wait:
+            # 나중에 쓰기 모드: 지금 내용을 빠르게 바이트로 찍어 두고 바로 돌아감
+            # (--pretty-json이면 느린 들여쓰기는 백그라운드 스레드가 파일에 쓰기 직전에 함)
+            return WRITER.write(filepath, content, finish=indent_json if PRETTY_JSON else None)
+        if PRETTY_JSON:
+            # 들여쓰기 2칸 (사람이 읽기 좋게, 파일이 커지고 느려짐)
+            content = codec.dumps_pretty(data)
+        # 임시 파일에 쓴 뒤 이름을 바꿔서 저장 (쓰는 도중에 멈춰도 파일이 깨지지 않음)
+        # 짧은 시간 안에 같은 파일에 들어온 저장은 묶어서 한 번만 씀 (아래 "파일 저장기" 참고)
+        return WRITER.write(filepath, content, wait=wait)
     except Exception as e:
         # 오류가 발생했을 때
-        print(f"파일 저장 오류: {e}")
+        LOG.error("파일 저장 오류: %s", e)
         return False
 
 
+# ============================================
+# 파일 저장기 (save_json_file이 사용)
+# ============================================
+# window: 저장 요청을 모으는 시간(초), fsync: 디스크에 기록될 때까지 기다릴지
+# python3 server.py --write-window 0 --fsync 처럼 실행할 때 바꿀 수 있습니다.
+# 서버를 실행하면 나중에 쓰기(write-behind) 모드가 켜집니다. (run_server 참고)
+#   저장 요청은 메모리에 보관하고 바로 응답하며, 백그라운드 스레드가 1초마다 파일에 씁니다.
+#   아직 쓰지 않은 내용은 load_json_file()이 먼저 확인하므로 방금 저장한 내용을 읽을 수 있습니다.
+WRITER = GroupCommitWriter(window=WRITE_WINDOW, fsync=False)
+
+# True면 JSON 파일을 들여쓰기 2칸으로 저장 (python3 server.py --pretty-json)
+# 기본은 공백 없는 한 줄: 파일이 작고 저장이 빠름 (읽을 때는 python3 -m json.tool data/posts.json)
+PRETTY_JSON = False
+
+
+def indent_json(content):
+    """한 줄로 된 JSON 바이트를 들여쓰기 2칸으로 바꿉니다. (파일을 사람이 읽기 좋게)"""
+    return codec.reindent(content)
+
+
+def encode_json(data):
+    """응답 본문용 JSON 바이트 (한글은 그대로 UTF-8로, codec.py 참고)"""
+    return codec.dumps(data)
+
+
+def post_body(posts, post_id):
+    """
+    GET /api/posts/{id} 응답 본문 (게시글마다 한 번만 만들고 목록이 바뀔 때까지 재사용)
+
+    입력:
+        posts: 게시글 id -> 응답 바이트 (POST_CATALOG.derived로 받은, 목록이 바뀌면 새로 비는 딕셔너리)
+        post_id: 게시글 id
+    출력: 응답 바이트 (게시글이 없으면 None)
+    """
+    body = posts.get(post_id)
+    if body is None:
+        post = POST_CATALOG.get(post_id)
+        if post is None:
+            return None
+        # 여러 스레드가 동시에 만들어도 결과가 같으므로 잠금 없이 저장
+        body = posts[post_id] = encode_json({"success": True, "post": post})
+    return body
+
+
+def make_etag(kind, version):
+    """
+    응답의 ETag 값을 만듭니다. (데이터 종류 + 서버 실행 id + 버전)
+    예: '"posts-18c3f...-3"'
+    """
+    return f'"{kind}-{ETAG_PREFIX}-{version}"'
+
+
+# ============================================
+# 응답 압축 캐시
+# ============================================
+# 게시글 목록처럼 크고 자주 요청하는 응답은 ETag별로 압축한 결과를 보관해서 재사용합니다.
+COMPRESSED = CompressionCache(max_items=64)
+
+
+# ============================================
+# 서버 지표 (GET /api/metrics)
+# ============================================
+# 경로별 요청 수와 처리 시간은 timing_middleware가 기록합니다.
+# 아래의 값들은 지표를 읽어 갈 때만 계산합니다.
+TELEMETRY = Metrics()
+
+
+def data_file_sizes():
+    """data 폴더의 파일별 크기(바이트), 세션 폴더는 합계 하나로"""
+    sizes = []
+    with os.scandir(DATA_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and not entry.name.startswith('.'):
+                sizes.append(([('file', entry.name)], entry.stat().st_size))
+    total = 0
+    if os.path.isdir(SESSIONS_DIR):
+        with os.scandir(SESSIONS_DIR) as entries:
+            total = sum(entry.stat().st_size for entry in entries if entry.is_file())
+    sizes.append(([('file', 'sessions/')], total))
+    return sizes
+
+
+TELEMETRY.gauge('echochamber_data_file_bytes', "데이터 파일 크기(바이트)", data_file_sizes)
+TELEMETRY.gauge('echochamber_sessions_hot', "메모리에 올라와 있는 세션 수", lambda: SESSIONS.hot_count())
+TELEMETRY.gauge('echochamber_posts', "게시글 수", lambda: len(POST_CATALOG))
+TELEMETRY.gauge('echochamber_log_dropped', "로그 큐가 가득 차서 버린 로그 수", dropped_count)
+
+
+# ============================================
+# 저장소 (JSON 파일 / SQLite)
+# ============================================
+# 기본은 예전처럼 JSON 파일에 저장합니다.
+# python3 server.py --storage sqlite 로 실행하면 SQLite 데이터베이스(data/echochamber.db)에 저장합니다.
+# (데이터베이스 파일이 아직 없으면 처음 한 번 JSON 파일의 데이터를 옮겨옵니다)
+
+def json_storage():
+    """JSON 파일 저장소 (기본)"""
+    return JsonStorage(POSTS_FILE, USERS_FILE, LEADERBOARD_FILE, load_json_file, save_json_file, WRITER.token)
+
+
+def open_storage(kind='json', db_path=DEFAULT_DB_FILE):
+    """
+    저장소를 엽니다.
+    
+    입력:
+        kind: 'json' 또는 'sqlite'
+        db_path: SQLite 데이터베이스 파일 경로
+    """
+    if kind == 'json':
+        return json_storage()
+    if kind == 'sqlite':
+        first_time = not os.path.exists(db_path)
+        storage = SqliteStorage(db_path, DATA_DIR)
+        if first_time:
+            counts = migrate(json_storage(), storage, state_documents(GAME_STATE_FILE, SESSIONS_DIR))
+            LOG.info("JSON 파일의 데이터를 %s로 옮겼습니다: %s", db_path, counts)
+        return storage
+    raise ValueError(f"알 수 없는 저장소: {kind}")
+
+
+def configure_storage(storage):
+    """
+    저장소를 사용하는 전역 객체들(게시글 카탈로그, 리더보드, 사용자 목록, 세션, 힌트)을 만듭니다.
+    서버를 시작할 때 저장소를 바꾸면 다시 호출합니다.
+    """
+    global STORAGE, POST_CATALOG, LEADERBOARD, USERS, SESSIONS, HINTS
+    STORAGE = storage
+
+    # 게시글 카탈로그 (메모리 캐시)
+    # 요청마다 게시글을 다시 읽지 않도록 한 번 읽어서 메모리에 보관합니다.
+    # id로 바로 찾을 수 있고, 저장소가 밖에서 바뀌면 자동으로 다시 읽습니다.
+    POST_CATALOG = PostCatalog(storage)
+
+    # 리더보드 (메모리 힙)
+    # 상위 100개 기록을 메모리의 힙에 보관하고, 상위 10개 응답은 바이트로 미리 만들어 둡니다.
+    LEADERBOARD = Leaderboard(storage, capacity=100, top_n=10)
+
+    # 사용자 목록 (메모리 색인)
+    # 처음 한 번만 저장소에서 읽어서 username -> 사용자로 보관합니다.
+    # 로그인과 회원가입의 중복 확인이 사용자 수와 상관없이 바로 끝납니다.
+    USERS = UserDirectory(storage)
+
+    # 세션별 게임 상태 저장소
+    # 플레이어(세션)마다 게임 상태를 따로 보관합니다.
+    # 최근 사용한 세션은 메모리에 두고, 오래 안 쓴 세션은 스냅샷(data/sessions/)으로 내보냅니다.
+    # 게임 상태가 바뀌면 스냅샷 전체를 다시 쓰지 않고 바뀐 부분만 이벤트 로그(.log)에 덧붙이고,
+    # 로그가 100줄 넘게 쌓이면 백그라운드에서 스냅샷으로 합칩니다.
+    # 세션 id가 없는 요청은 'default' 세션(game-state.json + game-state.log)을 사용합니다.
+    # (SQLite 저장소에서는 스냅샷을 데이터베이스의 documents 테이블에 저장)
+    SESSIONS = SessionStore(SESSIONS_DIR, GAME_STATE_FILE, storage.load, storage.save,
+                            DEFAULT_GAME_STATE, max_hot=1000, idle_seconds=600, compact_every=100)
+
+    # 힌트 (최적 전략 표)
+    # 시작 상태에서 나올 수 있는 모든 상태의 최적 결정을 미리 계산해 둔 표입니다.
+    # 표를 만드는 데 시간이 오래 걸리므로 처음 힌트를 요청할 때 백그라운드에서 만들기 시작하고,
+    # 게시글이 바뀌면 다시 만듭니다.
+    HINTS = HintSolver(POST_CATALOG, tuple(DEFAULT_GAME_STATE[name] for name in METRICS))
+
+
+configure_storage(json_storage())
+
+
 # ============================================
 # HTTP 핸들러 클래스
 # ============================================
@@ -121,100 +397,220 @@ class GameHandler(BaseHTTPRequestHandler):
     클라이언트가 보낸 요청을 받아서 적절한 함수로 보내줍니다.
     """
     
+    # HTTP/1.1: 연결 하나로 요청을 여러 번 주고받음 (keep-alive)
+    # 그래서 모든 응답에 Content-Length(본문 길이)를 꼭 보내야 합니다.
+    # (길이를 모르면 브라우저가 응답이 어디서 끝나는지 알 수 없음)
+    protocol_version = 'HTTP/1.1'
+    # 요청 하나를 다 받을 때까지 기다리는 최대 시간(초)
+    timeout = REQUEST_TIMEOUT
+    # 헤더와 본문을 따로 보내므로, 연결을 유지할 때 작은 본문이 상대의 ACK를 기다리며
+    # 40ms씩 늦게 나가지 않도록 Nagle 알고리즘을 끔 (TCP_NODELAY)
+    disable_nagle_algorithm = True
+    # 응답 압축 방식 (compression_middleware가 요청마다 고름, None이면 압축하지 않음)
+    encoding = None
+    # 보낸 응답의 상태 코드 (지표 기록용)
+    status = None
+    
+    def handle(self):
+        """
+        연결 하나에서 요청을 차례로 처리합니다.
+        
+        동시 처리 서버(PooledHTTPServer)에서는 응답을 보낸 뒤 다음 요청을 기다리는 동안
+        작업자 스레드를 붙잡아 두지 않고, 연결을 서버에 맡겨서(park) 쉬게 합니다.
+        다음 요청이 도착하면 서버가 다시 작업자에게 넘겨줍니다.
+        요청을 하나씩 처리하는 기본 서버는 연결을 맡길 곳이 없으므로 요청마다 연결을 닫습니다.
+        """
+        self.parked = False
+        if getattr(self.server, 'park', None) is None:
+            # 다음 요청을 기다리는 동안 다른 플레이어가 모두 기다리게 되므로 HTTP/1.0처럼 동작
+            self.protocol_version = 'HTTP/1.0'
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            if self.protocol_version != 'HTTP/1.0' and not self.has_buffered_request():
+                self.parked = True
+                return
+            self.handle_one_request()
+    
+    def has_buffered_request(self):
+        """다음 요청이 이미 도착해서 읽기 버퍼에 들어 있는지 (기다리지 않고 확인)"""
+        self.request.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.request.settimeout(self.timeout)
+    
+    def finish(self):
+        super().finish()
+        if self.parked:
+            self.server.park(self.request, self.client_address)
+    
     def do_OPTIONS(self):
         """CORS 프리플라이트 요청 처리 (브라우저 보안 관련, 이 부분은 수정 안 해도 됨)"""
         self.send_response(200)
         self.send_cors_headers()
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
-    def send_cors_headers(self):
+    def send_response(self, code, message=None):
+        """응답 상태 줄 보내기 (지표에 쓰도록 상태 코드를 기억)"""
+        self.status = code
+        super().send_response(code, message)
+    
+    def send_cors_headers(self, content_type='application/json; charset=utf-8'):
         """CORS 헤더 추가 (브라우저에서 다른 서버로 요청 보낼 때 필요, 이 부분은 수정 안 해도 됨)"""
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Session-Id, X-Admin-Token, X-Profile, If-None-Match')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+        self.send_header('Content-Type', content_type)
     
-    def do_GET(self):
+    def send_etag_headers(self, etag):
+        """ETag 헤더 추가 (브라우저가 다음 요청 때 If-None-Match로 보내서 바뀌었는지 물어봄)"""
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+    
+    def send_json(self, data, status=200):
+        """JSON 응답 보내기 (상태 코드 + CORS 헤더 + 본문)"""
+        self.send_response(status)
+        self.send_cors_headers()
+        self.send_body(encode_json(data))
+    
+    def send_body(self, body, etag=None):
         """
-        GET 요청을 처리합니다.
-        클라이언트가 데이터를 요청할 때 사용됩니다.
+        헤더를 마무리하고 본문(바이트)을 보냅니다.
+        브라우저가 압축을 지원하고(Accept-Encoding) 본문이 MIN_SIZE 이상이면 압축해서 보냅니다.
+        etag가 있으면 압축한 결과를 보관해 두고, 내용이 같은 다음 응답에서 재사용합니다.
+        """
+        encoding = self.encoding if len(body) >= MIN_SIZE else None
+        if encoding is not None:
+            body = COMPRESSED.get(etag, encoding, body) if etag else compress(body, encoding)
+            self.send_header('Content-Encoding', encoding)
+        # 압축 여부가 Accept-Encoding에 따라 달라진다고 캐시에 알려주기
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_stream(self, chunks):
+        """
+        헤더를 마무리하고 본문을 조각(바이트)별로 보냅니다. (전체 길이를 미리 몰라도 됨)
+        - HTTP/1.1: chunked 전송 (연결은 계속 사용)
+        - HTTP/1.0: 본문이 끝나면 연결을 닫아서 끝을 알림
+        브라우저가 압축을 지원하면 조각을 이어서 압축하며 보냅니다.
+        """
+        encoding = self.encoding
+        if encoding is not None:
+            chunks = compress_stream(chunks, encoding)
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        if self.protocol_version == 'HTTP/1.1' and self.request_version == 'HTTP/1.1':
+            self.send_header('Transfer-Encoding', 'chunked')
+            chunks = chunked(chunks)
+        else:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(chunk)
+    
+    def send_not_modified(self, etag):
+        """
+        조건부 GET 처리: 요청의 If-None-Match가 지금 ETag와 같으면
+        본문 없이 304 (Not Modified)를 보냅니다.
         
-        처리 과정:
-        1. 요청한 경로 확인 (예: /api/game-state)
-        2. 경로에 맞는 함수 호출
-        3. 오류가 나면 404 (Not Found) 또는 500 (Server Error) 반환
+        출력: 304를 보냈으면 True (호출한 쪽은 바로 끝내면 됨)
         """
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path  # 예: '/api/game-state'
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(',')]
+        if '*' not in tags and etag not in tags and 'W/' + etag not in tags:
+            return False
+        self.send_response(304)
+        self.send_cors_headers()
+        self.send_etag_headers(etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        return True
+    
+    def get_session_id(self):
+        """
+        요청한 플레이어의 세션 id를 알아냅니다.
+        1. X-Session-Id 헤더
+        2. 주소의 ?session= 값 (예: /api/game-state?session=abc)
+        3. 둘 다 없으면 'default' (예전처럼 game-state.json 하나를 함께 사용)
         
-        try:
-            if path == '/api/game-state':
-                self.handle_get_game_state()
-            elif path == '/api/posts':
-                # TODO: handle_get_posts() 함수 호출
-                self.handle_get_posts()
-            elif path == '/api/auth/check':
-                # TODO: handle_get_auth_check() 함수 호출
-                self.handle_get_auth_check()
-            elif path == '/api/leaderboard':
-                # TODO: handle_get_leaderboard() 함수 호출
-                self.handle_get_leaderboard()
-            else:
-                # 경로를 찾을 수 없을 때
-                self.send_error(404, "Not Found")
-        except Exception as e:
-            print(f"GET 요청 처리 오류: {e}")
-            self.send_error(500, str(e))
+        출력: 세션 id (형식이 잘못되었으면 None)
+        """
+        session_id = self.headers.get('X-Session-Id')
+        if not session_id:
+            query = parse_qs(urlparse(self.path).query)
+            session_id = query.get('session', [DEFAULT_SESSION_ID])[0]
+        if not is_valid_session_id(session_id):
+            return None
+        return session_id
+    
+    def do_GET(self):
+        """GET 요청을 처리합니다. (클라이언트가 데이터를 요청할 때 사용)"""
+        self.dispatch('GET')
     
     def do_POST(self):
+        """POST 요청을 처리합니다. (클라이언트가 데이터를 보낼 때 사용)"""
+        self.dispatch('POST')
+    
+    def dispatch(self, method):
         """
-        POST 요청을 처리합니다.
-        클라이언트가 데이터를 보낼 때 사용됩니다.
+        요청을 경로 표(ROUTES, 아래 "경로 표" 참고)에서 찾아 처리 함수로 보냅니다.
         
         처리 과정:
-        1. 요청 본문 읽기 (클라이언트가 보낸 JSON 데이터)
-        2. 요청한 경로 확인 (예: /api/action)
-        3. 경로에 맞는 함수 호출
-        4. 오류가 나면 404 (Not Found) 또는 500 (Server Error) 반환
+        1. 경로 표에서 (메서드, 경로) 찾기
+           - 없는 경로면 요청 본문을 읽지 않고 바로 404 (다른 메서드로만 있는 경로면 405)
+        2. 요청 본문 읽기 (Content-Length: 클라이언트가 보낸 데이터의 크기)
+        3. 미들웨어(시간 재기 -> 세션 -> 인증 -> 압축 고르기)를 거쳐 처리 함수 호출
+        4. 오류가 나면 500 (Server Error) 반환
         """
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
+        path = urlparse(self.path).path  # 예: '/api/game-state'
+        self.status = None
+        found = ROUTES.match(method, path)
+        if found is None:
+            self.reject_route(path)
+            TELEMETRY.observe(method, '(unmatched)', self.status, 0.0)
+            return
+        self.route, self.path_params = found
         
         try:
-            # 요청 본문 읽기
-            # Content-Length: 클라이언트가 보낸 데이터의 크기
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length)  # 실제 데이터 읽기
-            
-            if path == '/api/game-state':
-                self.handle_post_game_state(body)
-            elif path == '/api/action':
-                # TODO: handle_post_action(body) 함수 호출
-                self.handle_post_action(body)
-            elif path == '/api/reset':
-                # TODO: handle_post_reset() 함수 호출
-                self.handle_post_reset()
-            elif path == '/api/posts/update':
-                # TODO: handle_post_update_post(body) 함수 호출
-                self.handle_post_update_post(body)
-            elif path == '/api/posts/create':
-                # TODO: handle_post_create_post(body) 함수 호출
-                self.handle_post_create_post(body)
-            elif path == '/api/posts/delete':
-                # TODO: handle_post_delete_post(body) 함수 호출
-                self.handle_post_delete_post(body)
-            elif path == '/api/auth/register':
-                # TODO: handle_post_register(body) 함수 호출
-                self.handle_post_register(body)
-            elif path == '/api/auth/login':
-                # TODO: handle_post_login(body) 함수 호출
-                self.handle_post_login(body)
-            else:
-                # 경로를 찾을 수 없을 때
-                self.send_error(404, "Not Found")
+            self.body = self.read_body()
+            self.route.run(self)
         except Exception as e:
-            print(f"POST 요청 처리 오류: {e.with_traceback()}")
-            self.send_error(500, str(e))
+            LOG.exception("%s %s 요청 처리 오류: %s", method, self.route.pattern, e)
+            # 응답을 보내던 중에 오류가 났을 수도 있으므로 이 연결은 닫기
+            self.close_connection = True
+            # 상태 줄에는 한글을 쓸 수 없으므로 오류 내용은 본문(explain)으로
+            self.send_error(500, "Internal Server Error", str(e))
+    
+    def read_body(self):
+        """요청 본문 읽기 (본문이 없으면 b'')"""
+        content_length = int(self.headers.get('Content-Length') or 0)
+        if content_length <= 0:
+            return b''
+        return self.rfile.read(content_length)
+    
+    def reject_route(self, path):
+        """경로 표에 없는 요청: 본문을 읽지 않고 404 또는 405를 보냅니다."""
+        # 읽지 않은 본문이 남아 있으면 다음 요청과 섞이므로 이 연결은 닫기
+        if self.headers.get('Content-Length', '0') != '0' or self.headers.get('Transfer-Encoding'):
+            self.close_connection = True
+        allowed = ROUTES.allowed_methods(path)
+        if not allowed:
+            # 경로를 찾을 수 없을 때
+            self.send_error(404, "Not Found")
+            return
+        self.send_response(405)
+        self.send_cors_headers()
+        self.send_header('Allow', ', '.join(allowed + ['OPTIONS']))
+        self.send_body(encode_json({"success": False, "error": "허용되지 않는 메서드입니다."}))
     
     # ============================================
     # API 구현 함수들 (아래부터 TODO로 채워야 함!)
@@ -261,7 +657,13 @@ class GameHandler(BaseHTTPRequestHandler):
         #          json.dumps(game_state, ensure_ascii=False)로 JSON 문자열로 변환
         #          .encode('utf-8')로 바이트로 변환
         
-        game_state = load_json_file(GAME_STATE_FILE, DEFAULT_GAME_STATE)
+        # 게임 상태가 마지막으로 보낸 뒤로 바뀌지 않았으면 본문 없이 304
+        etag = make_etag('state', SESSIONS.version(self.session_id))
+        if self.send_not_modified(etag):
+            return
+
+        # 파일 대신 세션 저장소에서 이 플레이어의 게임 상태 가져오기
+        game_state = SESSIONS.get(self.session_id)
 
         if 'trust' not in game_state:
             game_state['trust'] = 50
@@ -274,8 +676,10 @@ class GameHandler(BaseHTTPRequestHandler):
 
         self.send_response(200)
         self.send_cors_headers()
-        self.end_headers()
-        self.wfile.write(json.dumps(game_state, ensure_ascii = False).encode('utf-8'))
+        self.send_etag_headers(etag)
+        # 리셋 직후처럼 기본 게임 상태와 같으면 미리 만들어 둔 바이트를 그대로 보냄
+        body = DEFAULT_STATE_BODY if game_state == DEFAULT_GAME_STATE else encode_json(game_state)
+        self.send_body(body, etag)
     
     def handle_post_game_state(self, body):
         """
@@ -300,21 +704,18 @@ class GameHandler(BaseHTTPRequestHandler):
         # TODO: 1. body를 JSON으로 변환
         #       body.decode('utf-8')로 문자열로 변환
         #       json.loads()로 딕셔너리로 변환
-        data = json.loads(body.decode('utf-8'))  # 여기를 구현하세요!
+        data = codec.loads(body)  # 여기를 구현하세요!
         
         # TODO: 2. save_json_file() 함수를 사용해서 GAME_STATE_FILE에 저장
-        save_json_file(GAME_STATE_FILE, data)
+        #       (세션 저장소에 넣으면 이벤트 로그에 기록됨)
+        SESSIONS.put(self.session_id, data, {"type": "replace"})
         # TODO: 3. 응답 보내기
         #       {"success": True, "data": data} 형태로 보내기
         res = {
             "success" : True,
             "data" : data
             }
-        self.send_response(200)
-        self.send_cors_headers()
-        self.end_headers()
-
-        self.wfile.write(json.dumps(res, ensure_ascii = False).encode('utf-8'))
+        self.send_json(res)
     def handle_get_posts(self):
         """
         GET /api/posts 구현
@@ -345,14 +746,142 @@ class GameHandler(BaseHTTPRequestHandler):
         """
         # TODO: 1. load_json_file() 함수를 사용해서 POSTS_FILE 읽기
         #       기본값은 빈 리스트 []
-        posts = load_json_file(POSTS_FILE, [])  # 여기를 구현하세요!
+        query = parse_qs(urlparse(self.path).query)
+        if 'fields' in query or 'cursor' in query or 'limit' in query or 'stream' in query:
+            self.handle_get_posts_page(query)
+            return
+
+        # 게시글 목록이 바뀌지 않았으면 본문 없이 304
+        # (버전을 먼저 읽어야 그 사이에 목록이 바뀌어도 예전 ETag에 새 본문이 붙지 않음)
+        etag = make_etag('posts', POST_CATALOG.version)
+        if self.send_not_modified(etag):
+            return
+        # 파일 대신 메모리 카탈로그에서, 목록이 바뀔 때까지는 한 번 만든 응답 바이트를 재사용
+        body = POST_CATALOG.derived('posts_body', encode_json)
         
         # TODO: 2. 응답 보내기 (handle_get_game_state와 비슷)
         self.send_response(200)
         self.send_cors_headers()
-        self.end_headers()
+        self.send_etag_headers(etag)
+        self.send_body(body, etag)
+    
+    def handle_get_posts_page(self, query):
+        """
+        GET /api/posts?fields=...&cursor=...&limit=... 구현
+        게시글 목록의 일부(페이지)나, 일부 필드만 보냅니다. (첫 화면을 빨리 그릴 때 사용)
+        
+        입력 (주소의 ? 뒤):
+            fields: 보낼 필드 이름들 (예: id,title,type,author / id는 항상 포함)
+            cursor: 이전 페이지의 nextCursor (이 id보다 큰 게시글부터)
+            limit: 한 번에 보낼 게시글 수 (기본 20, 최대 100)
+            stream: 1이면 게시글을 조각조각 JSON으로 바꾸면서 바로 보냄 (chunked 전송)
+                    응답 전체를 메모리에 만들지 않으므로 게시글이 아주 많을 때 사용
+                    (cursor/limit과 함께 쓰면 무시됨)
+        
+        처리 과정:
+        1. 값 검사 (모르는 필드, 숫자가 아닌 cursor/limit이면 400)
+        2. 카탈로그가 미리 만들어 둔 필드별 색인(게시글별 JSON 조각)에서 id 순서로 자르기
+        3. 조각들을 이어 붙여서 응답 (게시글을 다시 JSON으로 바꾸지 않음)
+        
+        출력:
+            fields만 있으면 (예전과 같은) 게시글 리스트: [{"id": 1, "title": "..."}, ...]
+            cursor나 limit이 있으면:
+            {
+                "success": true,
+                "posts": [{"id": 1, "title": "..."}, ...],
+                "nextCursor": 20     # 다음 페이지가 없으면 null
+            }
+        """
+        fields = POST_FIELDS
+        if 'fields' in query:
+            fields = [name.strip() for name in ','.join(query['fields']).split(',') if name.strip()]
+            unknown = [name for name in fields if name not in POST_FIELDS]
+            if unknown:
+                self.send_json({"success": False, "error": f"알 수 없는 필드: {', '.join(unknown)}"}, 400)
+                return
+        paged = 'cursor' in query or 'limit' in query
+        stream = not paged and query.get('stream', ['0'])[0].lower() in ('1', 'true', 'yes')
+        try:
+            cursor = int(query['cursor'][0]) if query.get('cursor', [''])[0] else None
+            limit = int(query['limit'][0]) if 'limit' in query else DEFAULT_PAGE_SIZE
+        except ValueError:
+            self.send_json({"success": False, "error": "cursor와 limit은 숫자여야 합니다."}, 400)
+            return
+        if limit < 1:
+            self.send_json({"success": False, "error": "limit은 1 이상이어야 합니다."}, 400)
+            return
+        limit = min(limit, MAX_PAGE_SIZE)
+
+        version = POST_CATALOG.version
+        if stream and 'fields' not in query:
+            # 필드를 고르지 않았으면 색인도 만들지 않고 게시글을 하나씩 JSON으로 바꾸며 보내기
+            # (본문은 /api/posts와 똑같으므로 ETag도 같음)
+            etag = make_etag('posts', version)
+            if self.send_not_modified(etag):
+                return
+            self.send_response(200)
+            self.send_cors_headers()
+            self.send_etag_headers(etag)
+            self.send_stream(iter_json_array(POST_CATALOG.all(), encode_json))
+            return
+
+        projection = POST_CATALOG.projection(fields, encode_json)
+        # 요청마다 본문이 다르므로 ETag에 필드/페이지 정보도 넣기
+        kind = 'posts.' + '+'.join(projection.fields)
+        if paged:
+            kind += f'.{cursor}.{limit}'
+        etag = make_etag(kind, version)
+        if self.send_not_modified(etag):
+            return
+
+        if stream:
+            self.send_response(200)
+            self.send_cors_headers()
+            self.send_etag_headers(etag)
+            self.send_stream(iter_json_array(projection.items))
+            return
+
+        if paged:
+            items, next_cursor = projection.page(cursor, limit)
+            body = (b'{"success":true,"posts":[' + b','.join(items) +
+                    b'],"nextCursor":' + encode_json(next_cursor) + b'}')
+        else:
+            body = b'[' + b','.join(projection.items) + b']'
 
-        self.wfile.write(json.dumps(posts, ensure_ascii = False).encode('utf-8'))
+        self.send_response(200)
+        self.send_cors_headers()
+        self.send_etag_headers(etag)
+        self.send_body(body, etag)
+    
+    def handle_get_post(self, id):
+        """
+        GET /api/posts/{id} 구현
+        게시글 하나를 반환합니다.
+        
+        입력:
+            id: 경로의 게시글 id (예: /api/posts/3 -> 3)
+        
+        출력 예시:
+        {
+            "success": true,
+            "post": {"id": 3, "type": "...", "title": "...", ...}
+        }
+        게시글이 없으면 404
+        """
+        # 게시글 목록이 바뀌지 않았으면 본문 없이 304 (버전을 먼저 읽기)
+        etag = make_etag(f'post.{id}', POST_CATALOG.version)
+        if self.send_not_modified(etag):
+            return
+        body = post_body(POST_CATALOG.derived('post_bodies', lambda posts: {}), id)
+        if body is None:
+            self.send_json({"success": False, "error": "게시글을 찾을 수 없습니다."}, 404)
+            return
+
+        self.send_response(200)
+        self.send_cors_headers()
+        self.send_etag_headers(etag)
+        self.send_body(body, etag)
+    
     def handle_post_action(self, body):
         """
         POST /api/action 구현
@@ -392,161 +921,35 @@ class GameHandler(BaseHTTPRequestHandler):
         }
         """
         # TODO: 1. body를 JSON으로 변환해서 postId와 action 가져오기
-        #       data = json.loads(body.decode('utf-8'))
+        #       data = codec.loads(body)
         #       post_id = data.get('postId')
         #       action = data.get('action')
-        data = json.loads(body.decode('utf-8'))
+        data = codec.loads(body)
         post_id = data.get('postId')
         action = data.get('action')
         
         # TODO: 2. 게임 상태와 게시글 목록 읽기
-        game_state = load_json_file(GAME_STATE_FILE, DEFAULT_GAME_STATE)
-        posts = load_json_file(POSTS_FILE, [])
+        #       (파일 대신 세션 저장소에서 이 플레이어의 게임 상태 가져오기)
+        game_state = SESSIONS.get(self.session_id)
         
         # TODO: 3. post_id에 해당하는 게시글 찾기 (for 문 사용)
         #       게시글을 못 찾으면: self.send_error(404, "게시글을 찾을 수 없습니다.") 하고 return
-        chk = False
-        current_post = {}
-        for i in posts:
-            if i['id'] == post_id:
-                chk = True
-                current_post = i
-                print("게시물 확인")
-                break
-        if(chk == False):
-            self.send_error(404, "게시글을 찾을 수 없습니다.")
+        #       (영향값 텐서의 행 번호 색인으로 for 문 없이 바로 찾기)
+        engine = POST_CATALOG.derived('engine', ImpactEngine)
+        if post_id not in engine.row_of:
+            self.send_error(404, "Post not found")
+            return
+        if action not in ACTION_CODES:
+            self.send_error(400, "Unknown action")
+            return
         # TODO: 4. action에 따라 지표 변화 계산
         #       freedom_change, order_change, trust_change, diversity_change 변수 사용
-        #       approve: current_post.get('freedomImpact', 0) 그대로 사용
-        #       warn: 영향의 50% (곱하기 0.5)
-        #       delete: 자유도는 abs(freedomImpact) * 1.5만큼 감소, 질서도는 abs(orderImpact) * 1.2만큼 증가
-        freedom_change = current_post.get('freedomImpact', 0)
-        order_change = current_post.get('orderImpact', 0)
-        trust_change = current_post.get('trustImpact', 0)
-        diversity_change = current_post.get('diversityImpact', 0)
-        print(freedom_change)
-        print(order_change)
-        print(trust_change)
-        print(diversity_change)
-        currType = ''
-        for i in posts:
-            if i['id'] == post_id:
-                currType = i['type']
-        
-        if action == "approve":
-            ind = 0
-            #print("approve")
-            if currType == "허위정보":
-                game_state["freedom"] += freedom_change[0]              
-                game_state["order"] += order_change[0]        
-                game_state["trust"] += trust_change[0]                
-                game_state["diversity"] += diversity_change[0]
-
-            elif currType == "선동":
-                game_state["freedom"] += freedom_change[0]
-                game_state["order"] += order_change[0]
-                game_state["trust"] += trust_change[0]
-                game_state["diversity"] += diversity_change[0]
-
-            elif currType == "비판":
-                game_state["freedom"] += freedom_change[0]
-                game_state["order"] += order_change[0]
-                game_state["trust"] += trust_change[0]
-                game_state["diversity"] += diversity_change[0]
-
-            elif currType == "논쟁":
-                game_state["freedom"] += freedom_change[0]
-                game_state["order"] += order_change[0]
-                game_state["trust"] += trust_change[0]
-                game_state["diversity"] += diversity_change[0]
-
-            elif currType in ["유익한글", "유익한 글"]:
-                game_state["freedom"] += freedom_change[0]
-                game_state["order"] += order_change[0]
-                game_state["trust"] += trust_change[0]
-                game_state["diversity"] += diversity_change[0]
-        elif action == "warn":
-            #print("warn")
-            ind = 1
-            if currType == "허위정보":
-                game_state["freedom"] += freedom_change[1]
-                game_state["order"] += order_change[1]
-                game_state["trust"] += trust_change[1]
-                game_state["diversity"] += diversity_change[1]
-
-            elif currType == "선동":
-                game_state["freedom"] += freedom_change[1]
-                game_state["order"] += order_change[1]
-                game_state["trust"] += trust_change[1]
-                game_state["diversity"] += diversity_change[1]
-
-            elif currType == "비판":
-                game_state["freedom"] += freedom_change[1]
-                game_state["order"] += order_change[1]
-                game_state["trust"] += trust_change[1]
-                game_state["diversity"] += diversity_change[1]
-
-            elif currType == "논쟁":
-                game_state["freedom"] += freedom_change[1]
-                game_state["order"] += order_change[1]
-                game_state["trust"] += trust_change[1]
-                game_state["diversity"] += diversity_change[1]
-
-            elif currType in ["유익한글", "유익한 글"]:
-                game_state["freedom"] += freedom_change[1]
-                game_state["order"] += order_change[1]
-                game_state["trust"] += trust_change[1]
-                game_state["diversity"] += diversity_change[1]
-
-
-
-        elif action == "delete":
-            #print("delete")
-            ind = 2
-            if currType == "허위정보":
-                game_state["freedom"] += freedom_change[2]          
-                game_state["order"] += order_change[2]
-                game_state["trust"] += trust_change[2]
-                game_state["diversity"] += diversity_change[2]
-
-            elif currType == "선동":
-                game_state["freedom"] += freedom_change[2]
-                game_state["order"] += order_change[2]
-                game_state["trust"] += trust_change[2]
-                game_state["diversity"] += diversity_change[2]
-
-            elif currType == "비판":
-                game_state["freedom"] += freedom_change[2]
-                game_state["order"] += order_change[2]
-                game_state["trust"] += trust_change[2]
-                game_state["diversity"] += diversity_change[2]
-
-            elif currType == "논쟁":
-                game_state["freedom"] += freedom_change[2]
-                game_state["order"] += order_change[2]
-                game_state["trust"] += trust_change[2]
-                game_state["diversity"] += diversity_change[2]
-
-            elif currType == "유익한글":
-                game_state["freedom"] += freedom_change[2]            
-                game_state["order"] += order_change[2]
-                game_state["trust"] += trust_change[2]
-                game_state["diversity"] += diversity_change[2]
+        #       approve: 영향값 배열의 0번, warn: 1번, delete: 2번 값 사용
         # TODO: 5. 게임 상태 업데이트
         #       game_state['freedom'] = max(0, min(100, game_state.get('freedom', 50) + freedom_change))
         #       다른 지표도 같은 방식으로 업데이트
         #       currentPostIndex 증가
         #       processedPosts에 {'postId': post_id, 'action': action, 'timestamp': datetime.now().isoformat()} 추가
-        game_state['freedom'] = max(0, min(100, game_state.get('freedom', 50) + freedom_change[ind]))
-        game_state['order'] = max(0, min(100, game_state.get('order', 50) + order_change[ind]))
-        game_state['trust'] = max(0, min(100, game_state.get('trust', 50) + trust_change[ind]))
-        game_state['diversity'] = max(0, min(100, game_state.get('diversity', 50) + diversity_change[ind]))
-        game_state["currentPostIndex"] += 1
-        game_state['processedPosts'] = {
-            'postId': post_id, 
-            'action': action, 
-            'timestamp': datetime.now().isoformat()
-        }
         # TODO: 6. 엔딩 조건 체크
         #       if game_state['freedom'] <= 0: 게임 종료
         #       elif game_state['order'] <= 0: 게임 종료
@@ -555,36 +958,19 @@ class GameHandler(BaseHTTPRequestHandler):
         #       elif currentPostIndex >= len(posts): 트루엔딩
         #       게임 종료 시: game_state['gameStatus'] = 'ended'
         #       game_state['endings'].append({'type': '엔딩이름', 'message': '메시지'})
-        if game_state['freedom'] <= 0:
-            game_state['gameStatus'] = 'ended'
-            game_state['endings'].append({'type': '무정부', 'message': '자유가 완전히 사라져 무정부 상태가 되었습니다.'})
-        
-        elif game_state['freedom'] >= 100 and game_state['order'] >= 80: 
-            game_state['gameStatus'] = 'ended'
-            game_state['endings'].append({'type': '혼돈', 'message': '자유도와 질서가 넘처나 커뮤니티가 붕괴되었습니다.'})
-
-        elif game_state['order'] <= 0: 
-            game_state['gameStatus'] = 'ended'
-            game_state['endings'].append({'type': '질서 붕괴', 'message': '질서가 완전히 무너져 커뮤니티가 혼란에 빠졌습니다.'})
-
-        elif game_state['trust'] <= 0: 
-            game_state['gameStatus'] = 'ended'
-            game_state['endings'].append({'type': '신뢰 상실', 'message': '사용자들의 신뢰가 완전히 사라졌습니다.'})
-
-        elif game_state['trust'] >= 100 and game_state['order'] >= 80: 
-            game_state['gameStatus'] = 'ended'
-            game_state['endings'].append({'type': '지배', 'message': '커뮤니티가 관리자에 의해 지배되었습니다.'})
-
-        elif game_state['diversity'] <= 0:
-            game_state['gameStatus'] = 'ended'
-            game_state['endings'].append({'type': '다양성 소멸', 'message': '모든 목소리가 같아져 커뮤니티가 메아리실(Echo Chamber)이 되었습니다.'})
-
-        elif game_state["currentPostIndex"] >= len(posts):
-            game_state['gameStatus'] = 'ended'
-            game_state['endings'].append({'type': '트루엔딩', 'message': '이상적인 커뮤니티의 균형을 이루었습니다.'})
+        # -> 게시글 목록을 (게시글, 지표 4개, 액션 3개) 텐서로 만들어 둔 엔진이
+        #    해당 칸의 변화량 4개를 한 번에 더하고 0~100으로 자른 뒤 엔딩 조건까지 확인합니다.
+        #    (엔딩 조건 목록은 engine.py의 ENDINGS)
+        engine.play(game_state, post_id, action, datetime.now().isoformat())
 
         # TODO: 7. 게임 상태 저장 (save_json_file 사용)
-        save_json_file(GAME_STATE_FILE, game_state)
+        #       (바뀐 부분만 이벤트 로그에 한 줄 덧붙임)
+        SESSIONS.put(self.session_id, game_state, {
+            "type": "action",
+            "postId": post_id,
+            "action": action,
+            "timestamp": game_state['processedPosts']['timestamp']
+        })
         # TODO: 8. 게임이 끝났으면 리더보드에 저장
         #       if game_state['gameStatus'] == 'ended':
         #           self.save_to_leaderboard(game_state)
@@ -596,11 +982,80 @@ class GameHandler(BaseHTTPRequestHandler):
             "success" : True,
             "gameState" : game_state
         }
-        self.send_response(200)
-        self.send_cors_headers()
-        self.end_headers()
+        self.send_json(res)
+    def handle_post_actions_batch(self, body):
+        """
+        POST /api/actions/batch 구현
+        여러 개의 결정을 요청 한 번으로 차례대로 처리합니다. (리플레이, 봇, 자동 테스트용)
+        
+        입력:
+            body: 요청 본문
+            예: b'{"actions": [{"postId": 1, "action": "approve"},
+                              {"postId": 2, "action": "delete"}]}'
+        
+        처리 과정:
+        1. 모든 결정이 올바른지 먼저 확인 (하나라도 틀리면 아무것도 적용하지 않음)
+           - 없는 게시글이면 404, 모르는 action이면 400
+        2. /api/action과 같은 규칙으로 하나씩 적용
+           - 엔딩이 나오면 거기서 멈춤 (남은 결정은 적용하지 않음)
+        3. 게임 상태는 마지막에 한 번만 저장
+        4. 게임이 끝났으면 리더보드에 저장
+        
+        출력:
+        {
+            "success": true,
+            "gameState": {...},   # 마지막 게임 상태
+            "applied": 2,         # 실제로 적용한 결정 수
+            "stoppedAt": null     # 엔딩 때문에 멈췄으면 멈춘 결정의 위치(0부터), 아니면 null
+        }
+        """
+        data = codec.loads(body)
+        decisions = data.get('actions') if isinstance(data, dict) else data
+        if not isinstance(decisions, list) or len(decisions) > MAX_BATCH_ACTIONS:
+            self.send_error(400, "actions must be a list of at most %d items" % MAX_BATCH_ACTIONS)
+            return
+
+        engine = POST_CATALOG.derived('engine', ImpactEngine)
+        for decision in decisions:
+            if not isinstance(decision, dict) or decision.get('action') not in ACTION_CODES:
+                self.send_error(400, "Unknown action")
+                return
+            if decision.get('postId') not in engine.row_of:
+                self.send_error(404, "Post not found")
+                return
+
+        game_state = SESSIONS.get(self.session_id)
+        applied = 0
+        stopped_at = None
+        if game_state.get('gameStatus') != 'ended':
+            for index, decision in enumerate(decisions):
+                ending = engine.play(game_state, decision['postId'], decision['action'],
+                                     datetime.now().isoformat())
+                applied += 1
+                if ending is not None:
+                    stopped_at = index
+                    break
+        elif decisions:
+            # 이미 끝난 게임에는 결정을 적용하지 않음
+            stopped_at = 0
+
+        if applied:
+            SESSIONS.put(self.session_id, game_state, {
+                "type": "batch",
+                "decisions": [[d['postId'], d['action']] for d in decisions[:applied]],
+                "timestamp": datetime.now().isoformat()
+            })
+            if game_state['gameStatus'] == 'ended':
+                self.save_to_leaderboard(game_state)
+
+        res = {
+            "success": True,
+            "gameState": game_state,
+            "applied": applied,
+            "stoppedAt": stopped_at
+        }
+        self.send_json(res)
 
-        self.wfile.write(json.dumps(res, ensure_ascii = False).encode('utf-8'))
     def handle_post_reset(self):
         """
         POST /api/reset 구현
@@ -619,17 +1074,16 @@ class GameHandler(BaseHTTPRequestHandler):
         }
         """
         # TODO: 1. save_json_file() 함수를 사용해서 DEFAULT_GAME_STATE.copy()를 GAME_STATE_FILE에 저장
-        save_json_file(GAME_STATE_FILE, DEFAULT_GAME_STATE)
-        res = {
-            "success" : True, 
-            "gameState" : DEFAULT_GAME_STATE
-        }
+        #       (세션 저장소에 새 게임 상태 넣기, 리스트까지 복사하도록 deepcopy 사용)
+        SESSIONS.put(self.session_id, copy.deepcopy(DEFAULT_GAME_STATE), {
+            "type": "reset",
+            "timestamp": datetime.now().isoformat()
+        })
         # TODO: 2. 성공 응답 보내기
+        #       (응답은 항상 같으므로 미리 만들어 둔 RESET_BODY를 그대로 보냄)
         self.send_response(200)
         self.send_cors_headers()
-        self.end_headers()
-
-        self.wfile.write(json.dumps(res, ensure_ascii = False).encode('utf-8'))
+        self.send_body(RESET_BODY)
     def handle_post_register(self, body):
         """
         POST /api/auth/register 구현
@@ -664,43 +1118,28 @@ class GameHandler(BaseHTTPRequestHandler):
             }
         }
         """
-        data = json.loads(body)
+        data = codec.loads(body)
         id = data["username"]
         pw = data["password"]
         if((not id or not pw) or (len(id) < 3) or (len(pw) < 4)):
-            print(1)
-            self.send_response(400)
-            result = {"success" : False, "error" : "에러"}
-        
-        userDB = load_json_file("data/users.json", [])
-        print(userDB)
-        if id in userDB:
-            print(2)
-            self.send_response(400)
-            result = {"success" : False, "error" : "에러"}
+            LOG.debug("회원가입 입력값이 짧습니다: %r", id)
+            self.send_json({"success" : False, "error" : "에러"}, 400)
+            return
+        
+        # 사용자 목록(메모리 색인)에서 중복을 바로 확인하고, 새 사용자만 저장소에 추가
+        new_user = USERS.register(id, pw)
+        if new_user is None:
+            self.send_json({"success" : False, "error" : "이미 사용 중인 사용자명입니다."}, 400)
         else:
-            print(3)
-            new_user = {
-                "id": len(userDB) + 1,
-                "username": id,
-                "password": pw,
-                "createdAt": datetime.now().isoformat()
-                }
-            userDB.append(new_user)
-            save_json_file(USERS_FILE, userDB)
             result = {
                 "success" : True,
                 "message": "회원가입이 완료되었습니다.",
                 "user" : {
-                    "id": len(userDB),
+                    "id": new_user["id"],
                     "username" : id
                 }
             }
-            self.send_response(200)
-            self.send_cors_headers()
-            self.end_headers()
-
-            self.wfile.write(json.dumps(result, ensure_ascii = False).encode('utf-8'))
+            self.send_json(result)
         # TODO: 1. body를 JSON으로 변환해서 username과 password 가져오기
         #       .strip()으로 앞뒤 공백 제거
         
@@ -767,10 +1206,10 @@ class GameHandler(BaseHTTPRequestHandler):
            }
         """
         suc = False
-        data = json.loads(body)
+        data = codec.loads(body)
         if (not data['id'] or not(type(data['id']) == int)) or (not(type(data['title']) == str) or not(type(data['content']) == str)) or (data['title'] == None or data['content'] == None):
-            self.send_response(400)
-            print("성공함 ㅋ")
+            self.send_json({"success" : False, "error" : "잘못된 요청입니다."}, 400)
+            return
 
         if(type(data['freedomImpact']) == list and len(data['freedomImpact']) == 3):
             freedomImpact = list(map(float, data['freedomImpact']))
@@ -788,11 +1227,15 @@ class GameHandler(BaseHTTPRequestHandler):
             diversityImpact = list(map(float, data['diversityImpact']))
         else: diversityImpact = data['diversityImpact']
 
-        load = load_json_file(POSTS_FILE, [])
-        print(load)
-        for i in load:
-            if i['id'] == data['id']:
-                suc = True
+        post = POST_CATALOG.update(data['id'], {
+                "title" : data['title'].strip(),
+                "content" : data['content'].strip(),
+                "freedomImpact" : freedomImpact,
+                "orderImpact" : orderImpact,
+                "trustImpact": trustImpact,
+                "diversityImpact": diversityImpact
+            })
+        suc = post is not None
         if(suc):
             res = {
                 "success" : True,
@@ -806,24 +1249,9 @@ class GameHandler(BaseHTTPRequestHandler):
                     "diversityImpact": diversityImpact
                 }
             }
-            load[data['id']-1].update({
-                    "id" : data['id'],
-                    "title" : data['title'].strip(),
-                    "content" : data['content'].strip(),
-                    "freedomImpact" : freedomImpact,
-                    "orderImpact" : orderImpact,
-                    "trustImpact": trustImpact,
-                    "diversityImpact": diversityImpact
-                })
-            print(load)
-            save_json_file(POSTS_FILE, load)
-            self.send_response(200)
-            self.send_cors_headers()
-            self.end_headers()
-
-            self.wfile.write(json.dumps(res, ensure_ascii = False).encode('utf-8'))
+            self.send_json(res)
         else:
-            self.send_response(404)
+            self.send_json({"success" : False, "error" : "게시글을 찾을 수 없습니다."}, 404)
         # TODO: 위 과정을 순서대로 구현해보세요!
         #       (힌트) JSON 파싱 -> 값 검증 -> 게시글 찾기 -> 값 수정 -> 저장 -> 응답
         pass
@@ -881,50 +1309,30 @@ class GameHandler(BaseHTTPRequestHandler):
         """
         # TODO: 위 과정을 순서대로 구현해보세요!
         #       (힌트) JSON 파싱 -> 값 검증 -> 새 ID 생성 -> 게시글 생성 -> 리스트에 추가 -> 저장 -> 응답
-        suc = False
-        data = json.loads(body)
-        print(f"data: {data}ffv")
+        data = codec.loads(body)
+        LOG.debug("게시글 추가 요청: %s", data)
         if (not(type(data['title']) == str) or not(type(data['content']) == str)) or (data['title'] == None or data['content'] == None):
-            self.send_response(400)
-            print(f"data: {data}")
-            print("성공함 ㅋ")
-        load = load_json_file(POSTS_FILE, [])
-
-        num = 0
-        for i in load:
-            num = i['id']
-            suc = True
-        if (suc):
-            print(111)
-            post = {
-                "id": num + 1,
-                "type": data["type"],
-                "title": data["title"],
-                "content": data["content"],
-                "author": data["author"],
-                "freedomImpact": data["freedomImpact"],
-                "orderImpact": data["orderImpact"],
-                "trustImpact": data["trustImpact"],
-                "diversityImpact": data["diversityImpact"]
-            }
-            load.append(post)
-
+            LOG.debug("게시글 추가 요청의 제목/내용이 문자열이 아닙니다.")
+            self.send_json({"success" : False, "error" : "잘못된 요청입니다."}, 400)
+            return
+        # 새 ID 생성과 리스트 추가, 저장은 카탈로그가 처리합니다.
+        post = POST_CATALOG.create({
+            "type": data["type"],
+            "title": data["title"],
+            "content": data["content"],
+            "author": data["author"],
+            "freedomImpact": data["freedomImpact"],
+            "orderImpact": data["orderImpact"],
+            "trustImpact": data["trustImpact"],
+            "diversityImpact": data["diversityImpact"]
+        })
 
-            res = {
-                "success" : True,
-                "post" : post
-            }
-            print(load)
-            save_json_file(POSTS_FILE, load)
-
-            self.send_response(200)
-            self.send_cors_headers()
-            self.end_headers()
+        res = {
+            "success" : True,
+            "post" : post
+        }
 
-            self.wfile.write(json.dumps(res, ensure_ascii = False).encode('utf-8'))
-        else:
-            self.send_response(404)
-        pass
+        self.send_json(res)
     
     def handle_post_delete_post(self, body):
         """
@@ -955,39 +1363,20 @@ class GameHandler(BaseHTTPRequestHandler):
         """
         suc = False
         res = {}
-        data = json.loads(body)
+        data = codec.loads(body)
         if (not data['id'] or not(type(data['id']) == int)):
-            self.send_response(400)
-            print("성공함 ㅋ")
-        load = load_json_file(POSTS_FILE, [])
-
-        curr = -1
-        for i in load:
-            if i['id'] == data['id']:
-                curr = i['id'] - 1
-        
-        if curr == -1:
-            self.send_response(404)
-            suc = False
-        else:
-            suc = True
+            self.send_json({"success" : False, "error" : "잘못된 요청입니다."}, 400)
+            return
+        suc = POST_CATALOG.delete(data['id'])
+        if not suc:
+            self.send_json({"success" : False, "error" : "게시글을 찾을 수 없습니다."}, 404)
+            return
 
-        if suc:
-            load.pop(curr)
-            save_json_file(POSTS_FILE, load)
-            res = {
-                "success": True
-            }
-        else:
-            res = {
-                "success": False
-            }
-
-        self.send_response(200)
-        self.send_cors_headers()
-        self.end_headers()
+        res = {
+            "success": True
+        }
 
-        self.wfile.write(json.dumps(res, ensure_ascii = False).encode('utf-8'))
+        self.send_json(res)
         # TODO: 위 과정을 순서대로 구현해보세요!
         #       (힌트) JSON 파싱 -> 값 검증 -> 게시글 찾기 -> 삭제 -> 저장 -> 응답
         
@@ -1022,23 +1411,21 @@ class GameHandler(BaseHTTPRequestHandler):
             }
         }
         """
-        data = json.loads(body)
+        data = codec.loads(body)
         id = data["username"]
         pw = data["password"]
         if not id or not pw:
-            self.send_response(400)
+            self.send_json({"success" : False, "error" : "사용자명과 비밀번호를 입력해주세요."}, 400)
+            return
 
-        userDB = load_json_file(USERS_FILE, [])
-        print(userDB)
+        # 사용자 목록(메모리 색인)에서 username으로 바로 찾기
+        user = USERS.authenticate(id, pw)
         suc = False
         ii = 0
-        for i in userDB:
-            if i['username'] == id and i['password'] == pw:
-                    check_FILE = True
-                    suc = True
-                    ii = i["id"]
-                    
-                    break
+        if user is not None:
+            check_FILE = True
+            suc = True
+            ii = user["id"]
 
         if suc:
             result = {
@@ -1049,13 +1436,9 @@ class GameHandler(BaseHTTPRequestHandler):
                     "username": id
                 }
             }
-            self.send_response(200)
-            self.send_cors_headers()
-            self.end_headers()
-
-            self.wfile.write(json.dumps(result, ensure_ascii = False).encode('utf-8'))
+            self.send_json(result)
         else:
-            self.send_response(401)
+            self.send_json({"success" : False, "error" : "사용자명 또는 비밀번호가 올바르지 않습니다."}, 401)
         # TODO: 1. body를 JSON으로 변환해서 username과 password 가져오기
         
         # TODO: 2. 유효성 검사
@@ -1093,11 +1476,128 @@ class GameHandler(BaseHTTPRequestHandler):
             res.update({"authenticated" : True})
         # TODO: 1. 응답 보내기
         #       {"success": True, "authenticated": False}
-        self.send_response(200)
+        self.send_json(res)
+    
+    def handle_get_hint(self):
+        """
+        GET /api/hint 구현
+        지금 게임 상태에서 어떤 결정을 하면 좋은지 알려줍니다.
+        
+        입력: 없음 (세션의 게임 상태를 사용)
+        
+        처리 과정:
+        1. 힌트 표에서 (currentPostIndex, 지표 4개) 상태 찾기
+        2. 표를 만드는 중이면 503 + Retry-After (잠시 뒤에 다시 요청)
+        3. 표를 만들 수 없으면 503 + 이유
+        4. 표에 없는 상태(직접 바꾼 게임 상태, 끝난 게임 등)면 hint는 null
+        
+        출력 예시:
+        {
+            "success": true,
+            "hint": {
+                "postId": 1,
+                "best": "delete",
+                "possible": true,
+                "chance": 0.4111,
+                "actions": {
+                    "approve": {"possible": true, "chance": 0.3293},
+                    "warn": {"possible": true, "chance": 0.3886},
+                    "delete": {"possible": true, "chance": 0.5154}
+                }
+            }
+        }
+        possible: 잘 고르면 트루엔딩에 갈 수 있는지
+        chance: 이후에 무작위로 고르면 트루엔딩에 갈 확률
+        """
+        # 힌트 표를 찾는 동안 게임 상태가 바뀌지 않도록 복사본 사용
+        with SESSIONS.lock(self.session_id):
+            game_state = copy.deepcopy(SESSIONS.get(self.session_id))
+        status, result = HINTS.hint(game_state)
+        if status == HINT_READY:
+            code = 200
+            res = {"success": True, "hint": result}
+            if result is None:
+                res["message"] = "힌트를 계산할 수 없는 게임 상태입니다."
+        else:
+            code = 503
+            message = "힌트를 계산하는 중입니다. 잠시 후 다시 시도해주세요." if status == HINT_BUILDING else result
+            res = {"success": False, "message": message}
+
+        self.send_response(code)
         self.send_cors_headers()
-        self.end_headers()
+        if status == HINT_BUILDING:
+            self.send_header('Retry-After', str(HINT_RETRY_AFTER))
+        self.send_body(encode_json(res))
+    
+    def handle_get_metrics(self):
+        """
+        GET /api/metrics 구현
+        서버 지표를 Prometheus 텍스트 형식으로 보냅니다. (JSON이 아님)
+        
+        출력 예시:
+            echochamber_http_requests_total{method="GET",route="/api/posts",status="200"} 42
+            echochamber_http_request_duration_seconds_bucket{...,le="0.005"} 40
+            echochamber_http_requests_in_flight 1
+            echochamber_data_file_bytes{file="posts.json"} 18231
+        """
+        body = TELEMETRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_cors_headers(METRICS_CONTENT_TYPE)
+        self.send_header('Cache-Control', 'no-store')
+        self.send_body(body)
+    
+    def handle_get_debug_profile(self):
+        """
+        GET /api/debug/profile 구현
+        요청 프로파일링 결과를 보냅니다. (프로파일링이 꺼져 있으면 404)
+        
+        입력 (주소의 ? 뒤):
+            route: 경로 (예: /api/action, 없으면 모든 경로)
+            sort: cumulative(기본), tottime, calls, name
+            limit: 경로마다 보여줄 함수 수 (기본 30)
+            format: text(기본, 정렬한 글) 또는 prof (.prof 파일, python3 -m pstats로 열기)
+        """
+        if PROFILER is None:
+            self.send_json({"success": False, "error": "프로파일링이 꺼져 있습니다. (--profile 또는 ECHOCHAMBER_PROFILE)"}, 404)
+            return
+        query = parse_qs(urlparse(self.path).query)
+        route = query.get('route', [None])[0]
+        sort = query.get('sort', ['cumulative'])[0]
+        fmt = query.get('format', ['text'])[0]
+        try:
+            limit = int(query.get('limit', ['30'])[0])
+        except ValueError:
+            limit = -1
+        if sort not in SORT_KEYS or limit <= 0 or fmt not in ('text', 'prof'):
+            self.send_json({"success": False,
+                            "error": f"sort는 {', '.join(SORT_KEYS)}, limit은 1 이상, format은 text 또는 prof여야 합니다."}, 400)
+            return
+
+        if fmt == 'prof':
+            data = PROFILER.prof_bytes(route)
+            if data is None:
+                self.send_json({"success": False, "error": "측정한 요청이 없습니다."}, 404)
+                return
+            self.send_response(200)
+            self.send_cors_headers('application/octet-stream')
+            self.send_header('Content-Disposition', 'attachment; filename="echochamber.prof"')
+            self.send_header('Cache-Control', 'no-store')
+            self.send_body(data)
+            return
 
-        self.wfile.write(json.dumps(res, ensure_ascii = False).encode('utf-8'))
+        body = PROFILER.summary(route, sort, limit).encode('utf-8')
+        self.send_response(200)
+        self.send_cors_headers('text/plain; charset=utf-8')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_body(body)
+    
+    def handle_post_debug_profile_reset(self):
+        """POST /api/debug/profile/reset 구현: 모은 프로파일링 결과를 지웁니다."""
+        if PROFILER is None:
+            self.send_json({"success": False, "error": "프로파일링이 꺼져 있습니다."}, 404)
+            return
+        PROFILER.reset()
+        self.send_json({"success": True})
     
     def handle_get_leaderboard(self):
         """
@@ -1134,25 +1634,23 @@ class GameHandler(BaseHTTPRequestHandler):
         }
         """
         # TODO: 1. leaderboard.json 파일 읽기 (load_json_file 사용, 기본값은 빈 리스트)
-        lead = load_json_file(LEADERBOARD_FILE, [])
         # TODO: 2. 점수순으로 정렬 (내림차순)
         #       leaderboard.sort(key=lambda x: x.get('score', 0), reverse=True)
-        lead.sort(key=lambda x: x.get('score', 0), reverse=True)
         # TODO: 3. 상위 10개만 선택
         #       top_10 = leaderboard[:10]
-        top_10 = lead[:10]
         # TODO: 4. 응답 보내기
         #       {"success": True, "leaderboard": top_10}
-        res = {
-            "success" : True,
-            "leaderboard" : top_10
-        }
+        # -> 리더보드 힙이 상위 10개 응답을 바이트로 미리 만들어 두므로 그대로 보내기
+        #    상위 10개가 바뀌지 않았으면 본문 없이 304
+        etag = make_etag('leaderboard', LEADERBOARD.version)
+        if self.send_not_modified(etag):
+            return
+        body = LEADERBOARD.top_response()
 
         self.send_response(200)
         self.send_cors_headers()
-        self.end_headers()
-
-        self.wfile.write(json.dumps(res, ensure_ascii = False).encode('utf-8'))
+        self.send_etag_headers(etag)
+        self.send_body(body, etag)
     def save_to_leaderboard(self, game_state):
         """
         게임 결과를 리더보드에 저장합니다.
@@ -1188,15 +1686,13 @@ class GameHandler(BaseHTTPRequestHandler):
         #       ending_type = endings[-1].get('type', '') if endings else ''
         endings = game_state.get('endings', [])
         endings_type = endings[-1].get('type', '') if endings else ''
-        print(f"리더보드 오류검출 2{endings}")
-        print(f"리더보드 오류검출 3{endings_type}")
+        LOG.debug("리더보드 기록: 엔딩 %s (%s)", endings_type, endings)
         # TODO: 3. leaderboard.json 파일 읽기
-        lead = load_json_file(LEADERBOARD_FILE, [])
-        print(f"리더보드 오류검출 4{lead}")
+        #       (리더보드 힙이 메모리에 있으므로 파일을 다시 읽지 않음)
         # TODO: 4. 새 기록 생성 및 추가
         #       new_record = {...}
         #       leaderboard.append(new_record)
-        print(game_state)
+        LOG.debug("게임 상태: %s", game_state)
         new_record = {
             "score" : score,
             "freedom" : game_state['freedom'],
@@ -1208,53 +1704,527 @@ class GameHandler(BaseHTTPRequestHandler):
             "processedPosts": game_state['processedPosts']['postId']
         }
 
-        lead.append(new_record)
         # TODO: 5. 점수순으로 정렬
-        lead.sort(key=lambda x: x.get('score', 0), reverse=True)
         # TODO: 6. 최대 100개만 유지
         #       if len(leaderboard) > 100:
         #           leaderboard = leaderboard[:100]
-        if len(lead) > 100:
-            lead = lead[:100]
         # TODO: 7. leaderboard.json 파일에 저장
-        print(f"리드 오류#{lead}")
-        save_json_file(LEADERBOARD_FILE, lead)
+        # -> 리더보드 힙에 넣으면 상위 100개 유지와 파일 저장까지 처리됨
+        LEADERBOARD.add(new_record)
 
     def log_message(self, format, *args):
-        """로그 메시지 출력 (선택사항)"""
-        print(f"[{self.address_string()}] {format % args}")
+        """
+        접속 기록 남기기 (BaseHTTPRequestHandler가 응답마다 부름)
+        큐에 넣기만 하고 바로 돌아가며, 파일에는 백그라운드 스레드가 모아서 씁니다.
+        """
+        ACCESS_LOG.info('%s ' + format, self.address_string(), *args)
     
-    def log_message(self, format, *args):
-        """로그 메시지 출력 (선택사항)"""
-        print(f"[{self.address_string()}] {format % args}")
+    def log_error(self, format, *args):
+        """잘못된 요청 등 오류 기록 (접속 기록이 아닌 서버 로그로)"""
+        LOG.info('%s ' + format, self.address_string(), *args)
+
+
+# ============================================
+# 미들웨어 (처리 함수 앞뒤에 끼워 넣는 공통 작업)
+# ============================================
+# 모든 경로에 바깥쪽부터 차례로 적용됩니다: 시간 재기 -> 세션 -> 인증 -> 압축 고르기
+# 각 미들웨어는 call_next(handler)를 불러야 다음 단계(마지막은 처리 함수)로 넘어갑니다.
+
+def timing_middleware(handler, route, call_next):
+    """
+    처리 시간을 재서 handler.elapsed(초)에 남기고, 지표(TELEMETRY)에 기록합니다.
+    느린 요청은 알려줍니다.
+    """
+    TELEMETRY.request_started()
+    start = time.perf_counter()
+    try:
+        call_next(handler)
+    finally:
+        handler.elapsed = time.perf_counter() - start
+        TELEMETRY.request_finished()
+        # 처리 함수에서 오류가 나면 응답을 보내기 전이므로 500으로 기록 (dispatch가 500을 보냄)
+        TELEMETRY.observe(route.method, route.pattern, handler.status or 500, handler.elapsed)
+        if handler.elapsed >= SLOW_REQUEST_SECONDS:
+            LOG.warning("느린 요청: %s %s %.1fms", route.method, route.pattern, handler.elapsed * 1000)
+
+
+def session_middleware(handler, route, call_next):
+    """
+    세션 id를 확인합니다. (형식이 잘못되었으면 400)
+    session_lock=True인 경로는 게임 상태를 읽고-고치고-저장하는 동안
+    같은 세션의 다른 요청이 끼어들지 않도록 세션 잠금을 잡고 처리합니다.
+    """
+    handler.session_id = handler.get_session_id()
+    if handler.session_id is None:
+        handler.send_error(400, "Invalid session id")
+        return
+    if route.options.get('session_lock'):
+        with SESSIONS.lock(handler.session_id):
+            call_next(handler)
+    else:
+        call_next(handler)
+
+
+def auth_middleware(handler, route, call_next):
+    """
+    admin=True인 경로(게시글 관리)는 관리자 토큰이 설정되어 있으면
+    X-Admin-Token 헤더가 같을 때만 처리합니다. (토큰이 설정되지 않았으면 누구나)
+    """
+    if route.options.get('admin') and ADMIN_TOKEN:
+        token = handler.headers.get('X-Admin-Token', '')
+        # compare_digest: 글자를 비교하는 시간으로 토큰을 짐작할 수 없게
+        if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+            handler.send_json({"success": False, "error": "관리자 토큰이 올바르지 않습니다."}, 401)
+            return
+    call_next(handler)
+
+
+def compression_middleware(handler, route, call_next):
+    """Accept-Encoding 헤더를 보고 응답 압축 방식을 고릅니다. (compress=False인 경로는 압축하지 않음)"""
+    if route.options.get('compress', True):
+        handler.encoding = choose_encoding(handler.headers.get('Accept-Encoding'))
+    else:
+        handler.encoding = None
+    call_next(handler)
+
+
+def profiling_middleware(handler, route, call_next):
+    """
+    표본으로 고른 요청(또는 X-Profile: 1 헤더를 보낸 요청)을 cProfile로 감싸서 처리합니다.
+    (프로파일링을 켰을 때만 경로 표에 들어감, configure_profiling 참고)
+    관리자 토큰을 설정했으면 X-Profile 헤더는 관리자 토큰이 맞을 때만 인정합니다.
+    profile=False로 등록한 경로(프로파일링 결과를 보는 경로)는 측정하지 않습니다.
+    """
+    if not route.options.get('profile', True):
+        call_next(handler)
+        return
+    requested = handler.headers.get('X-Profile') == '1'
+    if requested and ADMIN_TOKEN:
+        token = handler.headers.get('X-Admin-Token', '')
+        requested = hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+    if PROFILER.should_profile(requested):
+        PROFILER.run(route.pattern, lambda: call_next(handler))
+    else:
+        call_next(handler)
+
+
+def recording_middleware(handler, route, call_next):
+    """
+    요청과 응답을 녹화합니다. (녹화를 켰을 때만 경로 표의 가장 바깥에 들어감, configure_recording 참고)
+    보내는 응답 바이트를 복사해 두었다가 처리가 끝나면 RECORDER에 넘깁니다.
+    """
+    wfile = handler.wfile
+    tee = handler.wfile = ResponseTee(wfile)
+    start = time.perf_counter()
+    try:
+        call_next(handler)
+    finally:
+        handler.wfile = wfile
+        RECORDER.record(handler, route, start, time.perf_counter() - start, tee.getvalue())
+
+
+def call_endpoint(handler, route):
+    """처리 함수 호출: body=True인 경로는 요청 본문을, 경로 매개변수는 이름으로 넘김"""
+    if route.options.get('body'):
+        return route.endpoint(handler, handler.body, **handler.path_params)
+    return route.endpoint(handler, **handler.path_params)
+
+
+# ============================================
+# 경로 표 (메서드 + 경로 -> 처리 함수)
+# ============================================
+# 새 API를 만들 때는 처리 함수를 GameHandler에 만들고 여기에 한 줄 추가하면 됩니다.
+#   body=True: 요청 본문을 처리 함수에 넘김
+#   session_lock=True: 세션 잠금을 잡고 처리
+#   admin=True: 관리자 토큰 확인 (--admin-token을 설정했을 때만)
+#   profile=False: 요청 프로파일링에서 뺌 (--profile을 켰을 때)
+#   경로 매개변수: '/api/posts/{id:int}' -> 처리 함수에 id=3처럼 넘김
+MIDDLEWARES = [timing_middleware, session_middleware, auth_middleware, compression_middleware]
+ROUTES = Router(call_endpoint, middlewares=MIDDLEWARES)
+ROUTES.add('GET', '/api/game-state', GameHandler.handle_get_game_state, session_lock=True)
+ROUTES.add('GET', '/api/posts', GameHandler.handle_get_posts)
+ROUTES.add('GET', '/api/posts/{id:int}', GameHandler.handle_get_post)
+ROUTES.add('GET', '/api/auth/check', GameHandler.handle_get_auth_check)
+ROUTES.add('GET', '/api/leaderboard', GameHandler.handle_get_leaderboard)
+ROUTES.add('GET', '/api/hint', GameHandler.handle_get_hint)
+ROUTES.add('GET', '/api/metrics', GameHandler.handle_get_metrics)
+ROUTES.add('GET', '/api/debug/profile', GameHandler.handle_get_debug_profile, admin=True, profile=False)
+ROUTES.add('POST', '/api/debug/profile/reset', GameHandler.handle_post_debug_profile_reset, admin=True, profile=False)
+ROUTES.add('POST', '/api/game-state', GameHandler.handle_post_game_state, body=True, session_lock=True)
+ROUTES.add('POST', '/api/action', GameHandler.handle_post_action, body=True, session_lock=True)
+ROUTES.add('POST', '/api/actions/batch', GameHandler.handle_post_actions_batch, body=True, session_lock=True)
+ROUTES.add('POST', '/api/reset', GameHandler.handle_post_reset, session_lock=True)
+ROUTES.add('POST', '/api/posts/update', GameHandler.handle_post_update_post, body=True, admin=True)
+ROUTES.add('POST', '/api/posts/create', GameHandler.handle_post_create_post, body=True, admin=True)
+ROUTES.add('POST', '/api/posts/delete', GameHandler.handle_post_delete_post, body=True, admin=True)
+ROUTES.add('POST', '/api/auth/register', GameHandler.handle_post_register, body=True)
+ROUTES.add('POST', '/api/auth/login', GameHandler.handle_post_login, body=True)
+
+
+# ============================================
+# 요청 프로파일링 (cProfile)
+# ============================================
+# 환경 변수 ECHOCHAMBER_PROFILE 또는 python3 server.py --profile 로 켭니다.
+#   0.05: 요청의 5%를 측정, header: X-Profile: 1 헤더를 보낸 요청만 측정
+# 꺼져 있으면 profiling_middleware를 경로 표에 넣지 않으므로 비용이 없습니다.
+PROFILER = None
+
+
+def configure_profiling(setting):
+    """
+    프로파일링을 켜거나 끕니다. (setting: parse_setting()이 읽는 값, None이면 끔)
+    켜면 가장 안쪽(처리 함수 바로 앞)에 profiling_middleware를 넣어서
+    세션 잠금을 기다린 시간은 빼고 처리 함수만 측정합니다.
+    """
+    global PROFILER
+    rate = parse_setting(setting)
+    PROFILER = None if rate is None else RequestProfiler(sample_rate=rate)
+    install_middlewares()
+
+
+# ============================================
+# 요청 녹화 (traffic.py)
+# ============================================
+# 환경 변수 ECHOCHAMBER_RECORD 또는 python3 server.py --record 파일 로 켭니다.
+# 녹화한 요청은 python3 traffic.py replay 로 다시 보낼 수 있습니다.
+RECORDER = None
+
+
+def configure_recording(path):
+    """요청 녹화를 켜거나(path: 녹화 파일) 끕니다(None). 파일에는 run_server가 켠 로그 스레드가 씀"""
+    global RECORDER
+    RECORDER = TrafficRecorder(path) if path else None
+    install_middlewares()
+
+
+def install_middlewares():
+    """
+    켜져 있는 기능에 맞게 경로 표의 미들웨어를 다시 감쌉니다.
+    녹화는 가장 바깥(처리 시간 전체를 잼), 프로파일링은 가장 안쪽(처리 함수만 잼)
+    """
+    middlewares = list(MIDDLEWARES)
+    if RECORDER is not None:
+        middlewares.insert(0, recording_middleware)
+    if PROFILER is not None:
+        middlewares.append(profiling_middleware)
+    ROUTES.set_middlewares(middlewares)
+
+
+configure_profiling(os.environ.get('ECHOCHAMBER_PROFILE'))
+configure_recording(os.environ.get('ECHOCHAMBER_RECORD'))
+
+
+# ============================================
+# 동시 처리 서버 (작업자 스레드 풀)
+# ============================================
+
+class PooledHTTPServer(HTTPServer):
+    """
+    정해진 개수의 작업자 스레드로 요청을 동시에 처리하는 서버
+
+    기본 HTTPServer는 요청을 하나씩 차례로 처리하기 때문에,
+    느린 요청 하나가 있으면 다른 모든 플레이어가 기다려야 합니다.
+    이 서버는 받은 연결을 대기열(queue)에 넣고, 작업자 스레드들이 꺼내서 처리합니다.
+    - workers: 작업자 스레드 수 (동시에 처리할 수 있는 요청 수)
+    - queue_size: 대기열 크기 (꽉 차면 새 요청은 503으로 바로 거절)
+    - keep_alive_timeout: 응답 후 다음 요청 없이 이 시간(초)이 지나면 연결을 닫음
+
+    HTTP/1.1 연결 유지(keep-alive):
+    응답을 보낸 연결은 닫지 않고 "쉬는 연결" 목록에 맡겨 둡니다(park).
+    감시 스레드 하나가 selector로 쉬는 연결들을 한꺼번에 지켜보다가,
+    다음 요청이 도착한 연결만 다시 대기열에 넣습니다.
+    그래서 다음 요청을 기다리는 연결이 작업자 스레드를 붙잡고 있지 않습니다.
+    """
+
+    # 작업자 스레드가 요청을 끝낼 때까지 종료를 기다리지 않음
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, workers=8, queue_size=64,
+                 keep_alive_timeout=KEEP_ALIVE_TIMEOUT):
+        super().__init__(server_address, handler_class)
+        self.keep_alive_timeout = keep_alive_timeout
+        self._requests = queue.Queue(maxsize=queue_size)
+        self._workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"worker-{i + 1}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        # 쉬는 연결 감시: 맡겨진 연결은 _to_park에 넣고 _wakeup으로 감시 스레드를 깨움
+        self._selector = selectors.DefaultSelector()
+        self._to_park = queue.SimpleQueue()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self._closing = False
+        self._poller = threading.Thread(target=self._poll_loop, name="keep-alive", daemon=True)
+        self._poller.start()
+
+    def process_request(self, request, client_address):
+        """연결을 바로 처리하지 않고 대기열에 넣습니다."""
+        try:
+            self._requests.put_nowait((request, client_address))
+        except queue.Full:
+            # 대기열이 꽉 찼으면 기다리게 하지 않고 바로 거절
+            try:
+                request.sendall(b"HTTP/1.0 503 Service Unavailable\r\n"
+                                b"Retry-After: 1\r\n"
+                                b"Content-Length: 0\r\n\r\n")
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def _worker_loop(self):
+        """대기열에서 연결을 하나씩 꺼내 처리하는 작업자 스레드"""
+        while True:
+            item = self._requests.get()
+            if item is None:
+                break
+            request, client_address = item
+            parked = False
+            try:
+                handler = self.RequestHandlerClass(request, client_address, self)
+                parked = getattr(handler, 'parked', False)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                # 쉬는 연결 목록에 맡긴 연결은 닫지 않음
+                if not parked:
+                    self.shutdown_request(request)
+
+    # ----------------------------------------
+    # 쉬는 연결 (keep-alive)
+    # ----------------------------------------
+
+    def park(self, request, client_address):
+        """응답을 다 보낸 연결을 다음 요청이 올 때까지 맡겨 둡니다. (핸들러가 호출)"""
+        if self._closing:
+            self.shutdown_request(request)
+            return
+        self._to_park.put((request, client_address))
+        try:
+            self._wakeup_send.send(b'\0')
+        except OSError:
+            pass
+
+    def _poll_loop(self):
+        """
+        쉬는 연결들을 지켜보는 감시 스레드
+        - 다음 요청이 도착한 연결(읽을 데이터가 생긴 연결)은 다시 대기열에 넣기
+        - keep_alive_timeout 동안 아무 요청이 없던 연결은 닫기
+        """
+        while not self._closing:
+            for key, _events in self._selector.select(timeout=1.0):
+                if key.fileobj is self._wakeup_recv:
+                    try:
+                        while self._wakeup_recv.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                self.process_request(key.fileobj, key.data[0])
+
+            now = time.monotonic()
+            while True:
+                try:
+                    request, client_address = self._to_park.get_nowait()
+                except queue.Empty:
+                    break
+                deadline = now + self.keep_alive_timeout
+                try:
+                    self._selector.register(request, selectors.EVENT_READ, (client_address, deadline))
+                except (ValueError, OSError):
+                    # 그 사이에 닫힌 연결
+                    self.shutdown_request(request)
+
+            expired = [key.fileobj for key in list(self._selector.get_map().values())
+                       if key.data is not None and key.data[1] < now]
+            for request in expired:
+                self._selector.unregister(request)
+                self.shutdown_request(request)
+
+    def parked_count(self):
+        """지금 쉬고 있는(다음 요청을 기다리는) 연결 수"""
+        return len(self._selector.get_map()) - 1
+
+    def queued_count(self):
+        """대기열에서 작업자를 기다리는 요청 수"""
+        return self._requests.qsize()
+
+    def server_close(self):
+        """서버를 닫고, 쉬는 연결을 모두 닫고, 작업자 스레드들에게 종료 신호(None)를 보냅니다."""
+        super().server_close()
+        self._closing = True
+        self._wakeup_send.send(b'\0')
+        self._poller.join()
+        for key in list(self._selector.get_map().values()):
+            if key.fileobj is not self._wakeup_recv:
+                self.shutdown_request(key.fileobj)
+        while True:
+            try:
+                request, _client_address = self._to_park.get_nowait()
+            except queue.Empty:
+                break
+            self.shutdown_request(request)
+        self._selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+        for _ in self._workers:
+            self._requests.put(None)
 
 
 # ============================================
 # 서버 실행
 # ============================================
 
-def run_server(port=8000):
+def _stop_on_sigterm(signum, frame):
+    """kill 명령(SIGTERM)으로 종료할 때도 Ctrl+C와 똑같이 정리하고 끝내기"""
+    raise KeyboardInterrupt
+
+
+def run_server(port=8000, workers=0, queue_size=64, keep_alive_timeout=KEEP_ALIVE_TIMEOUT,
+               storage='json', db_path=DEFAULT_DB_FILE, write_window=None, fsync=False,
+               write_behind=True, flush_interval=FLUSH_INTERVAL, admin_token=None, profile=None,
+               log_level='INFO', access_log=ACCESS_LOG_FILE, record=None, pretty_json=False):
     """
     서버를 실행합니다.
     
+    입력:
+        port: 포트 번호
+        workers: 작업자 스레드 수 (0이면 요청을 하나씩 차례로 처리하는 기본 서버)
+        queue_size: 작업자 스레드 풀의 대기열 크기
+        keep_alive_timeout: 동시 처리 모드에서 다음 요청을 기다리며 연결을 유지하는 시간(초)
+        storage: 저장소 ('json': JSON 파일, 'sqlite': SQLite 데이터베이스)
+        db_path: SQLite 데이터베이스 파일 경로
+        write_window: JSON 파일 저장 요청을 모아서 한 번에 쓰는 시간(초)
+                      (None이면 동시 처리 모드에서만 WRITE_WINDOW, 요청을 하나씩 처리할 때는 모을 요청이 없으므로 0)
+        fsync: True면 JSON 파일을 저장할 때 디스크에 기록될 때까지 기다림
+        write_behind: True면 JSON 파일 저장을 기다리지 않고 응답한 뒤 백그라운드에서 씀
+        flush_interval: 나중에 쓰기 모드에서 파일에 쓰는 간격(초)
+        admin_token: 게시글 관리 API의 관리자 토큰 (None이면 환경 변수 값 그대로)
+        profile: 요청 프로파일링 설정 ('0.05', 'header', None이면 환경 변수 값 그대로)
+        log_level: 서버 로그 단계 ('DEBUG'면 게임 상태 같은 디버그 내용도 남김)
+        access_log: 접속 기록 파일 경로 ('-'이면 화면, None이면 남기지 않음)
+        record: 요청 녹화 파일 경로 (None이면 환경 변수 값 그대로)
+        pretty_json: True면 JSON 파일을 들여쓰기 2칸으로 저장 (기본: 공백 없는 한 줄)
+    
     사용법:
         python3 server.py
+        python3 server.py --workers 16 --queue-size 256   # 동시 처리 모드
+        python3 server.py --storage sqlite                 # SQLite 저장소
     """
+    global ADMIN_TOKEN, PRETTY_JSON
+    PRETTY_JSON = pretty_json
+    if record is not None:
+        configure_recording(record)
+    if RECORDER is not None:
+        RECORDER.start()
+    start_logging(level=log_level, access_log=access_log,
+                  traffic_log=RECORDER.path if RECORDER is not None else None)
+    if admin_token is not None:
+        ADMIN_TOKEN = admin_token
+    if profile is not None:
+        configure_profiling(profile)
+    if PROFILER is not None:
+        how = f"요청의 {PROFILER.sample_rate:.0%}" if PROFILER.sample_rate > 0 else "X-Profile: 1 헤더를 보낸 요청"
+        LOG.info("프로파일링: %s 측정 (결과: GET /api/debug/profile)", how)
+    LOG.info("JSON 변환: %s (파일 저장: %s)", codec.NAME, "들여쓰기" if PRETTY_JSON else "한 줄")
+    if write_window is None:
+        write_window = WRITE_WINDOW if workers > 0 else 0
+    WRITER.configure(window=write_window, fsync=fsync, write_behind=write_behind, flush_interval=flush_interval)
+    if storage != STORAGE.name:
+        configure_storage(open_storage(storage, db_path))
+        LOG.info("저장소: %s (%s)", storage, db_path)
     server_address = ('', port)
-    httpd = HTTPServer(server_address, GameHandler)
-    print(f"서버가 http://localhost:{port} 에서 실행 중입니다...")
-    print("종료하려면 Ctrl+C를 누르세요.")
+    if workers > 0:
+        httpd = PooledHTTPServer(server_address, GameHandler, workers=workers, queue_size=queue_size,
+                                 keep_alive_timeout=keep_alive_timeout)
+        LOG.info("동시 처리 모드: 작업자 %d개, 대기열 %d개, 연결 유지 %s초", workers, queue_size, keep_alive_timeout)
+        TELEMETRY.gauge('echochamber_keepalive_parked_connections', "다음 요청을 기다리는 연결 수", httpd.parked_count)
+        TELEMETRY.gauge('echochamber_worker_queue_length', "작업자를 기다리는 요청 수", httpd.queued_count)
+    else:
+        httpd = HTTPServer(server_address, GameHandler)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    # 이벤트 로그 압축과 오래 안 쓴 세션 내보내기를 백그라운드에서 주기적으로 실행
+    SESSIONS.start_background()
+    # 나중에 쓰기 모드: 저장 요청을 모아 두었다가 백그라운드에서 파일에 쓰기
+    if write_behind:
+        WRITER.start_background()
+    if access_log is not None:
+        LOG.info("접속 기록: %s", access_log if access_log != '-' else "화면")
+    if RECORDER is not None:
+        LOG.info("요청 녹화: %s (다시 보내기: python3 traffic.py replay)", RECORDER.path)
+    LOG.info("서버가 http://localhost:%d 에서 실행 중입니다... (종료하려면 Ctrl+C)", port)
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
-        print("\n서버를 종료합니다...")
-        httpd.shutdown()
+        LOG.info("서버를 종료합니다...")
     except Exception as e:
-        print(e.with_traceback())
+        LOG.exception("서버 오류: %s", e)
+    finally:
+        httpd.server_close()
+        # 모든 세션의 이벤트 로그를 스냅샷으로 합치기
+        SESSIONS.stop_background()
+        SESSIONS.flush_all()
+        # 아직 파일에 쓰지 않은 내용을 모두 쓰기
+        WRITER.stop_background()
+        # 프로파일링 결과를 .prof 파일로 남기기
+        if PROFILER is not None:
+            for path in PROFILER.dump(PROFILES_DIR):
+                LOG.info("프로파일링 결과 저장: %s", path)
+        STORAGE.close()
+        # 큐에 남은 로그와 접속 기록을 모두 쓰기
+        stop_logging()
+
+
+def parse_args(argv=None):
+    """명령줄 옵션 읽기 (python3 server.py --help 로 확인)"""
+    parser = argparse.ArgumentParser(description="EchoChamber 게임 백엔드 서버")
+    parser.add_argument('--port', type=int, default=8000, help="포트 번호 (기본 8000)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="작업자 스레드 수 (기본 0: 요청을 하나씩 처리)")
+    parser.add_argument('--queue-size', type=int, default=64,
+                        help="동시 처리 모드의 대기열 크기 (기본 64)")
+    parser.add_argument('--storage', choices=('json', 'sqlite'), default='json',
+                        help="저장소 (기본 json: JSON 파일, sqlite: SQLite 데이터베이스)")
+    parser.add_argument('--db', default=DEFAULT_DB_FILE,
+                        help="SQLite 데이터베이스 파일 (기본 data/echochamber.db)")
+    parser.add_argument('--keep-alive-timeout', type=float, default=KEEP_ALIVE_TIMEOUT,
+                        help=f"동시 처리 모드에서 응답 후 연결을 유지하는 시간(초) (기본 {KEEP_ALIVE_TIMEOUT})")
+    parser.add_argument('--write-window', type=float, default=None,
+                        help=f"JSON 파일 저장 요청을 모아서 한 번에 쓰는 시간(밀리초) "
+                             f"(기본: 동시 처리 모드 {WRITE_WINDOW * 1000:g}, 아니면 0)")
+    parser.add_argument('--fsync', action='store_true',
+                        help="JSON 파일을 저장할 때마다 디스크에 기록될 때까지 기다림 (느리지만 전원이 나가도 안전)")
+    parser.add_argument('--sync-writes', action='store_true',
+                        help="JSON 파일을 다 저장한 뒤에 응답 (기본: 먼저 응답하고 백그라운드에서 저장)")
+    parser.add_argument('--flush-interval', type=float, default=FLUSH_INTERVAL,
+                        help=f"백그라운드에서 JSON 파일을 저장하는 간격(초) (기본 {FLUSH_INTERVAL:g})")
+    parser.add_argument('--admin-token', default=None,
+                        help="게시글 추가/수정/삭제에 필요한 관리자 토큰 (X-Admin-Token 헤더, 기본: 환경 변수 ECHOCHAMBER_ADMIN_TOKEN)")
+    parser.add_argument('--profile', default=None, metavar='RATE|header',
+                        help="요청 프로파일링 (0.05: 요청의 5%%를 측정, header: X-Profile: 1 헤더를 보낸 요청만, "
+                             "기본: 환경 변수 ECHOCHAMBER_PROFILE)")
+    parser.add_argument('--log-level', choices=LOG_LEVELS, default='INFO',
+                        help="서버 로그 단계 (기본 INFO, DEBUG: 게임 상태 같은 디버그 내용도 남김)")
+    parser.add_argument('--access-log', default=ACCESS_LOG_FILE,
+                        help="접속 기록 파일 (기본 data/access.log, '-': 화면, 'off': 남기지 않음)")
+    parser.add_argument('--record', default=None, metavar='FILE',
+                        help="요청을 녹화할 파일 (traffic.py replay로 다시 보내기, 기본: 환경 변수 ECHOCHAMBER_RECORD)")
+    parser.add_argument('--pretty-json', action='store_true',
+                        help="JSON 파일을 들여쓰기 2칸으로 저장 (사람이 읽기 좋지만 느림, 기본: 공백 없는 한 줄)")
+    return parser.parse_args(argv)
 
 
 if __name__ == '__main__':
     # 포트 설정 (기본 8000)
-    PORT = 8000
-    run_server(PORT)
-
+    args = parse_args()
+    run_server(args.port, workers=args.workers, queue_size=args.queue_size,
+               keep_alive_timeout=args.keep_alive_timeout, storage=args.storage, db_path=args.db,
+               write_window=None if args.write_window is None else args.write_window / 1000,
+               fsync=args.fsync, write_behind=not args.sync_writes, flush_interval=args.flush_interval,
+               admin_token=args.admin_token, profile=args.profile, log_level=args.log_level,
+               access_log=None if args.access_log == 'off' else args.access_log, record=args.record,
+               pretty_json=args.pretty_json)
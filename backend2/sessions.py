@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+세션별 게임 상태 저장소
+
+플레이어(세션)마다 게임 상태를 따로 보관합니다.
+- 최근에 사용한 세션은 메모리에 올려둡니다. (LRU: 가장 오래 안 쓴 것부터 내보냄)
+- 오래 안 쓴 세션이나, 메모리에 올릴 수 있는 개수를 넘친 세션은 파일로 내보냅니다.
+- 파일로 내보낸 세션은 다음 요청이 왔을 때 다시 읽어옵니다.
+
+게임 상태가 바뀔 때마다 파일 전체를 다시 쓰지 않고,
+바뀐 부분만 한 줄짜리 기록(이벤트)으로 로그 파일 끝에 덧붙입니다.
+- 스냅샷 파일(.json): 어느 순간의 게임 상태 전체
+- 이벤트 로그 파일(.log): 스냅샷 이후의 변경 기록 (JSON 한 줄에 하나)
+게임 상태 = 스냅샷 + 로그의 변경 기록을 차례로 적용한 결과
+로그가 길어지면 백그라운드 스레드가 로그를 스냅샷에 합치고 로그를 비웁니다. (압축)
+
+세션 id가 'default'인 세션은 예전처럼 game-state.json 파일을 스냅샷으로 사용합니다.
+"""
+
+import copy
+import itertools
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+import codec
+
+DEFAULT_SESSION_ID = 'default'
+
+# 세션 id로 쓸 수 있는 글자: 영문, 숫자, '-', '_' (파일 이름으로 쓰기 때문에 제한)
+_SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def is_valid_session_id(session_id):
+    """세션 id가 파일 이름으로 안전하게 쓸 수 있는 형태인지 확인합니다."""
+    return bool(session_id) and _SESSION_ID_PATTERN.match(session_id) is not None
+
+
+class SessionStore:
+    """
+    세션 id -> 게임 상태 딕셔너리를 보관하는 저장소
+
+    사용 예시:
+        store = SessionStore(SESSIONS_DIR, GAME_STATE_FILE, load_json_file, save_json_file, DEFAULT_GAME_STATE)
+        with store.lock(session_id):
+            game_state = store.get(session_id)
+            game_state['day'] += 1
+            store.put(session_id, game_state, {"type": "nextDay"})
+    """
+
+    # 세션 잠금 개수 (세션 수와 상관없이 잠금 개수를 일정하게 유지)
+    LOCK_STRIPES = 64
+
+    def __init__(self, session_dir, default_file, load, save, default_state,
+                 max_hot=1000, idle_seconds=600, compact_every=100):
+        """
+        입력:
+            session_dir: 세션 파일을 저장할 폴더 (data/sessions)
+            default_file: 'default' 세션이 사용할 스냅샷 파일 (game-state.json)
+            load, save: load_json_file, save_json_file
+            default_state: 새 세션의 초기 게임 상태
+            max_hot: 메모리에 올려둘 최대 세션 수
+            idle_seconds: 이 시간(초) 동안 사용하지 않은 세션은 메모리에서 내보냄
+            compact_every: 로그에 기록이 이만큼 쌓이면 스냅샷으로 압축
+        """
+        self.session_dir = session_dir
+        self.default_file = default_file
+        self._load = load
+        self._save = save
+        self._default_state = default_state
+        self.max_hot = max_hot
+        self.idle_seconds = idle_seconds
+        self.compact_every = compact_every
+        # 세션 id -> {"state", "shadow", "pending", "version", "lastAccess"}
+        #   shadow: 마지막으로 로그/스냅샷에 기록된 상태 (바뀐 부분을 찾을 때 비교용)
+        #   pending: 스냅샷 이후 로그에 쌓인 기록 수
+        #   version: 게임 상태의 버전 (ETag용, 모든 세션이 같은 카운터를 사용하므로
+        #            메모리에서 내보냈다가 다시 읽어와도 예전 버전과 겹치지 않음)
+        self._hot = OrderedDict()
+        self._versions = itertools.count(1)
+        self._guard = threading.Lock()
+        self._stripes = [threading.RLock() for _ in range(self.LOCK_STRIPES)]
+        self._worker = None
+        self._stop = threading.Event()
+
+    def path_for(self, session_id):
+        """세션의 스냅샷 파일 경로"""
+        if session_id == DEFAULT_SESSION_ID:
+            return self.default_file
+        return os.path.join(self.session_dir, f"{session_id}.json")
+
+    def log_path_for(self, session_id):
+        """세션의 이벤트 로그 파일 경로 (스냅샷 파일 이름에서 확장자만 .log)"""
+        return os.path.splitext(self.path_for(session_id))[0] + '.log'
+
+    def lock(self, session_id):
+        """
+        세션 하나를 읽고-고치고-저장하는 동안 잡는 잠금
+        (다른 세션의 요청은 서로 기다리지 않고 동시에 처리됨)
+        """
+        return self._stripes[hash(session_id) % self.LOCK_STRIPES]
+
+    # ----------------------------------------
+    # 조회 / 저장
+    # ----------------------------------------
+
+    def get(self, session_id):
+        """
+        세션의 게임 상태를 돌려줍니다.
+        메모리에 없으면 스냅샷 + 이벤트 로그로 다시 만들고, 둘 다 없으면 초기 상태로 시작합니다.
+        (같은 세션을 동시에 읽지 않도록 lock(session_id)을 잡고 호출하세요)
+        """
+        with self._guard:
+            entry = self._hot.get(session_id)
+            if entry is not None:
+                self._hot.move_to_end(session_id)
+                entry['lastAccess'] = time.monotonic()
+                return entry['state']
+
+        state = self._load(self.path_for(session_id), None)
+        if state is None:
+            state = copy.deepcopy(self._default_state)
+        pending = self._replay_log(session_id, state)
+        self._remember(session_id, {
+            "state": state,
+            "shadow": copy.deepcopy(state),
+            "pending": pending,
+            "version": next(self._versions),
+            "lastAccess": time.monotonic(),
+        })
+        return state
+
+    def put(self, session_id, state, event=None):
+        """
+        세션의 게임 상태를 바꾸고, 바뀐 부분을 이벤트 로그에 한 줄 덧붙입니다.
+
+        입력:
+            state: 새 게임 상태
+            event: 무엇 때문에 바뀌었는지 (예: {"type": "action", "postId": 1, "action": "approve"})
+        """
+        with self._guard:
+            entry = self._hot.get(session_id)
+        if entry is None:
+            # 메모리에 없던 세션이면 먼저 불러와서 비교할 기준(shadow)을 만들기
+            self.get(session_id)
+            with self._guard:
+                entry = self._hot[session_id]
+
+        shadow = entry['shadow']
+        changed = {key: value for key, value in state.items() if shadow.get(key) != value}
+        removed = [key for key in shadow if key not in state]
+        record = {"event": event or {}, "set": changed}
+        if removed:
+            record["unset"] = removed
+        self._append_log(session_id, record)
+
+        entry['state'] = state
+        entry['shadow'] = copy.deepcopy(state)
+        entry['pending'] += 1
+        entry['version'] = next(self._versions)
+        entry['lastAccess'] = time.monotonic()
+        self._remember(session_id, entry)
+
+    def version(self, session_id):
+        """
+        세션 게임 상태의 버전 (put()으로 바뀔 때마다 달라짐)
+        (get()과 마찬가지로 lock(session_id)을 잡고 호출하세요)
+        """
+        with self._guard:
+            entry = self._hot.get(session_id)
+        if entry is None:
+            self.get(session_id)
+            with self._guard:
+                entry = self._hot[session_id]
+        return entry['version']
+
+    def _remember(self, session_id, entry):
+        with self._guard:
+            self._hot[session_id] = entry
+            self._hot.move_to_end(session_id)
+            # 방금 사용한 세션은 맨 뒤에 있으므로 앞쪽(가장 오래 안 쓴 것)만 확인
+            overflow = list(islice(self._hot, max(0, len(self._hot) - self.max_hot)))
+        # 메모리에 올릴 수 있는 개수를 넘었으면 가장 오래 안 쓴 세션부터 내보내기
+        for sid in overflow:
+            self._evict(sid)
+
+    # ----------------------------------------
+    # 이벤트 로그
+    # ----------------------------------------
+
+    def _append_log(self, session_id, record):
+        """로그 파일 끝에 기록 한 줄 덧붙이기 (파일 전체를 다시 쓰지 않음)"""
+        path = self.log_path_for(session_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        line = codec.dumps(record)
+        with open(path, 'ab') as f:
+            f.write(line + b'\n')
+
+    def _replay_log(self, session_id, state):
+        """
+        스냅샷(state)에 로그의 기록을 차례로 적용합니다.
+
+        기록에는 바뀐 값 자체가 들어 있어서 같은 기록을 두 번 적용해도 결과가 같습니다.
+        (압축 도중 서버가 꺼져서 스냅샷에 이미 합쳐진 기록이 다시 적용되어도 안전)
+
+        출력: 적용한 기록 수
+        """
+        try:
+            f = open(self.log_path_for(session_id), 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return 0
+        count = 0
+        with f:
+            for line in f:
+                try:
+                    record = codec.loads(line)
+                except ValueError:
+                    # 쓰다가 끊긴 마지막 줄은 건너뛰기
+                    continue
+                state.update(record.get('set', {}))
+                for key in record.get('unset', []):
+                    state.pop(key, None)
+                count += 1
+        return count
+
+    def _compact(self, session_id, entry):
+        """
+        로그를 스냅샷에 합칩니다: 현재 상태를 스냅샷 파일에 저장한 뒤 로그 파일을 지웁니다.
+        (세션 잠금을 잡은 상태에서 호출)
+        """
+        if entry['pending'] == 0:
+            return
+        if self._save(self.path_for(session_id), entry['shadow']) is False:
+            return
+        try:
+            os.remove(self.log_path_for(session_id))
+        except FileNotFoundError:
+            pass
+        entry['pending'] = 0
+
+    def compact_due(self):
+        """로그에 기록이 compact_every개 이상 쌓인 세션들을 압축합니다."""
+        with self._guard:
+            due = [sid for sid, entry in self._hot.items() if entry['pending'] >= self.compact_every]
+        compacted = 0
+        for sid in due:
+            lock = self.lock(sid)
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                with self._guard:
+                    entry = self._hot.get(sid)
+                if entry is not None:
+                    self._compact(sid, entry)
+                    compacted += 1
+            finally:
+                lock.release()
+        return compacted
+
+    # ----------------------------------------
+    # 메모리에서 내보내기
+    # ----------------------------------------
+
+    def _evict(self, session_id, blocking=False):
+        """세션을 스냅샷으로 압축하고 메모리에서 뺍니다. (사용 중인 세션은 건너뜀)"""
+        lock = self.lock(session_id)
+        if not lock.acquire(blocking=blocking):
+            return False
+        try:
+            with self._guard:
+                entry = self._hot.pop(session_id, None)
+            if entry is not None:
+                self._compact(session_id, entry)
+            return True
+        finally:
+            lock.release()
+
+    def evict_idle(self):
+        """idle_seconds 동안 사용하지 않은 세션을 모두 메모리에서 내보냅니다."""
+        deadline = time.monotonic() - self.idle_seconds
+        with self._guard:
+            idle = [sid for sid, entry in self._hot.items() if entry['lastAccess'] < deadline]
+        return sum(1 for sid in idle if self._evict(sid))
+
+    def flush_all(self):
+        """메모리에 있는 모든 세션을 스냅샷으로 압축합니다. (서버 종료 시 사용)"""
+        with self._guard:
+            session_ids = list(self._hot)
+        for sid in session_ids:
+            self._evict(sid, blocking=True)
+
+    def hot_count(self):
+        """현재 메모리에 올라와 있는 세션 수"""
+        with self._guard:
+            return len(self._hot)
+
+    # ----------------------------------------
+    # 백그라운드 정리 스레드
+    # ----------------------------------------
+
+    def start_background(self, interval=10):
+        """
+        interval초마다 로그 압축과, 오래 안 쓴 세션 내보내기를 하는
+        백그라운드 스레드를 시작합니다.
+        """
+        if self._worker is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.compact_due()
+                self.evict_idle()
+
+        self._worker = threading.Thread(target=loop, name="session-compactor", daemon=True)
+        self._worker.start()
+
+    def stop_background(self):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
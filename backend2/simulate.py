@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EchoChamber 플레이 시뮬레이터 (몬테카를로)
+
+UI를 클릭하지 않고도, 게시글 영향값(posts.json)을 바꿨을 때
+플레이어들이 어떤 엔딩을 얼마나 자주 보게 되는지 확인할 수 있습니다.
+- 서버의 /api/action과 똑같은 규칙(engine.py)으로 게임을 끝까지 진행합니다.
+- 여러 게임을 배열로 묶어서 한 턴씩 동시에 계산하고, 여러 프로세스에 나눠서 실행합니다.
+- 엔딩별 비율, 엔딩이 나온 턴의 분포(히스토그램), 처리 속도를 보여줍니다.
+
+사용법:
+    python3 simulate.py                                   # 무작위 정책으로 10만 게임
+    python3 simulate.py --games 1000000 --policy greedy   # 탐욕 정책으로 100만 게임
+    python3 simulate.py --policy approve --json           # 결과를 JSON으로 출력
+
+정책(policy):
+    random  : 통과/경고/삭제 중 무작위로 선택
+    approve : 항상 통과
+    greedy  : 한 턴 앞을 내다보고, 나쁜 엔딩을 피하면서 지표 합이 가장 큰 액션 선택
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import (ACTION_CODES, ENDING_NAMES, METRICS, NO_ENDING, TRUE_ENDING_CODE,
+                    ImpactEngine, ending_codes, np)
+from server import DEFAULT_GAME_STATE, POSTS_FILE, load_json_file
+
+# 나쁜 엔딩으로 가는 선택에 주는 점수 (greedy 정책에서 사용)
+_BAD_ENDING_SCORE = -1e9
+
+
+# ============================================
+# 정책: 지금 상태를 보고 게임마다 액션 코드를 고르는 함수
+# ============================================
+# policy(engine, metrics, rows, turn, rng) -> 게임별 액션 코드
+#   metrics: 게임별 지표 (게임 수 x 4), rows: 이번 턴 게시글의 행 번호
+#   turn: 이번 턴 번호 (0부터), rng: 난수 생성기
+# NumPy가 있으면 metrics/rows는 NumPy 배열, rng는 numpy.random.Generator
+# 없으면 파이썬 리스트와 random.Random 입니다.
+
+def policy_random(engine, metrics, rows, turn, rng):
+    """통과/경고/삭제 중 무작위로 선택"""
+    if np is not None:
+        return rng.integers(0, len(ACTION_CODES), size=len(rows))
+    return [rng.randrange(len(ACTION_CODES)) for _ in rows]
+
+
+def policy_approve(engine, metrics, rows, turn, rng):
+    """항상 통과"""
+    if np is not None:
+        return np.full(len(rows), ACTION_CODES['approve'], dtype=np.intp)
+    return [ACTION_CODES['approve']] * len(rows)
+
+
+def policy_greedy(engine, metrics, rows, turn, rng):
+    """
+    세 액션을 모두 적용해 보고, 트루엔딩이 아닌 엔딩으로 끝나는 액션은 피하면서
+    지표 합이 가장 큰 액션을 고릅니다. (같으면 통과 > 경고 > 삭제 순서)
+    """
+    total = len(engine)
+    scores = []
+    for code in range(len(ACTION_CODES)):
+        codes = np.full(len(rows), code, dtype=np.intp) if np is not None else [code] * len(rows)
+        after = engine.apply_many(metrics, rows, codes)
+        endings = ending_codes(after, turn + 1, total)
+        if np is not None:
+            bad = (endings != NO_ENDING) & (endings != TRUE_ENDING_CODE)
+            scores.append(np.where(bad, _BAD_ENDING_SCORE, after.sum(axis=1)))
+        else:
+            scores.append([_BAD_ENDING_SCORE if e not in (NO_ENDING, TRUE_ENDING_CODE) else sum(values)
+                           for values, e in zip(after, endings)])
+    if np is not None:
+        return np.argmax(np.stack(scores), axis=0)
+    return [max(range(len(scores)), key=lambda code: (scores[code][g], -code)) for g in range(len(rows))]
+
+
+POLICIES = {
+    'random': policy_random,
+    'approve': policy_approve,
+    'greedy': policy_greedy,
+}
+
+
+# ============================================
+# 시뮬레이션 (프로세스 하나가 맡는 게임 묶음)
+# ============================================
+
+def simulate_chunk(posts, policy_name, games, seed, shuffle=False, start=None):
+    """
+    게임 games개를 끝까지 진행합니다.
+
+    입력:
+        posts: 게시글 리스트
+        policy_name: POLICIES의 이름
+        games: 게임 수
+        seed: 난수 시드 (같으면 결과도 같음)
+        shuffle: True면 게임마다 게시글 순서를 섞음 (기본: posts.json 순서대로)
+        start: 시작 지표 (freedom, order, trust, diversity)
+
+    출력:
+        {"endings": [엔딩별 게임 수],
+         "turns": [[엔딩별로, 엔딩이 나온 턴(1~게시글 수)별 게임 수], ...]}
+    """
+    engine = ImpactEngine(posts)
+    policy = POLICIES[policy_name]
+    start = tuple(start or (DEFAULT_GAME_STATE[name] for name in METRICS))
+    if np is not None:
+        endings, turns = _run_numpy(engine, policy, games, seed, shuffle, start)
+    else:
+        endings, turns = _run_python(engine, policy, games, seed, shuffle, start)
+
+    total = len(engine)
+    counts = [0] * len(ENDING_NAMES)
+    histogram = [[0] * (total + 1) for _ in ENDING_NAMES]
+    if np is not None:
+        flat = np.bincount(endings * (total + 1) + turns, minlength=len(ENDING_NAMES) * (total + 1))
+        histogram = flat.reshape(len(ENDING_NAMES), total + 1).tolist()
+        counts = [sum(row) for row in histogram]
+    else:
+        for code, turn in zip(endings, turns):
+            counts[code] += 1
+            histogram[code][turn] += 1
+    return {"endings": counts, "turns": histogram}
+
+
+def _run_numpy(engine, policy, games, seed, shuffle, start):
+    """NumPy 배열로 모든 게임을 한 턴씩 함께 진행"""
+    rng = np.random.default_rng(seed)
+    total = len(engine)
+    metrics = np.tile(np.asarray(start, dtype=np.float64), (games, 1))
+    endings = np.full(games, NO_ENDING, dtype=np.int64)
+    turns = np.zeros(games, dtype=np.int64)
+    order = None
+    if shuffle:
+        order = rng.permuted(np.tile(np.arange(total), (games, 1)), axis=1)
+    active = np.arange(games)  # 아직 끝나지 않은 게임 번호
+    for turn in range(total):
+        if active.size == 0:
+            break
+        rows = order[active, turn] if shuffle else np.full(active.size, turn, dtype=np.intp)
+        current = metrics[active]
+        codes = policy(engine, current, rows, turn, rng)
+        current = engine.apply_many(current, rows, codes)
+        metrics[active] = current
+        finished = ending_codes(current, turn + 1, total)
+        done = finished != NO_ENDING
+        endings[active[done]] = finished[done]
+        turns[active[done]] = turn + 1
+        active = active[~done]
+    return endings, turns
+
+
+def _run_python(engine, policy, games, seed, shuffle, start):
+    """NumPy가 없을 때: 같은 과정을 파이썬 리스트로 진행"""
+    rng = random.Random(seed)
+    total = len(engine)
+    metrics = [list(start) for _ in range(games)]
+    endings = [NO_ENDING] * games
+    turns = [0] * games
+    order = None
+    if shuffle:
+        order = []
+        for _ in range(games):
+            rows = list(range(total))
+            rng.shuffle(rows)
+            order.append(rows)
+    active = list(range(games))
+    for turn in range(total):
+        if not active:
+            break
+        rows = [order[g][turn] for g in active] if shuffle else [turn] * len(active)
+        current = [metrics[g] for g in active]
+        codes = policy(engine, current, rows, turn, rng)
+        current = engine.apply_many(current, rows, codes)
+        finished = ending_codes(current, turn + 1, total)
+        still_active = []
+        for g, values, code in zip(active, current, finished):
+            metrics[g] = values
+            if code == NO_ENDING:
+                still_active.append(g)
+            else:
+                endings[g] = code
+                turns[g] = turn + 1
+        active = still_active
+    return endings, turns
+
+
+# ============================================
+# 여러 프로세스에 나눠서 실행하고 결과 합치기
+# ============================================
+
+def run(posts, policy_name='random', games=100000, workers=None, chunk=None, seed=0, shuffle=False):
+    """
+    games개의 게임을 chunk개씩 나눠서 workers개의 프로세스로 실행합니다.
+
+    출력:
+        {"policy", "games", "seconds", "gamesPerSecond", "decisionsPerSecond",
+         "endings": {엔딩 이름: 게임 수}, "turns": {엔딩 이름: [턴별 게임 수]}}
+    """
+    if policy_name not in POLICIES:
+        raise ValueError(f"알 수 없는 정책: {policy_name} (가능: {', '.join(POLICIES)})")
+    if not posts:
+        raise ValueError("게시글이 없어서 게임을 진행할 수 없습니다.")
+    workers = workers or os.cpu_count() or 1
+    chunk = chunk or (100000 if np is not None else 10000)
+    sizes = [min(chunk, games - done) for done in range(0, games, chunk)]
+
+    started = time.perf_counter()
+    jobs = [(posts, policy_name, size, seed + i, shuffle) for i, size in enumerate(sizes)]
+    if workers == 1 or len(jobs) == 1:
+        results = [simulate_chunk(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate_chunk, *zip(*jobs)))
+    seconds = time.perf_counter() - started
+
+    total = len(posts)
+    counts = [0] * len(ENDING_NAMES)
+    histogram = [[0] * (total + 1) for _ in ENDING_NAMES]
+    for result in results:
+        for code, count in enumerate(result['endings']):
+            counts[code] += count
+        for code, row in enumerate(result['turns']):
+            for turn, count in enumerate(row):
+                histogram[code][turn] += count
+    decisions = sum(turn * count for row in histogram for turn, count in enumerate(row))
+    return {
+        "policy": policy_name,
+        "games": games,
+        "shuffle": shuffle,
+        "seconds": seconds,
+        "gamesPerSecond": games / seconds if seconds else 0.0,
+        "decisionsPerSecond": decisions / seconds if seconds else 0.0,
+        "endings": {name: counts[code] for code, name in enumerate(ENDING_NAMES)},
+        "turns": {name: histogram[code] for code, name in enumerate(ENDING_NAMES)},
+    }
+
+
+def print_report(report):
+    """결과를 사람이 읽기 좋은 표로 출력"""
+    games = report['games'] or 1
+    print(f"정책: {report['policy']}   게임 수: {report['games']:,}"
+          f"   게시글 순서: {'섞음' if report['shuffle'] else 'posts.json 순서'}")
+    print()
+    print("엔딩 분포")
+    for name, count in sorted(report['endings'].items(), key=lambda item: -item[1]):
+        print(f"  {name:<8} {count / games:7.2%}  {count:>12,}")
+    print()
+    print("엔딩이 나온 턴")
+    per_turn = [sum(row[turn] for row in report['turns'].values())
+                for turn in range(len(next(iter(report['turns'].values()))))]
+    peak = max(per_turn) or 1
+    for turn, count in enumerate(per_turn):
+        if count:
+            print(f"  {turn:>3}턴 {count / games:7.2%} {'#' * max(1, round(40 * count / peak))}")
+    print()
+    print(f"처리 속도: {report['gamesPerSecond']:,.0f} 게임/초, "
+          f"{report['decisionsPerSecond']:,.0f} 결정/초 ({report['seconds']:.2f}초)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EchoChamber 플레이 시뮬레이터")
+    parser.add_argument('--posts', default=POSTS_FILE, help="게시글 파일 (기본 data/posts.json)")
+    parser.add_argument('--games', type=int, default=100000, help="진행할 게임 수 (기본 100000)")
+    parser.add_argument('--policy', default='random', choices=sorted(POLICIES), help="플레이 정책")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--chunk', type=int, default=None, help="프로세스 하나가 한 번에 맡는 게임 수")
+    parser.add_argument('--seed', type=int, default=0, help="난수 시드")
+    parser.add_argument('--shuffle', action='store_true', help="게임마다 게시글 순서를 섞기")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    posts = load_json_file(args.posts, [])
+    try:
+        report = run(posts, args.policy, args.games, workers=args.workers, chunk=args.chunk,
+                     seed=args.seed, shuffle=args.shuffle)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+최적 전략 계산기 (힌트)
+
+게시글 순서가 정해져 있고 결정마다 지표 변화가 정해져 있으므로,
+시작 상태에서 나올 수 있는 모든 (턴, 지표) 상태를 미리 계산해 둘 수 있습니다.
+- 앞으로 계산: 시작 상태에서 턴마다 통과/경고/삭제 세 가지를 모두 적용해서
+  다음 턴에 나올 수 있는 상태를 모읍니다. (중간에 끝나는 상태는 버림)
+- 뒤로 계산: 마지막 턴부터 거꾸로, 각 상태에서
+    possible: 잘 고르면 트루엔딩에 갈 수 있는지
+    chance:   여기서부터 무작위로 고르면 트루엔딩에 갈 확률
+    best:     트루엔딩에 갈 수 있는 결정 중에서 chance가 가장 높은 결정
+  을 구해서 표(PolicyTable)로 저장합니다.
+
+상태는 지표 4개를 숫자 하나(키)로 묶어서 턴별로 정렬된 배열에 보관하고,
+조회는 이진 탐색으로 합니다. 결과는 상태 하나에 2바이트로 줄여서 보관합니다.
+    [possible 1비트][best 2비트][chance 13비트]
+
+표를 만드는 데 수십 초가 걸리므로 서버에서는 백그라운드 스레드(HintSolver)에서 만들고,
+게시글 순서나 영향값이 바뀌면 다시 만듭니다. (제목/내용만 바뀌면 지금 표를 계속 사용)
+NumPy가 필요하고, 영향값이 모두 정수일 때만 계산할 수 있습니다.
+
+명령줄에서 실행하면 표를 만들고 통계를 출력합니다.
+    python3 solver.py
+"""
+
+import argparse
+import threading
+import time
+
+from engine import ACTIONS, ENDINGS, METRIC_MAX, METRIC_MIN, METRICS, ImpactEngine, np
+
+# 지표 값의 가짓수 (0~100)
+_BASE = METRIC_MAX - METRIC_MIN + 1
+
+# 결과 2바이트의 비트 배치
+_POSSIBLE_BIT = 1 << 15
+_BEST_SHIFT = 13
+_CHANCE_MAX = (1 << _BEST_SHIFT) - 1
+
+# HintSolver.hint()의 상태 값
+HINT_READY = 'ready'
+HINT_BUILDING = 'building'
+HINT_UNAVAILABLE = 'unavailable'
+
+
+class SolverUnavailable(Exception):
+    """이 게시글 목록으로는 표를 만들 수 없을 때 (NumPy 없음, 정수가 아닌 영향값 등)"""
+
+
+def _pack(metrics):
+    """지표 배열 (N x 4) -> 키 배열 (N)"""
+    m = metrics.astype(np.int32)
+    return ((m[:, 0] * _BASE + m[:, 1]) * _BASE + m[:, 2]) * _BASE + m[:, 3]
+
+
+def _unpack(keys):
+    """키 배열 (N) -> 지표 배열 (N x 4)"""
+    metrics = np.empty((len(keys), len(METRICS)), dtype=np.int16)
+    keys = keys.copy()
+    for m in range(len(METRICS) - 1, -1, -1):
+        metrics[:, m] = keys % _BASE
+        keys //= _BASE
+    return metrics
+
+
+def _fingerprint(engine):
+    """
+    표가 달라지는 입력(게시글 순서 + 영향값)만 모은 값
+    제목이나 내용만 바뀐 게시글 목록은 같은 값이 나옵니다.
+    """
+    if np is None:
+        return tuple(engine.post_ids), repr(engine.tensor)
+    return tuple(engine.post_ids), np.asarray(engine.tensor).tobytes()
+
+
+def _sorted_unique(keys):
+    """정렬 + 중복 제거 (np.unique보다 빠름)"""
+    keys.sort()
+    if len(keys) == 0:
+        return keys
+    keep = np.empty(len(keys), dtype=bool)
+    keep[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=keep[1:])
+    return keys[keep]
+
+
+class PolicyTable:
+    """
+    (턴, 지표) -> 최적 결정 / 트루엔딩 가능 여부 / 무작위 플레이 시 트루엔딩 확률 표
+
+    사용 예시:
+        table = PolicyTable(engine, (50, 50, 50, 50))
+        hint = table.lookup(0, (50, 50, 50, 50))
+    """
+
+    def __init__(self, engine, start):
+        """
+        입력:
+            engine: ImpactEngine (게시글 순서 = 턴 순서)
+            start: 시작 지표 (freedom, order, trust, diversity)
+
+        영향값이 정수가 아니거나 NumPy가 없으면 SolverUnavailable
+        """
+        if np is None:
+            raise SolverUnavailable("NumPy가 설치되어 있지 않습니다.")
+        if len(engine) == 0:
+            raise SolverUnavailable("게시글이 없습니다.")
+        tensor = np.asarray(engine.tensor)
+        if not np.array_equal(tensor, np.rint(tensor)):
+            raise SolverUnavailable("영향값이 정수가 아닌 게시글이 있습니다.")
+        start = tuple(start)
+        if not all(float(v).is_integer() and METRIC_MIN <= v <= METRIC_MAX for v in start):
+            raise SolverUnavailable("시작 지표가 0~100 사이의 정수가 아닙니다.")
+
+        self.post_ids = list(engine.post_ids)
+        self.start = start
+        self._delta = np.rint(tensor).astype(np.int16)   # (턴, 지표, 액션)
+        self._keys = []     # 턴별 상태 키 (정렬됨)
+        self._values = []   # 턴별 결과 (uint16, 위의 비트 배치)
+
+        started = time.monotonic()
+        self._forward()
+        self._backward()
+        self.build_seconds = time.monotonic() - started
+
+    def __len__(self):
+        """표에 들어 있는 상태 수"""
+        return sum(len(keys) for keys in self._keys)
+
+    @property
+    def nbytes(self):
+        """표가 차지하는 메모리 (바이트)"""
+        return sum(keys.nbytes + values.nbytes for keys, values in zip(self._keys, self._values))
+
+    # ----------------------------------------
+    # 내부 함수: 표 만들기
+    # ----------------------------------------
+
+    def _step(self, metrics, turn, code):
+        """
+        한 턴의 결정 하나를 모든 상태에 적용합니다.
+
+        출력: (새 지표, 나쁜 엔딩으로 끝났는지 배열)
+        """
+        result = metrics + self._delta[turn, :, code]
+        np.clip(result, METRIC_MIN, METRIC_MAX, out=result)
+        columns = [result[:, m] for m in range(len(METRICS))]
+        ended = np.zeros(len(result), dtype=bool)
+        for _name, _message, condition in ENDINGS:
+            ended |= condition(*columns)
+        return result, ended
+
+    def _forward(self):
+        """시작 상태에서 턴마다 나올 수 있는 (끝나지 않은) 상태를 모읍니다."""
+        self._keys = [_pack(np.array([self.start], dtype=np.int16))]
+        for turn in range(len(self.post_ids) - 1):
+            metrics = _unpack(self._keys[turn])
+            parts = []
+            for code in range(len(ACTIONS)):
+                result, ended = self._step(metrics, turn, code)
+                parts.append(_pack(result[~ended]))
+            self._keys.append(_sorted_unique(np.concatenate(parts)))
+
+    def _backward(self):
+        """마지막 턴부터 거꾸로 possible / chance / best를 구합니다."""
+        last = len(self.post_ids) - 1
+        self._values = [None] * len(self.post_ids)
+        next_possible = next_chance = None
+        for turn in range(last, -1, -1):
+            metrics = _unpack(self._keys[turn])
+            possible = np.empty((len(ACTIONS), len(metrics)), dtype=bool)
+            chance = np.empty((len(ACTIONS), len(metrics)), dtype=np.float32)
+            for code in range(len(ACTIONS)):
+                result, ended = self._step(metrics, turn, code)
+                if turn == last:
+                    # 마지막 게시글까지 나쁜 엔딩 없이 처리하면 트루엔딩
+                    possible[code] = ~ended
+                    chance[code] = possible[code]
+                    continue
+                child = np.searchsorted(self._keys[turn + 1], _pack(result))
+                child[ended] = 0
+                possible[code] = next_possible[child] & ~ended
+                chance[code] = np.where(ended, 0, next_chance[child])
+            best = np.argmax(possible * np.float32(2) + chance, axis=0)
+            next_possible = possible.any(axis=0)
+            next_chance = chance.mean(axis=0)
+
+            values = np.rint(next_chance * _CHANCE_MAX).astype(np.uint16)
+            values |= best.astype(np.uint16) << _BEST_SHIFT
+            values[next_possible] |= _POSSIBLE_BIT
+            self._values[turn] = values
+
+    # ----------------------------------------
+    # 조회
+    # ----------------------------------------
+
+    def _find(self, turn, metrics):
+        """(턴, 지표)의 결과 값 (표에 없으면 None)"""
+        if not 0 <= turn < len(self._keys):
+            return None
+        # 0~100 밖의 값은 _pack에서 다른 (정상) 상태의 키와 겹치므로 먼저 걸러냄
+        # 예: (50, 101, 50, 50)과 (51, 0, 50, 50)의 키가 같음
+        if not all(float(v).is_integer() and METRIC_MIN <= v <= METRIC_MAX for v in metrics):
+            return None
+        key = _pack(np.array([metrics], dtype=np.int16))[0]
+        keys = self._keys[turn]
+        index = int(np.searchsorted(keys, key))
+        if index >= len(keys) or keys[index] != key:
+            return None
+        return int(self._values[turn][index])
+
+    @staticmethod
+    def _decode(value):
+        return {
+            "possible": bool(value & _POSSIBLE_BIT),
+            "chance": round((value & _CHANCE_MAX) / _CHANCE_MAX, 4),
+        }
+
+    def lookup(self, turn, metrics):
+        """
+        (턴, 지표) 상태의 힌트를 돌려줍니다.
+
+        입력:
+            turn: 처리한 게시글 수 (currentPostIndex)
+            metrics: (freedom, order, trust, diversity)
+
+        출력 예시 (표에 없는 상태면 None):
+        {
+            "postId": 3,
+            "best": "approve",
+            "possible": true,
+            "chance": 0.4111,
+            "actions": {
+                "approve": {"possible": true, "chance": 0.52},
+                "warn": {"possible": true, "chance": 0.41},
+                "delete": {"possible": false, "chance": 0.0}
+            }
+        }
+        """
+        metrics = tuple(metrics)
+        value = self._find(turn, metrics)
+        if value is None:
+            return None
+        hint = {"postId": self.post_ids[turn], "best": ACTIONS[(value >> _BEST_SHIFT) & 3]}
+        hint.update(self._decode(value))
+
+        current = np.array([metrics], dtype=np.int16)
+        actions = {}
+        for code, action in enumerate(ACTIONS):
+            result, ended = self._step(current, turn, code)
+            if ended[0]:
+                actions[action] = {"possible": False, "chance": 0.0}
+            elif turn == len(self._keys) - 1:
+                actions[action] = {"possible": True, "chance": 1.0}
+            else:
+                child = self._find(turn + 1, tuple(int(v) for v in result[0]))
+                actions[action] = self._decode(child)
+        hint["actions"] = actions
+        return hint
+
+
+class HintSolver:
+    """
+    게시글 순서나 영향값이 바뀔 때마다 PolicyTable을 백그라운드에서 다시 만드는 관리자
+    (처음 힌트를 요청할 때 만들기 시작함, 제목/내용만 바뀌면 지금 표를 계속 사용)
+
+    사용 예시:
+        hints = HintSolver(POST_CATALOG, (50, 50, 50, 50))
+        status, result = hints.hint(game_state)
+    """
+
+    def __init__(self, catalog, start):
+        """
+        입력:
+            catalog: PostCatalog
+            start: 시작 지표 (freedom, order, trust, diversity)
+        """
+        self.catalog = catalog
+        self.start = tuple(start)
+        self._lock = threading.Lock()
+        self._version = None     # 마지막으로 확인한 카탈로그 버전
+        self._key = None         # 지금 표(또는 만들고 있는 표)의 입력 (_fingerprint)
+        self._table = None
+        self._error = None       # 표를 만들 수 없는 이유
+        self._building = None    # 표를 만드는 스레드
+
+    def _build(self, key, engine):
+        try:
+            table, error = PolicyTable(engine, self.start), None
+        except SolverUnavailable as e:
+            table, error = None, str(e)
+        except MemoryError:
+            table, error = None, "상태가 너무 많아 표를 만들 수 없습니다."
+        with self._lock:
+            # 만드는 동안 영향값이 또 바뀌었으면 결과를 버림 (다음 요청 때 다시 만듦)
+            if self._key == key:
+                self._table, self._error = table, error
+            self._building = None
+
+    def _ensure(self):
+        """
+        게시글 순서나 영향값이 바뀌었으면 표를 다시 만들기 시작합니다. (잠금을 잡고 호출)
+        카탈로그 버전이 바뀌어도 제목/내용만 바뀌었으면 지금 표를 그대로 사용합니다.
+        """
+        version = self.catalog.version
+        if version == self._version:
+            return
+        if self._building is not None:
+            # 예전 입력으로 만드는 중이면 끝날 때까지 기다렸다가 다시 확인
+            return
+        engine = self.catalog.derived('engine', ImpactEngine)
+        key = _fingerprint(engine)
+        self._version = version
+        if key == self._key:
+            return
+        self._key = key
+        self._table = None
+        self._error = None
+        self._building = threading.Thread(target=self._build, args=(key, engine),
+                                          name="hint-solver", daemon=True)
+        self._building.start()
+
+    def hint(self, game_state):
+        """
+        게임 상태에 대한 힌트
+
+        출력: (상태, 결과)
+            (HINT_READY, 힌트 딕셔너리 또는 표에 없는 상태면 None)
+            (HINT_BUILDING, None)       표를 만드는 중
+            (HINT_UNAVAILABLE, 이유)     표를 만들 수 없음
+        """
+        with self._lock:
+            self._ensure()
+            if self._error is not None:
+                return HINT_UNAVAILABLE, self._error
+            if self._table is None:
+                return HINT_BUILDING, None
+            table = self._table
+        metrics = tuple(game_state.get(name, 50) for name in METRICS)
+        return HINT_READY, table.lookup(game_state.get('currentPostIndex', 0), metrics)
+
+    def wait(self, timeout=None):
+        """만들고 있는 표가 있으면 끝날 때까지 기다립니다."""
+        with self._lock:
+            self._ensure()
+            building = self._building
+        if building is not None:
+            building.join(timeout)
+
+
+# ============================================
+# 명령줄 실행
+# ============================================
+
+def main(argv=None):
+    from server import DEFAULT_GAME_STATE, POSTS_FILE, load_json_file
+
+    parser = argparse.ArgumentParser(description="최적 전략 표를 만들고 통계를 출력합니다.")
+    parser.add_argument('--posts', default=POSTS_FILE, help="게시글 파일 (기본: data/posts.json)")
+    args = parser.parse_args(argv)
+
+    posts = load_json_file(args.posts, [])
+    start = tuple(DEFAULT_GAME_STATE[name] for name in METRICS)
+    try:
+        table = PolicyTable(ImpactEngine(posts), start)
+    except SolverUnavailable as e:
+        print(f"표를 만들 수 없습니다: {e}")
+        return 1
+
+    hint = table.lookup(0, start)
+    print(f"게시글 {len(table.post_ids)}개, 상태 {len(table):,}개, "
+          f"메모리 {table.nbytes / 1024 / 1024:.1f}MB, {table.build_seconds:.1f}초")
+    print(f"시작 상태 {start}")
+    print(f"  트루엔딩 가능: {hint['possible']}")
+    print(f"  무작위 플레이 시 트루엔딩 확률: {hint['chance']:.2%}")
+    print(f"  첫 결정 추천: {hint['best']}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+저장소 (JSON 파일 / SQLite)
+
+서버의 데이터(게시글, 사용자, 리더보드, 게임 상태)를 어디에 저장할지 고를 수 있게 합니다.
+- JsonStorage (기본): 예전처럼 JSON 파일 하나에 목록 전체를 저장합니다.
+- SqliteStorage: 파이썬에 들어 있는 sqlite3 데이터베이스 파일 하나에 저장합니다.
+  바뀐 게시글/사용자/기록 한 줄만 쓰기 때문에 데이터가 많아져도 저장 시간이 늘지 않습니다.
+
+두 저장소는 같은 함수들을 가지고 있어서, 서버는 어느 쪽인지 신경 쓰지 않고 사용합니다.
+저장 함수에는 목록 전체와 함께 "바뀐 부분"을 같이 넘깁니다.
+JSON 저장소는 목록 전체를 파일에 쓰고, SQLite 저장소는 바뀐 부분만 씁니다.
+(사용자와 리더보드는 목록 대신 목록을 돌려주는 함수를 넘겨서, JSON 저장소가 파일에 실제로 쓸 때만 만듦)
+
+    load(path, default) / save(path, data)      경로별 문서 하나 (세션 게임 상태 스냅샷)
+    load_posts() / save_posts(posts, changed, deleted) / posts_token()
+    load_users() / find_user(username) / save_users(users, added)
+    load_leaderboard() / save_leaderboard(records, added, capacity)
+
+기존 JSON 데이터를 SQLite로 옮기기 (한 번만):
+    python3 storage.py migrate
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sqlite3
+import threading
+
+import codec
+
+LOG = logging.getLogger('echochamber.storage')
+
+
+def _mtime(path):
+    """파일의 수정 시간 (파일이 없으면 None)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class JsonStorage:
+    """
+    JSON 파일 저장소 (기본)
+
+    사용 예시:
+        storage = JsonStorage(POSTS_FILE, USERS_FILE, LEADERBOARD_FILE, load_json_file, save_json_file)
+        posts = storage.load_posts()
+
+    나중에 쓰기(write-behind) 저장기를 쓰면 token에 writer.token을 넘겨서,
+    아직 파일에 쓰지 않은 저장을 밖에서 바뀐 것으로 오해하지 않게 합니다.
+    """
+
+    name = 'json'
+
+    def __init__(self, posts_file, users_file, leaderboard_file, load, save, token=None):
+        """
+        입력:
+            posts_file, users_file, leaderboard_file: JSON 파일 경로
+            load, save: load_json_file, save_json_file
+            token: 파일 경로 -> 바뀌었는지 확인하는 값 (None이면 파일의 수정 시간)
+        """
+        self.posts_file = posts_file
+        self.users_file = users_file
+        self.leaderboard_file = leaderboard_file
+        self._load = load
+        self._save = save
+        self._token = token or _mtime
+
+    # ----------------------------------------
+    # 문서 (경로별 JSON 파일)
+    # ----------------------------------------
+
+    def load(self, path, default=None):
+        return self._load(path, default)
+
+    def save(self, path, data):
+        """
+        문서(세션 스냅샷)를 저장합니다.
+        저장한 뒤 이벤트 로그를 지우므로, 나중에 쓰기 모드에서도 파일에 다 쓸 때까지 기다립니다.
+        """
+        return self._save(path, data, wait=True)
+
+    # ----------------------------------------
+    # 게시글
+    # ----------------------------------------
+
+    def load_posts(self):
+        return self._load(self.posts_file, []) or []
+
+    def posts_token(self):
+        """
+        게시글이 밖에서(다른 프로그램이) 바뀌었는지 확인하는 값
+        (posts.json의 수정 시간, 값이 달라지면 다시 읽어야 함)
+        """
+        return self._token(self.posts_file)
+
+    def save_posts(self, posts, changed=None, deleted=()):
+        """게시글 목록 전체를 파일에 씁니다. (changed, deleted는 사용하지 않음)"""
+        return self._save(self.posts_file, posts)
+
+    # ----------------------------------------
+    # 사용자
+    # ----------------------------------------
+
+    def load_users(self):
+        return self._load(self.users_file, []) or []
+
+    def find_user(self, username):
+        """username이 같은 사용자 (없으면 None)"""
+        for user in self.load_users():
+            if user.get('username') == username:
+                return user
+        return None
+
+    def save_users(self, users, added=None):
+        """
+        사용자 목록 전체를 파일에 씁니다. (added는 사용하지 않음, 사용자 수만큼 시간이 걸림)
+        users가 함수면 저장기가 파일에 실제로 쓸 때 한 번만 불러서 목록을 만듭니다.
+        (나중에 쓰기 모드에서 회원가입이 여러 번 있어도 변환과 쓰기는 파일에 쓸 때 한 번만)
+        """
+        return self._save(self.users_file, users)
+
+    # ----------------------------------------
+    # 리더보드
+    # ----------------------------------------
+
+    def load_leaderboard(self):
+        return self._load(self.leaderboard_file, []) or []
+
+    def save_leaderboard(self, records, added=None, capacity=None):
+        """
+        순위순 기록 목록 전체를 파일에 씁니다. (added, capacity는 사용하지 않음)
+        records가 함수면 저장기가 파일에 실제로 쓸 때 한 번만 불러서 목록을 만듭니다.
+        (나중에 쓰기 모드에서 게임이 여러 번 끝나도 정렬과 변환은 파일에 쓸 때 한 번만)
+        """
+        return self._save(self.leaderboard_file, records)
+
+    def close(self):
+        pass
+
+
+class SqliteStorage:
+    """
+    SQLite 저장소
+
+    - WAL 모드: 쓰는 동안에도 읽기가 막히지 않고, 쓰기는 로그 파일 끝에 덧붙이기라 빠름
+    - 색인: 게시글 id(기본 키), 사용자 이름(중복 불가), 리더보드 점수
+    - SQL 문장은 아래의 상수로만 사용해서 sqlite3가 준비된 문장(prepared statement)을
+      연결마다 캐시해 두고 재사용합니다.
+    - 연결 하나를 여러 작업자 스레드가 함께 쓰므로 잠금으로 한 번에 하나씩 사용합니다.
+
+    사용 예시:
+        storage = SqliteStorage('data/echochamber.db', DATA_DIR)
+        user = storage.find_user('test')
+    """
+
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS posts_position ON posts (position);
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL UNIQUE,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            score REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS leaderboard_rank ON leaderboard (score DESC, seq ASC);
+        CREATE TABLE IF NOT EXISTS documents (
+            name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+    """
+
+    SELECT_DOCUMENT = "SELECT data FROM documents WHERE name = ?"
+    UPSERT_DOCUMENT = ("INSERT INTO documents (name, data) VALUES (?, ?) "
+                       "ON CONFLICT (name) DO UPDATE SET data = excluded.data")
+
+    SELECT_POSTS = "SELECT data FROM posts ORDER BY position"
+    UPSERT_POST = ("INSERT INTO posts (id, position, data) "
+                   "VALUES (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM posts), ?) "
+                   "ON CONFLICT (id) DO UPDATE SET data = excluded.data")
+    INSERT_POST = "INSERT INTO posts (id, position, data) VALUES (?, ?, ?)"
+    DELETE_POST = "DELETE FROM posts WHERE id = ?"
+    DELETE_POSTS = "DELETE FROM posts"
+
+    SELECT_USERS = "SELECT data FROM users ORDER BY id"
+    SELECT_USER = "SELECT data FROM users WHERE username = ?"
+    INSERT_USER = "INSERT INTO users (id, username, data) VALUES (?, ?, ?)"
+    DELETE_USERS = "DELETE FROM users"
+
+    SELECT_LEADERBOARD = "SELECT data FROM leaderboard ORDER BY score DESC, seq ASC"
+    INSERT_RECORD = "INSERT INTO leaderboard (score, data) VALUES (?, ?)"
+    TRIM_LEADERBOARD = ("DELETE FROM leaderboard WHERE seq NOT IN "
+                        "(SELECT seq FROM leaderboard ORDER BY score DESC, seq ASC LIMIT ?)")
+    DELETE_LEADERBOARD = "DELETE FROM leaderboard"
+
+    def __init__(self, db_path, base_dir):
+        """
+        입력:
+            db_path: 데이터베이스 파일 경로
+            base_dir: 문서 이름을 정할 기준 폴더 (data/, 예: data/sessions/abc.json -> 'sessions/abc.json')
+        """
+        self.db_path = db_path
+        self.base_dir = os.path.abspath(base_dir)
+        self._lock = threading.RLock()
+        # isolation_level=None: 자동 커밋, 여러 줄을 한 번에 쓸 때만 BEGIN/COMMIT
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=64)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL 모드에서는 NORMAL이어도 데이터베이스가 깨지지 않음 (전원이 꺼지면 마지막 몇 건만 잃을 수 있음)
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.SCHEMA)
+
+    # ----------------------------------------
+    # 내부 함수
+    # ----------------------------------------
+
+    @staticmethod
+    def _encode(data):
+        return codec.dumps(data).decode('utf-8')
+
+    def _write(self, statements):
+        """
+        여러 문장을 하나의 트랜잭션으로 실행합니다. (전부 쓰거나, 하나도 안 쓰거나)
+
+        입력: [(SQL, 값들), ...]
+        출력: 성공하면 True, 실패하면 False (save_json_file과 같음)
+        """
+        with self._lock:
+            try:
+                self._db.execute("BEGIN IMMEDIATE")
+                for sql, params in statements:
+                    self._db.execute(sql, params)
+                self._db.execute("COMMIT")
+                return True
+            except sqlite3.Error as e:
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                LOG.error("데이터베이스 저장 오류: %s", e)
+                return False
+
+    def _rows(self, sql, params=()):
+        with self._lock:
+            return [codec.loads(row[0]) for row in self._db.execute(sql, params)]
+
+    def _document_name(self, path):
+        return os.path.relpath(os.path.abspath(path), self.base_dir).replace(os.sep, '/')
+
+    # ----------------------------------------
+    # 문서 (경로별 JSON 파일 대신 documents 테이블)
+    # ----------------------------------------
+
+    def load(self, path, default=None):
+        rows = self._rows(self.SELECT_DOCUMENT, (self._document_name(path),))
+        return rows[0] if rows else default
+
+    def save(self, path, data):
+        return self._write([(self.UPSERT_DOCUMENT, (self._document_name(path), self._encode(data)))])
+
+    # ----------------------------------------
+    # 게시글
+    # ----------------------------------------
+
+    def load_posts(self):
+        return self._rows(self.SELECT_POSTS)
+
+    def posts_token(self):
+        """
+        다른 연결(다른 프로그램)이 데이터베이스를 바꾸면 달라지는 값
+        (이 연결로 쓴 것은 바뀌지 않으므로 서버가 저장할 때마다 다시 읽지 않음)
+        """
+        with self._lock:
+            return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def save_posts(self, posts, changed=None, deleted=()):
+        """
+        게시글 저장
+        changed: 추가/수정된 게시글들 (None이면 목록 전체를 새로 씀)
+        deleted: 지운 게시글 id들
+        """
+        if changed is None:
+            statements = [(self.DELETE_POSTS, ())]
+            statements += [(self.INSERT_POST, (post['id'], position, self._encode(post)))
+                           for position, post in enumerate(posts, start=1)]
+        else:
+            statements = [(self.UPSERT_POST, (post['id'], self._encode(post))) for post in changed]
+        statements += [(self.DELETE_POST, (post_id,)) for post_id in deleted]
+        return self._write(statements)
+
+    # ----------------------------------------
+    # 사용자
+    # ----------------------------------------
+
+    def load_users(self):
+        return self._rows(self.SELECT_USERS)
+
+    def find_user(self, username):
+        """username이 같은 사용자 (username 색인으로 바로 찾음, 없으면 None)"""
+        rows = self._rows(self.SELECT_USER, (username,))
+        return rows[0] if rows else None
+
+    def save_users(self, users, added=None):
+        """
+        사용자 저장
+        users: 사용자 목록 (또는 목록을 돌려주는 함수, added가 있으면 부르지 않음)
+        added: 새로 추가된 사용자들 (None이면 목록 전체를 새로 씀)
+        """
+        statements = []
+        if added is None:
+            statements.append((self.DELETE_USERS, ()))
+            added = users() if callable(users) else users
+        statements += [(self.INSERT_USER, (user.get('id'), user['username'], self._encode(user)))
+                       for user in added]
+        return self._write(statements)
+
+    # ----------------------------------------
+    # 리더보드
+    # ----------------------------------------
+
+    def load_leaderboard(self):
+        return self._rows(self.SELECT_LEADERBOARD)
+
+    def save_leaderboard(self, records, added=None, capacity=None):
+        """
+        리더보드 저장
+        records: 순위순 기록 목록 (또는 목록을 돌려주는 함수, added가 있으면 부르지 않음)
+        added: 새 기록 하나 (None이면 순위순 목록 전체를 새로 씀)
+        capacity: 남길 최대 기록 수 (점수 색인 순서로 나머지를 지움)
+        같은 점수면 먼저 들어온 기록(seq가 작은 기록)이 앞 순위입니다.
+        """
+        if added is None:
+            if callable(records):
+                records = records()
+            statements = [(self.DELETE_LEADERBOARD, ())]
+            statements += [(self.INSERT_RECORD, (record.get('score', 0), self._encode(record)))
+                           for record in records]
+        else:
+            statements = [(self.INSERT_RECORD, (added.get('score', 0), self._encode(added)))]
+        if capacity is not None:
+            statements.append((self.TRIM_LEADERBOARD, (capacity,)))
+        return self._write(statements)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ============================================
+# JSON -> SQLite 옮기기
+# ============================================
+
+def migrate(source, target, documents=()):
+    """
+    source 저장소의 데이터를 target 저장소로 모두 옮깁니다. (target의 기존 데이터는 덮어씀)
+
+    입력:
+        source, target: 저장소 (보통 JsonStorage -> SqliteStorage)
+        documents: 함께 옮길 문서 경로들 (게임 상태 스냅샷 파일들)
+
+    출력: 옮긴 개수 {"posts": ..., "users": ..., "leaderboard": ..., "documents": ...}
+    """
+    posts = source.load_posts()
+    users = source.load_users()
+    records = source.load_leaderboard()
+    # 파일은 점수 내림차순이지만 혹시 모르니 리더보드와 같은 순서로 정렬 (같은 점수면 원래 순서 유지)
+    records = sorted(records, key=lambda record: record.get('score', 0), reverse=True)
+    target.save_posts(posts)
+    target.save_users(users)
+    target.save_leaderboard(records)
+    moved = 0
+    for path in documents:
+        data = source.load(path, None)
+        if data is not None:
+            target.save(path, data)
+            moved += 1
+    return {"posts": len(posts), "users": len(users), "leaderboard": len(records), "documents": moved}
+
+
+def state_documents(game_state_file, sessions_dir):
+    """옮길 게임 상태 스냅샷 파일들 (game-state.json + data/sessions/*.json)"""
+    return [game_state_file] + sorted(glob.glob(os.path.join(sessions_dir, '*.json')))
+
+
+def main(argv=None):
+    from server import (DATA_DIR, DEFAULT_DB_FILE, GAME_STATE_FILE, SESSIONS_DIR,
+                        json_storage)
+
+    parser = argparse.ArgumentParser(description="저장소 관리")
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('migrate', help="JSON 파일의 데이터를 SQLite 데이터베이스로 옮깁니다.")
+    command.add_argument('--db', default=DEFAULT_DB_FILE, help="데이터베이스 파일 (기본 data/echochamber.db)")
+    args = parser.parse_args(argv)
+
+    target = SqliteStorage(args.db, DATA_DIR)
+    try:
+        counts = migrate(json_storage(), target, state_documents(GAME_STATE_FILE, SESSIONS_DIR))
+    finally:
+        target.close()
+    print(f"{args.db}로 옮겼습니다: 게시글 {counts['posts']}개, 사용자 {counts['users']}명, "
+          f"리더보드 {counts['leaderboard']}개, 게임 상태 {counts['documents']}개")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+스트리밍 응답 (조각 나눠 보내기)
+
+응답 전체를 하나의 큰 JSON 문자열로 만든 뒤 보내면,
+게시글이 많아질수록 메모리도 많이 쓰고 첫 바이트가 나가기까지도 오래 걸립니다.
+여기의 함수들은 항목을 하나씩 JSON으로 바꿔서 일정 크기씩 모아 내보내는 생성기(generator)를 만듭니다.
+- iter_json_array(): 항목들 -> JSON 배열 조각들
+- chunked(): 조각들 -> HTTP/1.1 chunked 전송 형식 (길이를 미리 몰라도 보낼 수 있음)
+"""
+
+# 한 번에 내보낼 조각의 대략적인 크기 (바이트)
+CHUNK_SIZE = 16 * 1024
+
+
+def iter_json_array(items, encode=None, chunk_size=CHUNK_SIZE):
+    """
+    항목들을 하나씩 JSON으로 바꿔서 JSON 배열 조각(바이트)들로 내보냅니다.
+    codec.dumps(list)와 같은 결과(공백 없는 한 줄)를 조각으로 나눠 만드는 것과 같습니다.
+
+    입력:
+        items: 항목들 (리스트나 생성기)
+        encode: 항목 하나를 JSON 바이트로 바꾸는 함수 (None이면 항목이 이미 JSON 바이트)
+        chunk_size: 조각이 이 크기를 넘으면 내보냄
+
+    사용 예시:
+        for chunk in iter_json_array(posts, encode_json):
+            send(chunk)
+    """
+    buffer = bytearray(b'[')
+    first = True
+    for item in items:
+        if not first:
+            buffer += b','
+        first = False
+        buffer += item if encode is None else encode(item)
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b']'
+    yield bytes(buffer)
+
+
+def chunked(chunks):
+    """
+    조각들을 HTTP/1.1 chunked 전송 형식으로 감쌉니다.
+        <조각 길이(16진수)>\\r\\n<조각>\\r\\n ... 0\\r\\n\\r\\n (끝 표시)
+    빈 조각은 끝 표시로 오해받지 않도록 건너뜁니다.
+    """
+    for chunk in chunks:
+        if chunk:
+            yield b'%X\r\n' % len(chunk) + chunk + b'\r\n'
+    yield b'0\r\n\r\n'
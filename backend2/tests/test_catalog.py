@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+게시글 카탈로그 + 나중에 쓰기 저장기 테스트
+
+실행 (backend2 폴더에서):
+    python3 -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codec  # noqa: E402
+from catalog import PostCatalog  # noqa: E402
+from persistence import GroupCommitWriter  # noqa: E402
+from storage import JsonStorage  # noqa: E402
+
+
+def _post(post_id, title):
+    return {"id": post_id, "type": "비판", "title": title, "content": "c", "author": "a",
+            "freedomImpact": [1, 2, 3], "orderImpact": [1, 2, 3],
+            "trustImpact": [1, 2, 3], "diversityImpact": [1, 2, 3]}
+
+
+class WriteBehindCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.posts_file = os.path.join(self.directory, 'posts.json')
+        with open(self.posts_file, 'wb') as f:
+            f.write(codec.dumps([_post(1, "첫 글"), _post(2, "둘째 글")]))
+        self.writer = GroupCommitWriter(window=0, write_behind=True)
+
+        def load(path, default=None):
+            pending = self.writer.pending(path)
+            if pending is not None:
+                return codec.loads(pending)
+            try:
+                with open(path, 'rb') as f:
+                    return codec.loads(f.read())
+            except FileNotFoundError:
+                return default
+
+        def save(path, data, wait=False):
+            return self.writer.write(path, codec.dumps(data), wait=wait)
+
+        users_file = os.path.join(self.directory, 'users.json')
+        leaderboard_file = os.path.join(self.directory, 'leaderboard.json')
+        storage = JsonStorage(self.posts_file, users_file, leaderboard_file, load, save, self.writer.token)
+        self.catalog = PostCatalog(storage)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_own_flushed_write_keeps_version(self):
+        """나중에 쓰기로 저장한 뒤 파일에 써도, 자기 저장이므로 다시 읽지 않음 (버전 그대로)"""
+        self.catalog.update(1, {"title": "고친 글"})
+        version = self.catalog.version
+
+        self.assertEqual(self.writer.flush(), 0)
+        with open(self.posts_file, 'rb') as f:
+            self.assertEqual(codec.loads(f.read())[0]["title"], "고친 글")
+
+        self.assertEqual(self.catalog.version, version)
+        self.assertEqual(self.catalog.get(1)["title"], "고친 글")
+
+    def test_external_change_after_flush_reloads(self):
+        """파일에 쓴 뒤 다른 프로그램이 파일을 바꾸면 다시 읽음 (버전 증가)"""
+        self.catalog.update(1, {"title": "고친 글"})
+        self.writer.flush()
+        version = self.catalog.version
+
+        with open(self.posts_file, 'wb') as f:
+            f.write(codec.dumps([_post(1, "밖에서 고친 글")]))
+        stat = os.stat(self.posts_file)
+        os.utime(self.posts_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertGreater(self.catalog.version, version)
+        self.assertEqual(self.catalog.get(1)["title"], "밖에서 고친 글")
+        self.assertIsNone(self.catalog.get(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+요청 녹화와 재생 (느려진 상황 다시 만들기)
+
+실제 서버에서 느려졌을 때 어떤 요청들이 들어왔는지 알 수 없으면 똑같은 상황을 다시 만들 수 없습니다.
+- 녹화: 서버를 --record 파일로 켜면 요청마다 메서드, 경로, 헤더, 본문과
+  응답 상태 코드, 처리 시간, 응답 요약값(digest)을 한 줄(JSON)씩 남깁니다.
+  (로그와 같은 백그라운드 스레드가 모아서 쓰므로 요청 처리를 거의 늦추지 않음,
+   로그 큐가 가득 차도 녹화는 버리지 않고 자리가 날 때까지 기다림)
+- 재생: 녹화한 요청들을 같은 순서로 다시 보냅니다.
+    - 프로세스 안에서 (기본): 소켓 없이 요청 바이트를 GameHandler에 바로 넣고 응답 바이트를 받음
+      (데이터 폴더는 임시 폴더에 복사해서 사용)
+    - 켜져 있는 서버에 (--url)
+  원래 간격대로(--speed 1), 빠르게(--speed 10), 쉬지 않고(--speed 0, 기본) 보낼 수 있습니다.
+  결과는 녹화 파일과 같은 형식으로 저장합니다.
+- 비교: 두 파일(녹화 파일 또는 재생 결과)의 경로별 응답 시간과, 요청마다 응답이 같은지 비교합니다.
+
+응답 요약값은 본문의 압축을 풀고, JSON이면 시각처럼 매번 달라지는 값(VOLATILE_KEYS)을 빼고 만듭니다.
+관리자 토큰(X-Admin-Token)은 녹화하지 않습니다. (재생할 때 --admin-token으로 넣음)
+로그인/회원가입 요청의 비밀번호는 본문에 그대로 남으므로 녹화 파일을 조심해서 다루세요.
+
+사용법:
+    python3 server.py --record data/traffic.jsonl          # 녹화 (또는 ECHOCHAMBER_RECORD=파일)
+    python3 traffic.py replay data/traffic.jsonl --output a.jsonl
+    (코드를 고친 뒤)
+    python3 traffic.py replay data/traffic.jsonl --output b.jsonl
+    python3 traffic.py diff a.jsonl b.jsonl                   # 응답이 다르거나 20% 넘게 느려지면 종료 코드 1
+    python3 traffic.py replay data/traffic.jsonl --url http://localhost:8000 --speed 1
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import http.client
+import io
+import json
+import logging
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import parse_qs, urlparse
+
+import codec
+from logs import TRAFFIC_LOGGER
+
+# 녹화하지 않는 요청 헤더 (재생할 때 다시 만들어짐)
+SKIPPED_HEADERS = frozenset(('host', 'content-length', 'connection', 'keep-alive'))
+# 녹화 파일에 값 대신 이 표시를 남기는 헤더
+REDACTED_HEADERS = frozenset(('x-admin-token',))
+REDACTED = '***'
+# 재생할 때 보내지 않는 헤더 (다른 서버 프로세스의 ETag는 맞을 일이 없음)
+REPLAY_SKIPPED_HEADERS = frozenset(('if-none-match',))
+# 세션이 없어도 'default' 세션의 게임 상태를 읽는 조회 경로 (재생할 때 순서를 지켜야 함)
+DEFAULT_SESSION_READS = frozenset(('/api/game-state', '/api/hint'))
+
+# 응답 요약값을 만들 때 빼는 JSON 키 (요청할 때마다 달라지는 시각)
+VOLATILE_KEYS = frozenset(('timestamp', 'completedAt', 'createdAt'))
+
+
+# ============================================
+# 응답 읽기, 요약값
+# ============================================
+
+def parse_response(raw):
+    """
+    HTTP 응답 바이트 -> (상태 코드, 헤더 딕셔너리(소문자 이름), 본문)
+    chunked 전송과 압축(gzip/deflate)은 풀어서 돌려줍니다.
+    """
+    head, _, body = raw.partition(b'\r\n\r\n')
+    lines = head.decode('iso-8859-1').split('\r\n')
+    parts = lines[0].split(' ', 2)
+    status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        body = _dechunk(body)
+    elif 'content-length' in headers:
+        body = body[:int(headers['content-length'])]
+    encoding = headers.get('content-encoding')
+    try:
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+    except (OSError, zlib.error, EOFError):
+        pass
+    return status, headers, body
+
+
+def _dechunk(data):
+    out = []
+    position = 0
+    while True:
+        end = data.find(b'\r\n', position)
+        if end < 0:
+            break
+        size = int(data[position:end].split(b';')[0] or b'0', 16)
+        if size == 0:
+            break
+        out.append(data[end + 2:end + 2 + size])
+        position = end + 2 + size + 2
+    return b''.join(out)
+
+
+def _without_volatile(value):
+    if isinstance(value, dict):
+        return {key: _without_volatile(item) for key, item in value.items() if key not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_without_volatile(item) for item in value]
+    return value
+
+
+def digest(body, content_type=''):
+    """응답 본문의 요약값 (JSON이면 VOLATILE_KEYS를 빼고 키 순서를 맞춘 뒤)"""
+    if 'json' in content_type and body:
+        try:
+            value = _without_volatile(codec.loads(body))
+            body = json.dumps(value, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        except ValueError:
+            pass
+    return hashlib.sha1(body).hexdigest()[:16]
+
+
+# ============================================
+# 녹화
+# ============================================
+
+class ResponseTee:
+    """handler.wfile 대신 끼워서, 보내는 바이트를 그대로 보내면서 복사해 둠"""
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return self._wfile.write(data)
+
+    def getvalue(self):
+        return b''.join(self._parts)
+
+    def __getattr__(self, name):
+        return getattr(self._wfile, name)
+
+
+class TrafficRecorder:
+    """
+    요청 녹화기 (녹화 파일에는 logs.py의 백그라운드 스레드가 씀: start_logging(traffic_log=path))
+
+    녹화 파일 한 줄:
+        {"t": 녹화 시작 후 시각(초), "m": 메서드, "p": 경로(? 포함), "rt": 경로 표의 경로 모양,
+         "h": 헤더, "b": 본문(글자, 글자가 아니면 "b64": true와 base64),
+         "s": 상태 코드, "ms": 처리 시간(밀리초), "n": 응답 본문 크기, "dg": 응답 요약값}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._log = logging.getLogger(TRAFFIC_LOGGER)
+        self._origin = time.perf_counter()
+
+    def start(self):
+        """새 녹화를 시작합니다. (녹화 파일을 비우고 시각을 0부터 다시 셈, 서버를 켤 때 호출)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        open(self.path, 'w').close()
+        self._origin = time.perf_counter()
+
+    def record(self, handler, route, started, elapsed, response):
+        """
+        요청 하나를 녹화합니다.
+
+        입력:
+            handler: 요청을 처리한 GameHandler
+            route: 경로 표의 Route
+            started: 처리를 시작한 time.perf_counter() 값
+            elapsed: 처리 시간(초)
+            response: 보낸 응답 바이트 전체 (ResponseTee.getvalue())
+        """
+        headers = {}
+        for name, value in handler.headers.items():
+            lower = name.lower()
+            if lower in SKIPPED_HEADERS:
+                continue
+            headers[name] = REDACTED if lower in REDACTED_HEADERS else value
+        status, response_headers, body = parse_response(response)
+        entry = {
+            't': round(started - self._origin, 6),
+            'm': handler.command,
+            'p': handler.path,
+            'rt': route.pattern,
+            'h': headers,
+            's': status or handler.status or 500,
+            'ms': round(elapsed * 1000, 3),
+            'n': len(body),
+            'dg': digest(body, response_headers.get('content-type', '')),
+        }
+        entry.update(_encode_body(getattr(handler, 'body', b'')))
+        self._log.info(codec.dumps(entry).decode('utf-8'))
+
+
+def _encode_body(body):
+    if not body:
+        return {}
+    try:
+        return {'b': body.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'b': base64.b64encode(body).decode('ascii'), 'b64': True}
+
+
+def _decode_body(entry):
+    if 'b' not in entry:
+        return b''
+    if entry.get('b64'):
+        return base64.b64decode(entry['b'])
+    return entry['b'].encode('utf-8')
+
+
+def load_entries(path):
+    """녹화 파일(또는 재생 결과) 읽기 -> 줄 목록 (t 순서)"""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    entries.sort(key=lambda entry: entry['t'])
+    return entries
+
+
+def save_entries(path, entries):
+    with open(path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+# ============================================
+# 재생
+# ============================================
+
+def _replay_headers(entry, admin_token):
+    headers = {}
+    for name, value in entry.get('h', {}).items():
+        lower = name.lower()
+        if lower in REPLAY_SKIPPED_HEADERS:
+            continue
+        if value == REDACTED and lower in REDACTED_HEADERS:
+            if not admin_token:
+                continue
+            value = admin_token
+        headers[name] = value
+    return headers
+
+
+class _LoopbackServer:
+    """프로세스 안에서 재생할 때 GameHandler.server 자리에 넣는 빈 서버 (연결을 맡길 곳 없음)"""
+
+
+class InProcessTarget:
+    """
+    소켓 없이 GameHandler를 직접 부르는 재생 대상
+    요청 바이트를 rfile(BytesIO)에 넣고, 응답 바이트를 wfile(BytesIO)에서 꺼냅니다.
+    """
+
+    def __init__(self, handler_class):
+        self.handler_class = handler_class
+        self.server = _LoopbackServer()
+
+    def send(self, method, path, headers, body):
+        lines = [f"{method} {path} HTTP/1.1", "Host: replay"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        raw = ('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1') + body
+        handler = self.handler_class.__new__(self.handler_class)
+        handler.server = self.server
+        handler.request = None
+        handler.client_address = ('127.0.0.1', 0)
+        handler.rfile = io.BytesIO(raw)
+        handler.wfile = io.BytesIO()
+        handler.close_connection = True
+        start = time.perf_counter()
+        handler.handle_one_request()
+        elapsed = time.perf_counter() - start
+        return parse_response(handler.wfile.getvalue()), elapsed
+
+
+class HttpTarget:
+    """켜져 있는 서버에 보내는 재생 대상 (스레드마다 연결 하나)"""
+
+    def __init__(self, url):
+        target = urlparse(url)
+        self.host, self.port = target.hostname, target.port or 80
+        self._local = threading.local()
+
+    def send(self, method, path, headers, body):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body or None, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            return (None, {}, b''), time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+        if response.will_close:
+            connection.close()
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        # http.client는 chunked는 풀어 주지만 압축은 풀지 않음
+        raw = b'HTTP/1.1 %d X\r\n' % response.status
+        raw += ''.join(f"{name}: {value}\r\n" for name, value in response_headers.items()
+                       if name not in ('transfer-encoding', 'content-length')).encode('iso-8859-1')
+        return parse_response(raw + b'\r\n' + payload), elapsed
+
+
+def _session_of(entry):
+    """녹화한 요청의 세션 id (X-Session-Id 헤더, 없으면 ?session= 값, 둘 다 없으면 '')"""
+    for name, value in entry.get('h', {}).items():
+        if name.lower() == 'x-session-id' and value:
+            return value
+    values = parse_qs(urlparse(entry['p']).query).get('session')
+    return values[0] if values else ''
+
+
+def _ordered(entry):
+    """
+    세션이 없는 요청을 녹화한 순서대로 보내야 하는지
+    (게시글/사용자를 바꾸는 요청과 'default' 세션의 게임 상태를 읽는 요청)
+    """
+    return entry['m'] != 'GET' or (entry.get('rt') or urlparse(entry['p']).path) in DEFAULT_SESSION_READS
+
+
+def replay(entries, target, speed=0.0, concurrency=1, admin_token=''):
+    """
+    녹화한 요청들을 target에 다시 보내고, 같은 형식의 결과 목록을 돌려줍니다.
+
+    입력:
+        speed: 0이면 쉬지 않고, 1이면 녹화한 간격 그대로, 10이면 10배 빠르게
+        concurrency: 동시에 보내는 스레드 수
+                     (같은 세션(X-Session-Id 또는 ?session=)의 요청은 항상 같은 스레드가 순서대로 보냄,
+                      세션이 없는 요청 중 순서가 상관없는 조회(_ordered 참고)는 스레드들에 차례로 나눠 보냄)
+    """
+    results = [None] * len(entries)
+    queues = [queue.Queue() for _ in range(max(1, concurrency))]
+
+    def worker(jobs):
+        while True:
+            index = jobs.get()
+            if index is None:
+                return
+            entry = entries[index]
+            (status, headers, body), elapsed = target.send(
+                entry['m'], entry['p'], _replay_headers(entry, admin_token), _decode_body(entry))
+            result = dict(entry)
+            result.update(s=status, ms=round(elapsed * 1000, 3), n=len(body),
+                          dg=digest(body, headers.get('content-type', '')))
+            results[index] = result
+
+    threads = [threading.Thread(target=worker, args=(jobs,), daemon=True) for jobs in queues]
+    for thread in threads:
+        thread.start()
+    begin = time.perf_counter()
+    first = entries[0]['t'] if entries else 0.0
+    for index, entry in enumerate(entries):
+        if speed > 0:
+            delay = begin + (entry['t'] - first) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        session = _session_of(entry)
+        if session or _ordered(entry):
+            jobs = queues[hash(session) % len(queues)]
+        else:
+            # 세션이 없는 조회는 한 스레드에 몰리지 않게 차례로 나눔
+            jobs = queues[index % len(queues)]
+        jobs.put(index)
+    for jobs in queues:
+        jobs.put(None)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+# ============================================
+# 비교
+# ============================================
+
+def diff(before, after, threshold=0.2, limit=10):
+    """
+    두 결과(녹화 파일 또는 재생 결과)를 비교합니다. (같은 녹화에서 나온 것이라 순서가 같다고 봄)
+
+    출력: (보고서 글, 문제 수)
+        문제: 상태 코드가 다른 요청, 응답 요약값이 다른 요청,
+              p95 응답 시간이 threshold 비율보다 더 늘어난 경로
+    """
+    from loadtest import MIN_DELTA_MS, percentile
+
+    lines = []
+    problems = 0
+    if len(before) != len(after):
+        lines.append(f"요청 수가 다릅니다: {len(before)} / {len(after)} (앞에서부터 짧은 쪽만큼 비교)")
+        problems += 1
+
+    status_changed, body_changed = [], []
+    timings = {}
+    for index, (a, b) in enumerate(zip(before, after)):
+        name = f"{a['m']} {a.get('rt') or a['p']}"
+        pair = timings.setdefault(name, ([], []))
+        pair[0].append(a['ms'])
+        pair[1].append(b['ms'])
+        if {a['s'], b['s']} == {200, 304}:
+            # 조건부 요청(If-None-Match)은 재생할 때 보내지 않으므로 304 <-> 200은 비교하지 않음
+            continue
+        if a['s'] != b['s']:
+            status_changed.append(f"#{index} {a['m']} {a['p']}: {a['s']} -> {b['s']}")
+        elif a['s'] != 304 and a.get('dg') != b.get('dg'):
+            body_changed.append(f"#{index} {a['m']} {a['p']}: 응답 본문이 다름 ({a['s']})")
+
+    lines.append(f"{'경로':<30}{'요청':>7}{'p50':>16}{'p95':>16}{'p99':>16}  (ms, 앞 -> 뒤)")
+    for name, (a_times, b_times) in sorted(timings.items()):
+        a_sorted, b_sorted = sorted(a_times), sorted(b_times)
+        cells = []
+        for q in (50, 95, 99):
+            cells.append(f"{percentile(a_sorted, q):.2f}->{percentile(b_sorted, q):.2f}")
+        lines.append(f"{name:<30}{len(a_times):>7}" + ''.join(f"{cell:>16}" for cell in cells))
+        a95, b95 = percentile(a_sorted, 95), percentile(b_sorted, 95)
+        if b95 > a95 * (1 + threshold) and b95 - a95 > MIN_DELTA_MS:
+            lines.append(f"  - p95가 {threshold:.0%}보다 더 늘었습니다.")
+            problems += 1
+
+    for title, changed in (("상태 코드가 다른 요청", status_changed), ("응답이 다른 요청", body_changed)):
+        if changed:
+            problems += len(changed)
+            lines.append(f"{title}: {len(changed)}개")
+            lines += [f"  {item}" for item in changed[:limit]]
+            if len(changed) > limit:
+                lines.append(f"  ... 외 {len(changed) - limit}개")
+    if not status_changed and not body_changed:
+        lines.append("모든 응답이 같습니다.")
+    return '\n'.join(lines), problems
+
+
+# ============================================
+# 명령줄
+# ============================================
+
+def _replay_command(args):
+    entries = load_entries(args.recording)
+    data_dir = None
+    if args.url:
+        target = HttpTarget(args.url)
+    else:
+        # 서버 모듈을 불러오기 전에 데이터 폴더를 임시 복사본으로 바꿔 둠 (원래 데이터는 그대로)
+        data_dir = tempfile.mkdtemp(prefix='echochamber-replay-')
+        shutil.copytree(args.data, data_dir, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns('*.log', 'profiles', '*.jsonl'))
+        os.environ['ECHOCHAMBER_DATA_DIR'] = data_dir
+        if args.admin_token:
+            os.environ['ECHOCHAMBER_ADMIN_TOKEN'] = args.admin_token
+        import server
+        # 서버를 켤 때의 기본값처럼 JSON 파일은 먼저 응답하고 백그라운드에서 씀 (--sync-writes면 다 쓴 뒤 응답)
+        server.WRITER.configure(write_behind=not args.sync_writes)
+        if not args.sync_writes:
+            server.WRITER.start_background()
+        target = InProcessTarget(server.GameHandler)
+    try:
+        results = replay(entries, target, args.speed, args.concurrency, args.admin_token)
+    finally:
+        if data_dir is not None:
+            server.WRITER.stop_background()
+            shutil.rmtree(data_dir, ignore_errors=True)
+    if args.output:
+        save_entries(args.output, results)
+        print(f"결과 저장: {args.output} (요청 {len(results)}개)")
+    report, _ = diff(entries, results, threshold=float('inf'))
+    print(f"녹화한 응답과 비교 ({args.recording} -> 재생):")
+    print(report)
+    return 0
+
+
+def _diff_command(args):
+    report, problems = diff(load_entries(args.before), load_entries(args.after), args.threshold)
+    print(report)
+    return 1 if problems else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EchoChamber 요청 녹화 재생/비교")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = commands.add_parser('replay', help="녹화한 요청 다시 보내기")
+    replay_parser.add_argument('recording', help="녹화 파일 (server.py --record로 만든 파일)")
+    replay_parser.add_argument('--url', default=None, help="켜져 있는 서버 주소 (없으면 프로세스 안에서 재생)")
+    replay_parser.add_argument('--data', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'),
+                               help="프로세스 안에서 재생할 때 복사해서 쓸 데이터 폴더 (기본 data/)")
+    replay_parser.add_argument('--speed', type=float, default=0.0,
+                               help="0: 쉬지 않고 (기본), 1: 녹화한 간격 그대로, 10: 10배 빠르게")
+    replay_parser.add_argument('--concurrency', type=int, default=1,
+                               help="동시에 보내는 스레드 수 (기본 1: 응답을 비교하기 좋게 순서대로)")
+    replay_parser.add_argument('--sync-writes', action='store_true',
+                               help="프로세스 안에서 재생할 때 JSON 파일을 다 저장한 뒤에 응답 (server.py --sync-writes)")
+    replay_parser.add_argument('--admin-token', default='', help="녹화하지 않은 관리자 토큰 대신 보낼 값")
+    replay_parser.add_argument('--output', default=None, help="재생 결과를 저장할 파일 (diff에 사용)")
+
+    diff_parser = commands.add_parser('diff', help="두 결과의 응답 시간과 응답 비교")
+    diff_parser.add_argument('before', help="앞 결과 (녹화 파일 또는 재생 결과)")
+    diff_parser.add_argument('after', help="뒤 결과")
+    diff_parser.add_argument('--threshold', type=float, default=0.2,
+                             help="p95가 이 비율보다 더 늘면 문제로 봄 (기본 0.2 = 20%%)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'replay':
+        return _replay_command(args)
+    return _diff_command(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
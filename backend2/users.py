@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+사용자 목록 (메모리 색인)
+
+로그인할 때마다 users.json 전체를 읽고 처음부터 끝까지 훑는 대신,
+처음 한 번만 저장소에서 읽어서 username -> 사용자 딕셔너리로 보관합니다.
+- 로그인: username으로 바로 찾기 (사용자가 아무리 많아도 O(1))
+- 회원가입: 같은 username이 있는지 바로 확인하고, 새 사용자만 저장소에 추가
+  (SQLite 저장소는 새 사용자 한 줄만 씀)
+  JSON 저장소는 파일 하나에 모든 사용자가 들어 있으므로 파일 전체를 다시 쓰지만,
+  나중에 쓰기 모드에서는 그동안의 회원가입을 모아 파일에 쓸 때 한 번만 변환해서 씁니다. (1초에 한 번)
+"""
+
+import threading
+from datetime import datetime
+
+
+class UserDirectory:
+    """
+    username으로 찾는 사용자 목록
+
+    사용 예시:
+        users = UserDirectory(STORAGE)
+        user = users.register('test', '1234')      # 이미 있는 username이면 None
+        user = users.authenticate('test', '1234')  # 비밀번호가 틀리면 None
+    """
+
+    def __init__(self, storage):
+        """
+        입력:
+            storage: 저장소 (storage.py의 JsonStorage 또는 SqliteStorage)
+        """
+        self._storage = storage
+        # 저장기가 파일에 쓸 때 _saved_users()가 다시 잡을 수 있도록 RLock
+        self._lock = threading.RLock()
+        self._users = None       # 저장소에 있는 순서대로의 사용자 목록
+        self._by_name = None     # username -> 사용자
+        self._next_id = 1
+
+    def _ensure_loaded(self):
+        """처음 사용할 때 한 번만 저장소에서 읽어서 색인을 만듭니다. (잠금 안에서 호출)"""
+        if self._users is not None:
+            return
+        users = self._storage.load_users()
+        self._users = users
+        self._by_name = {}
+        for user in users:
+            # 예전 파일에 같은 username이 여러 번 있으면 먼저 있던 사용자로 로그인
+            self._by_name.setdefault(user.get('username'), user)
+        self._next_id = max((user.get('id', 0) for user in users), default=0) + 1
+
+    def _saved_users(self):
+        """저장소가 목록 전체를 쓸 때 부르는 함수 (JSON 파일에 실제로 쓸 때만 복사)"""
+        with self._lock:
+            return list(self._users)
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._users)
+
+    def find(self, username):
+        """username이 같은 사용자 (없으면 None)"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_name.get(username)
+
+    def authenticate(self, username, password):
+        """username과 password가 모두 맞으면 그 사용자, 아니면 None"""
+        user = self.find(username)
+        if user is None or user.get('password') != password:
+            return None
+        return user
+
+    def register(self, username, password):
+        """
+        새 사용자를 등록합니다.
+
+        입력: username, password (검사를 마친 값)
+        출력: 새 사용자 딕셔너리 (username이 이미 있으면 None)
+              저장소에 저장하지 못하면 OSError
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if username in self._by_name:
+                return None
+            user = {
+                "id": self._next_id,
+                "username": username,
+                "password": password,
+                "createdAt": datetime.now().isoformat()
+            }
+            self._users.append(user)
+            # 새 사용자만 넘김 (SQLite는 한 줄만 넣고, JSON 파일은 쓸 때 _saved_users로 목록을 만듦)
+            if self._storage.save_users(self._saved_users, added=[user]) is False:
+                # 저장하지 못했으면 메모리에서도 되돌리기
+                self._users.pop()
+                raise OSError("사용자 정보를 저장하지 못했습니다.")
+            self._by_name[username] = user
+            self._next_id += 1
+            return user